@@ -6,9 +6,20 @@ from typing import Optional, Union
 from flask import Flask
 from sqlalchemy import func, select
 
-from labbase2 import logging, views
+from labbase2 import autocomplete, executor, logging, profiling, views
 from labbase2.database import db
-from labbase2.models import Group, Permission, User, events
+from labbase2.models import (
+    BaseEntity,
+    EntityCount,
+    FlyStock,
+    Group,
+    Oligonucleotide,
+    Permission,
+    Plasmid,
+    SearchIndex,
+    User,
+    events,
+)
 from labbase2.models.user import login_manager
 from labbase2.utils import template_filters
 
@@ -68,6 +79,9 @@ def create_app(
     # Initiate the database.
     db.init_app(app)
 
+    # Count statements and measure timings of requests if enabled.
+    profiling.init_app(app)
+
     with app.app_context():
         # Create database and add tables (if not yet present).
         db.create_all()
@@ -79,6 +93,27 @@ def create_app(
     # If no user with admin rights is in the database, create one.
     _set_up_admin(app=app)
 
+    # Rebuild the seed index for finding oligonucleotides if necessary.
+    _set_up_seed_index(app=app)
+
+    # Rebuild the allele index for filtering fly stocks if necessary.
+    _set_up_allele_index(app=app)
+
+    # Parse plasmid files that are missing from the sequence cache.
+    _set_up_sequence_cache(app=app)
+
+    # Create the full-text index for searching entities and rebuild it if necessary.
+    _set_up_search_index(app=app)
+
+    # Keep the labels of all entities in memory for autocompletion.
+    autocomplete.init_app(app)
+
+    # Recount the entities since bulk statements are not counted by session events.
+    _set_up_entity_counts(app=app)
+
+    # Set up the executor for background imports.
+    executor.init_app(app)
+
     # Register login_manager with application.
     login_manager.init_app(app)
 
@@ -144,6 +179,46 @@ def _set_up_groups(app: Flask):
         db.session.commit()
 
 
+def _set_up_seed_index(app: Flask):
+    with app.app_context():
+        if Oligonucleotide.seed_index_outdated():
+            app.logger.info("Seed index is outdated; rebuild seed index for oligonucleotides.")
+            Oligonucleotide.build_seed_index()
+            db.session.commit()
+
+
+def _set_up_allele_index(app: Flask):
+    with app.app_context():
+        if FlyStock.allele_index_outdated():
+            app.logger.info("Allele index is outdated; rebuild allele index for fly stocks.")
+            FlyStock.build_allele_index()
+            db.session.commit()
+
+
+def _set_up_sequence_cache(app: Flask):
+    with app.app_context():
+        if Plasmid.sequence_cache_outdated():
+            app.logger.info("Sequence cache is incomplete; parse missing plasmid files.")
+            parsed = Plasmid.build_sequence_cache()
+            app.logger.info("Parsed %d plasmid files.", parsed)
+
+
+def _set_up_search_index(app: Flask):
+    with app.app_context():
+        SearchIndex.create()
+
+        if BaseEntity.search_index_outdated():
+            app.logger.info("Search index is outdated; rebuild search index for entities.")
+            BaseEntity.build_search_index()
+            db.session.commit()
+
+
+def _set_up_entity_counts(app: Flask):
+    with app.app_context():
+        EntityCount.rebuild()
+        db.session.commit()
+
+
 def _set_up_admin(app: Flask):
     with app.app_context():
         first, last, email = app.config.get("USER")
@@ -0,0 +1,325 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from itertools import islice
+from threading import Lock
+from typing import Iterable, Optional
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+
+from labbase2.database import db
+from labbase2.models import BaseEntity
+
+__all__ = ["LabelIndex", "init_app", "complete"]
+
+
+class LabelIndex:
+    """An in-memory index of the labels of all entities for autocompletion
+
+    Notes
+    -----
+    Labels are kept in a list sorted case-insensitively, so labels starting with a
+    query are found by bisection. Labels containing a query elsewhere are found by
+    intersecting the sets of entities sharing the trigrams of the query. The index
+    is updated by session events after each commit. Changes made by other processes
+    are only picked up when the index is built again.
+    """
+
+    # The number of trigram candidates above which labels are scanned in order.
+    scan_threshold: int = 1000
+
+    def __init__(self):
+        self._keys: list[tuple[str, int]] = []
+        self._entries: dict[int, tuple[str, str, str]] = {}
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def trigrams(key: str) -> set[str]:
+        """Get all substrings of length 3 of a string
+
+        Parameters
+        ----------
+        key: str
+            A lowercase label or query.
+
+        Returns
+        -------
+        set[str]
+            The trigrams of the string.
+        """
+
+        return {key[i : i + 3] for i in range(len(key) - 2)}
+
+    def build(self, rows: Iterable[tuple[int, str, str]]) -> None:
+        """Replace the content of the index
+
+        Parameters
+        ----------
+        rows: Iterable[tuple[int, str, str]]
+            The ID, label, and entity type of all entities.
+
+        Returns
+        -------
+        None
+        """
+
+        entries = {id_: (label.lower(), label, entity_type) for id_, label, entity_type in rows}
+
+        trigrams = defaultdict(set)
+        for id_, (key, _, _) in entries.items():
+            for trigram in self.trigrams(key):
+                trigrams[trigram].add(id_)
+
+        with self._lock:
+            self._entries = entries
+            self._keys = sorted((key, id_) for id_, (key, _, _) in entries.items())
+            self._trigrams = trigrams
+
+    def add(self, id_: int, label: str, entity_type: str) -> None:
+        """Add an entity to the index or replace its label
+
+        Parameters
+        ----------
+        id_: int
+            The ID of the entity.
+        label: str
+            The label of the entity.
+        entity_type: str
+            The type of the entity.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self._remove(id_)
+
+            key = label.lower()
+            self._entries[id_] = key, label, entity_type
+            insort(self._keys, (key, id_))
+
+            for trigram in self.trigrams(key):
+                self._trigrams[trigram].add(id_)
+
+    def remove(self, id_: int) -> None:
+        """Remove an entity from the index
+
+        Parameters
+        ----------
+        id_: int
+            The ID of the entity. Unknown IDs are ignored.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self._remove(id_)
+
+    def complete(self, query: str, limit: int = 10) -> list[tuple[int, str, str]]:
+        """Find entities by the beginning or a part of their label
+
+        Parameters
+        ----------
+        query: str
+            The beginning or a part of a label. Case is ignored.
+        limit: int
+            The maximum number of entities to return. Defaults to 10.
+
+        Returns
+        -------
+        list[tuple[int, str, str]]
+            The ID, label, and entity type of matching entities. Labels starting
+            with the query come first, followed by labels containing the query if
+            it is at least three characters long. Both groups are sorted by label.
+        """
+
+        if not (key := query.strip().lower()) or limit < 1:
+            return []
+
+        with self._lock:
+            found = []
+
+            i = bisect_left(self._keys, (key,))
+            while len(found) < limit and i < len(self._keys) and self._keys[i][0].startswith(key):
+                found.append(self._keys[i][1])
+                i += 1
+
+            if len(found) < limit and len(key) >= 3:
+                candidates = sorted(
+                    (self._trigrams.get(trigram, set()) for trigram in self.trigrams(key)), key=len
+                )
+                ids = candidates[0].intersection(*candidates[1:]) - set(found)
+                missing = limit - len(found)
+
+                # Many candidates are cheaper to take in order from the sorted labels
+                # than to sort.
+                if len(ids) > self.scan_threshold:
+                    matches = (
+                        (other, id_) for other, id_ in self._keys if id_ in ids and key in other
+                    )
+                    found += [id_ for _, id_ in islice(matches, missing)]
+                else:
+                    matches = (
+                        (self._entries[id_][0], id_) for id_ in ids if key in self._entries[id_][0]
+                    )
+                    found += [id_ for _, id_ in heapq.nsmallest(missing, matches)]
+
+            return [(id_, *self._entries[id_][1:]) for id_ in found]
+
+    def _remove(self, id_: int) -> None:
+        if (entry := self._entries.pop(id_, None)) is None:
+            return
+
+        key = entry[0]
+        del self._keys[bisect_left(self._keys, (key, id_))]
+
+        for trigram in self.trigrams(key):
+            self._trigrams[trigram].discard(id_)
+            if not self._trigrams[trigram]:
+                del self._trigrams[trigram]
+
+
+def init_app(app: Flask):
+    """Build the label index for autocompletion with the current app
+
+    Parameters
+    ----------
+    app: Flask
+        A flask app to initialize.
+
+    Returns
+    -------
+    None
+    """
+
+    index = LabelIndex()
+
+    with app.app_context():
+        index.build(
+            db.session.execute(select(BaseEntity.id, BaseEntity.label, BaseEntity.entity_type))
+        )
+
+    app.extensions["label_index"] = index
+
+
+def complete(query: str, limit: Optional[int] = None) -> list[tuple[int, str, str]]:
+    """Find entities by the beginning or a part of their label
+
+    Parameters
+    ----------
+    query: str
+        The beginning or a part of a label.
+    limit: Optional[int]
+        The maximum number of entities to return. Defaults to `AUTOCOMPLETE_LIMIT`.
+
+    Returns
+    -------
+    list[tuple[int, str, str]]
+        The ID, label, and entity type of matching entities. See
+        `LabelIndex.complete` for details.
+    """
+
+    if limit is None:
+        limit = current_app.config["AUTOCOMPLETE_LIMIT"]
+
+    return current_app.extensions["label_index"].complete(query, limit)
+
+
+def _record(session: Session, changes: Iterable[tuple[int, Optional[str], Optional[str]]]):
+    # Changes are remembered with the innermost transaction so that changes inside a
+    # savepoint can be discarded if the savepoint is rolled back.
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault("label_index_changes", []).extend(
+        (transaction, change) for change in changes
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def _record_flushed_labels(session: Session, _flush_context):
+    changes = []
+
+    for obj in session.new:
+        if isinstance(obj, BaseEntity):
+            changes.append((obj.id, obj.label, obj.entity_type))
+
+    for obj in session.dirty:
+        if isinstance(obj, BaseEntity) and inspect(obj).attrs.label.history.has_changes():
+            changes.append((obj.id, obj.label, obj.entity_type))
+
+    for obj in session.deleted:
+        if isinstance(obj, BaseEntity):
+            changes.append((obj.id, None, None))
+
+    if changes:
+        _record(session, changes)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _record_bulk_updated_labels(state: ORMExecuteState):
+    if not state.is_update or state.bind_mapper is None:
+        return None
+
+    if not state.bind_mapper.isa(inspect(BaseEntity)):
+        return None
+
+    if not isinstance(params := state.parameters, list):
+        return None
+
+    if not (ids := [row["id"] for row in params if "label" in row]):
+        return state.invoke_statement()
+
+    result = state.invoke_statement()
+
+    rows = state.session.connection().execute(
+        select(BaseEntity.id, BaseEntity.label, BaseEntity.entity_type).where(
+            BaseEntity.id.in_(ids)
+        )
+    )
+    _record(state.session, rows.all())
+
+    return result
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _discard_labels(session: Session, previous_transaction: SessionTransaction):
+    def discarded(transaction: Optional[SessionTransaction]) -> bool:
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+
+    if changes := session.info.get("label_index_changes"):
+        session.info["label_index_changes"] = [
+            (transaction, change) for transaction, change in changes if not discarded(transaction)
+        ]
+
+
+@event.listens_for(db.session, "after_commit")
+def _apply_labels(session: Session):
+    # Releasing a savepoint also counts as commit.
+    if session.in_nested_transaction():
+        return
+
+    changes = session.info.pop("label_index_changes", [])
+
+    if not changes or not has_app_context():
+        return
+
+    if (index := current_app.extensions.get("label_index")) is None:
+        return
+
+    for _, (id_, label, entity_type) in changes:
+        if label is None:
+            index.remove(id_)
+        else:
+            index.add(id_, label, entity_type)
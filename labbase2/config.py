@@ -44,6 +44,31 @@ class DefaultConfig:
         ("add-request", "Allows a user to add requests for any ressource. Suggested level: PI."),
     ]
 
+    # Search.
+    FIND_SEED_LENGTH: int = 12
+    FIND_WORKERS: int = 1
+
+    # Full-text search. The backend is either 'fts5', 'tokens', or 'auto', which uses
+    # FTS5 on SQLite if available.
+    SEARCH_BACKEND: str = "auto"
+    SEARCH_LIMIT: int = 50
+    AUTOCOMPLETE_LIMIT: int = 10
+
+    # Image derivatives. The length in pixels of the long side of each size.
+    DERIVATIVE_SIZES: dict[str, int] = {"thumbnail": 160, "preview": 1280}
+
+    # Import.
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_WORKERS: int = 1
+    IMPORT_PREVIEW_ROWS: int = 5
+    # Seconds between heartbeats of processes executing imports.
+    IMPORT_HEARTBEAT: int = 30
+
+    # Profiling.
+    PROFILING: bool = False
+    PROFILING_MAX_QUERIES: int = 50
+    PROFILING_MAX_DURATION: float = 1000
+
     # Data.
     RESISTANCES: list[str] = [
         "Ampicillin",
@@ -0,0 +1,194 @@
+import os
+import socket
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Thread
+from typing import Optional
+
+from flask import Flask, current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from labbase2.database import db
+from labbase2.models import ImportJob
+
+__all__ = ["init_app", "submit_import", "fail_stale_imports"]
+
+
+def init_app(app: Flask):
+    """Initialize the executor for background imports with the current app
+
+    Parameters
+    ----------
+    app: Flask
+        A flask app to initialize.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Imports whose process stopped sending heartbeats, for instance because the app
+    was stopped, are marked as failed. Imports of other processes that are still
+    alive are left alone. If `IMPORT_WORKERS` is 0, imports are executed
+    synchronously.
+    """
+
+    if workers := app.config["IMPORT_WORKERS"]:
+        app.extensions["import_executor"] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="labbase2-import"
+        )
+
+    with app.app_context():
+        fail_stale_imports()
+
+
+def submit_import(job_id: int) -> Optional[Future]:
+    """Execute an import in the background
+
+    Parameters
+    ----------
+    job_id: int
+        The ID of an import job. The status of the job should be 'queued'. The file
+        is validated first and nothing is imported if any problems are found. An
+        interrupted import continues after its committed rows without validating
+        the file again.
+
+    Returns
+    -------
+    Optional[Future]
+        A future for the import or `None` if the import was executed synchronously
+        because no executor is configured.
+    """
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+
+    db.session.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id)
+        .values(worker=_worker(), heartbeat=datetime.now())
+    )
+    db.session.commit()
+
+    if (executor := app.extensions.get("import_executor")) is None:
+        _run_import(app, job_id)
+        return None
+
+    # The heartbeat is started in the process that executes imports, which might be
+    # forked from the process that created the app.
+    if app.extensions.get("import_heartbeat", (None, 0))[1] != os.getpid():
+        thread = Thread(target=_beat, args=(app,), name="labbase2-heartbeat", daemon=True)
+        app.extensions["import_heartbeat"] = thread, os.getpid()
+        thread.start()
+
+    return executor.submit(_run_import, app, job_id)
+
+
+def fail_stale_imports() -> int:
+    """Mark active imports as failed if their process stopped sending heartbeats
+
+    Returns
+    -------
+    int
+        The number of imports marked as failed.
+
+    Notes
+    -----
+    An import is stale if its last heartbeat is older than four times
+    `IMPORT_HEARTBEAT` seconds.
+    """
+
+    limit = datetime.now() - timedelta(seconds=4 * current_app.config["IMPORT_HEARTBEAT"])
+
+    result = db.session.execute(
+        update(ImportJob)
+        .where(ImportJob.status.in_(ImportJob.ACTIVE))
+        .where(or_(ImportJob.heartbeat.is_(None), ImportJob.heartbeat < limit))
+        .values(status="failed", message="The import was interrupted.")
+    )
+    db.session.commit()
+
+    return result.rowcount
+
+
+def _worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"[:128]
+
+
+def _beat(app: Flask) -> None:
+    while True:
+        time.sleep(app.config["IMPORT_HEARTBEAT"])
+
+        with app.app_context():
+            try:
+                db.session.execute(
+                    update(ImportJob)
+                    .where(ImportJob.worker == _worker())
+                    .where(ImportJob.status.in_(ImportJob.ACTIVE))
+                    .values(heartbeat=datetime.now())
+                )
+                db.session.commit()
+            except SQLAlchemyError as error:
+                db.session.rollback()
+                app.logger.debug("Could not send heartbeat for imports: %s", error)
+
+
+def _run_import(app: Flask, job_id: int) -> None:
+    with app.app_context():
+        if (job := db.session.get(ImportJob, job_id)) is None:
+            return
+
+        # The remaining rows of an interrupted import were validated before it started.
+        resume = job.committed_rows > 0
+
+        if resume:
+            errors = []
+        else:
+            job.status = "validating"
+            job.heartbeat = datetime.now()
+            db.session.commit()
+
+            try:
+                errors = job.validate()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                db.session.rollback()
+                errors = [(None, str(error))]
+
+        if errors:
+            app.logger.info("Import %d was not executed due to %d problems.", job_id, len(errors))
+            job.status = "failed"
+            job.message = f"Nothing was imported because {len(errors)} problems were found."
+            job.report = errors
+            db.session.commit()
+            return
+
+        job.status = "running"
+        if not resume:
+            job.processed = 0
+            job.failed = 0
+        job.heartbeat = datetime.now()
+        db.session.commit()
+
+        try:
+            imported, failed = job.run()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            db.session.rollback()
+            app.logger.error("Import %d failed: %s", job_id, error)
+            job.status = "failed"
+            job.message = str(error)[:512]
+        else:
+            app.logger.info(
+                "Imported %d entities (%s) from file (%s).",
+                imported,
+                job.class_.__name__,
+                job.file.filename_exposed,
+            )
+            job.status = "done"
+            job.is_finished = True
+            job.processed = imported
+            job.failed = len(failed)
+            job.report = failed
+
+        db.session.commit()
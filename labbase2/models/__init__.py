@@ -3,10 +3,12 @@ from .base_entity import BaseEntity
 from .chemical import Chemical, StockSolution
 from .comment import Comment
 from .consumable import Batch, Consumable
+from .entity_count import EntityCount
 from .file import BaseFile, EntityFile
 from .fly_stock import FlyStock, Modification
 from .import_job import ColumnMapping, ImportJob
 from .oligonucleotide import Oligonucleotide
-from .plasmid import GlycerolStock, Plasmid, Preparation
+from .plasmid import GlycerolStock, Plasmid, Preparation, RestrictionSite, SequenceCache
 from .request import Request
+from .search_index import SearchIndex
 from .user import Group, Permission, ResetPassword, User
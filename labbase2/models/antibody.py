@@ -48,7 +48,9 @@ class Antibody(Consumable):
     id: Mapped[int] = mapped_column(ForeignKey("consumable.id"), primary_key=True)
     clone: Mapped[str] = mapped_column(String(32), nullable=True, info={"importable": True})
     host: Mapped[str] = mapped_column(String(64), nullable=False, info={"importable": True})
-    antigen: Mapped[str] = mapped_column(String(256), nullable=False, info={"importable": True})
+    antigen: Mapped[str] = mapped_column(
+        String(256), nullable=False, info={"importable": True, "searchable": True}
+    )
     specification: Mapped[str] = mapped_column(String(64), nullable=True, info={"importable": True})
     storage_temp: Mapped[int] = mapped_column(nullable=True, info={"importable": True})
     source: Mapped[str] = mapped_column(String(64), nullable=True, info={"importable": True})
@@ -64,10 +66,9 @@ class Antibody(Consumable):
 
     __mapper_args__ = {"polymorphic_identity": "antibody"}
 
-    def to_dict(self) -> dict:
-        as_dict = super().to_dict()
-
-        return as_dict | {"dilutions": [d.to_dict() for d in self.dilutions]}
+    @classmethod
+    def _export_relationships(cls) -> tuple[str, ...]:
+        return super()._export_relationships() + ("dilutions",)
 
 
 class Dilution(db.Model, mixins.Export):
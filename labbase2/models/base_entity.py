@@ -1,13 +1,16 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
+from typing import Iterable, Optional
 
-import pandas as pd
 from flask import current_app
 from flask_login import current_user
-from sqlalchemy import Column, DateTime, String, func
+from sqlalchemy import Column, Connection, DateTime, Select, String, exists, func, inspect, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from labbase2.database import db
 from labbase2.models import mixins
+from labbase2.models.comment import Comment
+from labbase2.models.search_index import SearchIndex
 
 __all__ = ["BaseEntity"]
 
@@ -68,7 +71,11 @@ class BaseEntity(db.Model, mixins.Filter, mixins.Export, mixins.Importer):
 
     id: Mapped[int] = mapped_column(primary_key=True, info={"importable": False})
     label: Mapped[str] = mapped_column(
-        String(64), nullable=False, unique=True, index=True, info={"importable": True}
+        String(64),
+        nullable=False,
+        unique=True,
+        index=True,
+        info={"importable": True, "searchable": True},
     )
     timestamp_created: Mapped[datetime] = mapped_column(
         DateTime,
@@ -137,46 +144,174 @@ class BaseEntity(db.Model, mixins.Filter, mixins.Export, mixins.Importer):
         hours = current_app.config["DELETABLE_HOURS"]
         return (datetime.now() - self.timestamp_created) <= timedelta(hours=hours)
 
-    def to_dict(self) -> dict:
-        as_dict = super().to_dict()
+    @classmethod
+    def searchable_fields(cls) -> list[str]:
+        """Get a list of all columns included in the full-text index
 
-        return as_dict | {
-            "comments": [c.to_dict() for c in self.comments],
-            "requests": [r.to_dict() for r in self.requests],
-        }
+        Returns
+        -------
+        list[str]
+            The names of the columns that have been tagged as searchable.
+        """
+
+        # Column properties like counts of related rows are not searchable.
+        return [
+            column.name
+            for column in inspect(cls).columns
+            if isinstance(column, Column) and column.info.get("searchable", False)
+        ]
 
     @classmethod
-    def _filters(cls, **fields) -> list:
-        filters = []
+    def search(cls, query: str) -> Select:
+        """Create a query for entities matching a full-text search ranked by relevance
 
-        owner_id = fields.pop("owner_id", 0)
-        if owner_id != 0:
-            filters.append(cls.owner_id == owner_id)
+        Parameters
+        ----------
+        query: str
+            The search query. All terms have to match the label, a searchable
+            column, or a comment of an entity. Terms match as prefixes.
 
-        return super()._filters(**fields) + filters
+        Returns
+        -------
+        Select
+            An SQLAlchemy Select object for the ID, label, entity type, and score of
+            matching entities ordered by decreasing score.
+        """
+
+        ranked = SearchIndex.match(query).subquery()
+
+        return (
+            select(cls.id, cls.label, cls.entity_type, ranked.c.score)
+            .join(ranked, ranked.c.entity_id == cls.id)
+            .order_by(ranked.c.score.desc(), cls.id)
+        )
+
+    @classmethod
+    def search_documents(
+        cls, connection: Connection, ids: Optional[Iterable[int]] = None
+    ) -> list[tuple[int, str, str]]:
+        """Get the text of entities of this class for the full-text index
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with.
+        ids: Optional[Iterable[int]]
+            The IDs of the entities. If `None`, all entities of exactly this class
+            are returned.
+
+        Returns
+        -------
+        list[tuple[int, str, str]]
+            The ID, the label, and the text of all other searchable columns and of
+            the comments of each entity.
+        """
+
+        fields = [getattr(cls, name) for name in cls.searchable_fields() if name != "label"]
+        entities = select(cls.id).where(cls.entity_type == cls.__mapper__.polymorphic_identity)
+
+        if ids is not None:
+            entities = entities.where(cls.id.in_(list(ids)))
+
+        rows = connection.execute(entities.add_columns(cls.label, *fields)).all()
+
+        comments = defaultdict(list)
+        for entity_id, subject, text in connection.execute(
+            select(Comment.entity_id, Comment.subject, Comment.text).where(
+                Comment.entity_id.in_(entities)
+            )
+        ):
+            comments[entity_id] += [subject, text]
+
+        return [
+            (id_, label, " ".join(value for value in values + comments[id_] if value))
+            for id_, label, *values in rows
+        ]
 
     @classmethod
-    def from_row(cls, row: tuple) -> "BaseEntity":
-        """Generate a new instance from a DataFrame row.
+    def index_search(cls, connection: Connection, ids: Iterable[int]) -> None:
+        """Update the full-text index for entities of any type
 
         Parameters
         ----------
-        row: tuple
-            A row of a pd.DataFrame object as returned by iterating over the rows.
+        connection: Connection
+            The connection to execute the statements with. This allows using the
+            method from within session events.
+        ids: Iterable[int]
+            The IDs of the entities. Entities that no longer exist are only removed
+            from the index.
 
         Returns
         -------
-        BaseEntity
-            An instance of this class.
+        None
         """
 
-        # noinspection PyProtectedMember
-        row_dict: dict = row._asdict()
+        if not (ids := set(ids)):
+            return
 
-        for column, value in row_dict.items():
-            if pd.isnull(value):
-                row_dict[column] = None
-            if isinstance(value, str):
-                row_dict[column] = value.strip()
+        SearchIndex.remove(connection, ids)
 
-        return cls(origin="Imported from file.", **row_dict)
+        types = defaultdict(list)
+        for id_, entity_type in connection.execute(
+            select(BaseEntity.id, BaseEntity.entity_type).where(BaseEntity.id.in_(ids))
+        ):
+            types[entity_type].append(id_)
+
+        polymorphic_map = BaseEntity.__mapper__.polymorphic_map
+
+        for entity_type, type_ids in types.items():
+            class_ = polymorphic_map[entity_type].class_
+            SearchIndex.insert(connection, class_.search_documents(connection, type_ids))
+
+    @classmethod
+    def build_search_index(cls) -> None:
+        """Rebuild the full-text index for all entities.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The changes are not committed automatically to the database.
+        """
+
+        connection = db.session.connection()
+        SearchIndex.clear(connection)
+
+        for mapper in BaseEntity.__mapper__.self_and_descendants:
+            SearchIndex.insert(connection, mapper.class_.search_documents(connection))
+
+    @classmethod
+    def search_index_outdated(cls) -> bool:
+        """Check if the full-text index has to be rebuilt.
+
+        Returns
+        -------
+        bool
+            `True` if any entity is missing from the index, `False` otherwise.
+        """
+
+        indexed = SearchIndex.indexed().subquery()
+        missing = exists().where(BaseEntity.id.not_in(select(indexed.c.entity_id)))
+
+        return db.session.scalar(select(missing))
+
+    @classmethod
+    def _export_relationships(cls) -> tuple[str, ...]:
+        return "comments", "requests"
+
+    @classmethod
+    def _filters(cls, **fields) -> list:
+        filters = []
+
+        # Full-text search over all searchable columns and comments.
+        if search := fields.pop("search", None):
+            matches = SearchIndex.match(search).subquery()
+            filters.append(cls.id.in_(select(matches.c.entity_id)))
+
+        owner_id = fields.pop("owner_id", 0)
+        if owner_id != 0:
+            filters.append(cls.owner_id == owner_id)
+
+        return super()._filters(**fields) + filters
@@ -1,8 +1,15 @@
 from datetime import date
 
 from flask_login import current_user
-from sqlalchemy import Date, ForeignKey, String, asc, desc, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship, subqueryload
+from sqlalchemy import Date, ForeignKey, String, asc, desc, func, select
+from sqlalchemy.orm import (
+    Mapped,
+    column_property,
+    mapped_column,
+    relationship,
+    selectinload,
+    undefer,
+)
 
 from labbase2.database import db
 from labbase2.models import mixins
@@ -30,6 +37,8 @@ class Chemical(Consumable):
     pubchem_cid : int
         The PubChem reference number. This will be used to retrieve
         additional information about this compound from PubChem.
+    stock_count : int
+        The number of stock solutions. This is counted by the database and deferred.
 
     Notes
     -----
@@ -60,7 +69,7 @@ class Chemical(Consumable):
 
     @classmethod
     def _options(cls) -> tuple:
-        return subqueryload(cls.stocks), subqueryload(cls.batches)
+        return selectinload(cls.responsible), undefer(cls.batch_count), undefer(cls.stock_count)
 
 
 class StockSolution(db.Model, mixins.Filter):
@@ -121,3 +130,12 @@ class StockSolution(db.Model, mixins.Filter):
     @classmethod
     def _joins(cls) -> tuple:
         return ((Chemical, cls.chemical_id == Chemical.id),)
+
+
+Chemical.stock_count = column_property(
+    select(func.count(StockSolution.id))
+    .where(StockSolution.chemical_id == Chemical.id)
+    .scalar_subquery(),
+    deferred=True,
+    info={"exportable": False},
+)
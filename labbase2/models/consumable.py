@@ -1,8 +1,8 @@
 from datetime import date
 from typing import Optional
 
-from sqlalchemy import Date, ForeignKey, String, asc, desc, not_
-from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
+from sqlalchemy import Date, ForeignKey, String, asc, desc, func, not_, select
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship, selectinload
 
 from labbase2.database import db
 from labbase2.models.base_entity import BaseEntity
@@ -136,6 +136,10 @@ class Batch(db.Model, Filter, Export):
     def _joins(cls) -> tuple:
         return (Consumable,)
 
+    @classmethod
+    def _options(cls) -> tuple:
+        return (selectinload(cls.consumable),)
+
 
 class Consumable(BaseEntity, Export):
     """A consumable is a general class for all kind of stuff in the lab that can be
@@ -154,6 +158,9 @@ class Consumable(BaseEntity, Export):
         A short description how this consumable should be stored.
     batches : list[Batch]
         A list of all batches of this consumable that were ordered.
+    batch_count : int
+        The number of batches. This is counted by the database and deferred, i.e.,
+        only loaded if accessed or undeferred by a query.
     """
 
     id: Mapped[int] = mapped_column(
@@ -168,11 +175,23 @@ class Consumable(BaseEntity, Export):
         order_by="Batch.date_emptied, Batch.in_use.desc(), Batch.date_ordered",
     )
 
+    batch_count: Mapped[int] = column_property(
+        select(func.count(Batch.id)).where(Batch.consumable_id == id).scalar_subquery(),
+        deferred=True,
+        info={"exportable": False},
+    )
+
     # Proper setup for joined table inheritance.
     __mapper_args__ = {"polymorphic_identity": "consumable"}
 
-    def to_dict(self) -> dict:
-        return super().to_dict() | {"batches": [b.to_dict() for b in self.batches]}
+    @classmethod
+    def _export_relationships(cls) -> tuple[str, ...]:
+        return super()._export_relationships() + ("batches",)
+
+    @classmethod
+    def _options(cls) -> tuple:
+        # The location of a consumable is the storage place of its first batch.
+        return (selectinload(cls.batches),)
 
     @property
     def location(self) -> Optional[str]:
@@ -0,0 +1,133 @@
+from typing import ClassVar, Type
+
+from sqlalchemy import Connection, String, delete, func, insert, select, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from labbase2.database import db
+from labbase2.models.base_entity import BaseEntity
+from labbase2.models.chemical import StockSolution
+from labbase2.models.consumable import Batch
+from labbase2.models.plasmid import GlycerolStock
+
+__all__ = ["EntityCount"]
+
+
+class EntityCount(db.Model):
+    """The number of rows of each entity type
+
+    Attributes
+    ----------
+    entity_type: str
+        The polymorphic identity of a subclass of `BaseEntity` or the table name of
+        the other classes listed in `COUNTED`.
+    count: int
+        The number of rows.
+
+    Notes
+    -----
+    The counts are kept up to date by session events and rebuilt at app startup.
+    Thus, the total number of entities can be shown without counting rows.
+    """
+
+    __tablename__: str = "entity_count"
+
+    # Classes whose rows are counted. Subclasses of `BaseEntity` are counted
+    # separately by their polymorphic identity.
+    COUNTED: ClassVar[tuple] = (BaseEntity, Batch, GlycerolStock, StockSolution)
+
+    entity_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    @staticmethod
+    def key(class_: Type[db.Model]) -> str:
+        """Get the key under which the rows of a class are counted
+
+        Parameters
+        ----------
+        class_: Type[db.Model]
+            A mapped class.
+
+        Returns
+        -------
+        str
+            The polymorphic identity of the class or its table name if the class is
+            not polymorphic.
+        """
+
+        return class_.__mapper__.polymorphic_identity or class_.__tablename__
+
+    @classmethod
+    def get(cls, class_: Type[db.Model]) -> int:
+        """Get the number of rows of a class
+
+        Parameters
+        ----------
+        class_: Type[db.Model]
+            A subclass of one of the classes in `COUNTED`.
+
+        Returns
+        -------
+        int
+            The number of rows.
+        """
+
+        count = db.session.scalar(select(cls.count).where(cls.entity_type == cls.key(class_)))
+
+        return count or 0
+
+    @classmethod
+    def add(cls, connection: Connection, counts: dict[str, int]) -> None:
+        """Change the counts of several entity types
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with. This allows using the
+            method from within session events.
+        counts: dict[str, int]
+            The change of the count of each entity type.
+
+        Returns
+        -------
+        None
+        """
+
+        for key, delta in counts.items():
+            result = connection.execute(
+                update(cls).where(cls.entity_type == key).values(count=cls.count + delta)
+            )
+
+            if result.rowcount == 0:
+                connection.execute(insert(cls).values(entity_type=key, count=max(delta, 0)))
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Count the rows of all entity types
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The changes are not committed automatically to the database.
+        """
+
+        keys = [
+            mapper.polymorphic_identity for mapper in BaseEntity.__mapper__.self_and_descendants
+        ]
+        counts = dict.fromkeys(keys, 0)
+
+        counts |= dict(
+            db.session.execute(
+                select(BaseEntity.entity_type, func.count()).group_by(BaseEntity.entity_type)
+            ).all()
+        )
+
+        for class_ in cls.COUNTED[1:]:
+            counts[cls.key(class_)] = db.session.scalar(select(func.count()).select_from(class_))
+
+        db.session.execute(delete(cls))
+        db.session.execute(
+            insert(cls), [{"entity_type": key, "count": count} for key, count in counts.items()]
+        )
@@ -1,9 +1,24 @@
-from sqlalchemy import event, func
+import shutil
+from collections import Counter
+
+from sqlalchemy import event, func, inspect, select
 from sqlalchemy.engine import Connection
-from sqlalchemy.orm import Mapper, Session
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session
 
 from labbase2.database import db
-from labbase2.models import ColumnMapping, Group, Oligonucleotide, User, file
+from labbase2.models import (
+    BaseEntity,
+    ColumnMapping,
+    Comment,
+    EntityCount,
+    FlyStock,
+    Group,
+    Oligonucleotide,
+    Permission,
+    User,
+    file,
+)
+from labbase2.models.user import invalidate_access
 
 
 @event.listens_for(db.session, "deleted_to_detached")
@@ -28,6 +43,8 @@ def intercept_deleted_to_detached(_session, obj) -> None:
 
     if isinstance(obj, file.BaseFile):
         obj.path.unlink(missing_ok=True)
+        shutil.rmtree(obj.cache_path, ignore_errors=True)
+        shutil.rmtree(obj.derivative_path, ignore_errors=True)
 
 
 # TODO: There must be a better option than writing an event for every single child
@@ -50,6 +67,172 @@ def update_parent(_mapper, _connection, target) -> None:
     target.timestamp_edited = func.now()  # pylint: disable=not-callable
 
 
+@event.listens_for(Oligonucleotide, "after_insert")
+def index_oligonucleotide(_mapper: Mapper, connection: Connection, target: Oligonucleotide):
+    """Add the seeds of a new oligonucleotide to the seed index
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: Oligonucleotide
+
+    Returns
+    -------
+    None
+    """
+
+    Oligonucleotide.index_seeds(connection, target.id, target.sequence, replace=False)
+
+
+@event.listens_for(Oligonucleotide, "after_update")
+def reindex_oligonucleotide(_mapper: Mapper, connection: Connection, target: Oligonucleotide):
+    """Update the seed index if the sequence of an oligonucleotide was modified
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: Oligonucleotide
+
+    Returns
+    -------
+    None
+    """
+
+    if inspect(target).attrs.sequence.history.has_changes():
+        Oligonucleotide.index_seeds(connection, target.id, target.sequence)
+
+
+@event.listens_for(Oligonucleotide, "after_delete")
+def unindex_oligonucleotide(_mapper: Mapper, connection: Connection, target: Oligonucleotide):
+    """Remove a deleted oligonucleotide from the seed index
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: Oligonucleotide
+
+    Returns
+    -------
+    None
+    """
+
+    Oligonucleotide.index_seeds(connection, target.id, None)
+
+
+@event.listens_for(FlyStock, "after_insert")
+def index_fly_stock(_mapper: Mapper, connection: Connection, target: FlyStock):
+    """Add the alleles of a new fly stock to the allele index
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: FlyStock
+
+    Returns
+    -------
+    None
+    """
+
+    genotype = {field: getattr(target, field) for field in FlyStock.genotype_fields()}
+    FlyStock.index_alleles(connection, target.id, genotype, replace=False)
+
+
+@event.listens_for(FlyStock, "after_update")
+def reindex_fly_stock(_mapper: Mapper, connection: Connection, target: FlyStock):
+    """Update the allele index if the genotype of a fly stock was modified
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: FlyStock
+
+    Returns
+    -------
+    None
+    """
+
+    state = inspect(target)
+    fields = FlyStock.genotype_fields()
+
+    if any(state.attrs[field].history.has_changes() for field in fields):
+        genotype = {field: getattr(target, field) for field in fields}
+        FlyStock.index_alleles(connection, target.id, genotype)
+
+
+@event.listens_for(FlyStock, "after_delete")
+def unindex_fly_stock(_mapper: Mapper, connection: Connection, target: FlyStock):
+    """Remove a deleted fly stock from the allele index
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    connection: Connection
+    target: FlyStock
+
+    Returns
+    -------
+    None
+    """
+
+    FlyStock.index_alleles(connection, target.id, None)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def reindex_bulk_updated_entities(state: ORMExecuteState):
+    """Update the search index, the seed index, and the allele index for entities
+    modified by a bulk UPDATE
+
+    Bulk UPDATEs by primary key do not trigger mapper or flush events, so the
+    indices would miss changes by, for instance, updating imports.
+
+    Parameters
+    ----------
+    state: ORMExecuteState
+
+    Returns
+    -------
+    Result
+        The result of the statement if it was a bulk UPDATE of entities.
+    """
+
+    if not state.is_update or state.bind_mapper is None:
+        return None
+
+    if not state.bind_mapper.isa(inspect(BaseEntity)):
+        return None
+
+    if not isinstance(params := state.parameters, list):
+        return None
+
+    result = state.invoke_statement()
+    connection = state.session.connection()
+
+    BaseEntity.index_search(connection, [row["id"] for row in params])
+
+    if state.bind_mapper is inspect(Oligonucleotide):
+        for row in params:
+            if "sequence" in row:
+                Oligonucleotide.index_seeds(connection, row["id"], row["sequence"])
+
+    if state.bind_mapper is inspect(FlyStock):
+        fields = FlyStock.genotype_fields()
+        ids = [row["id"] for row in params if not set(fields).isdisjoint(row)]
+        columns = [getattr(FlyStock, field) for field in fields]
+
+        # Updates might contain only some chromosomes, so the genotype is read back.
+        for id_, *values in connection.execute(
+            select(FlyStock.id, *columns).where(FlyStock.id.in_(ids))
+        ):
+            FlyStock.index_alleles(connection, id_, dict(zip(fields, values)))
+
+    return result
+
+
 @event.listens_for(ColumnMapping, "before_update")
 def update_import_job(_mapper, _connection, target: ColumnMapping) -> None:
     """Automatically update the `timestamp_edited` for of an `ImportJob`
@@ -94,6 +277,120 @@ def add_default_user_group(session: Session, _flush_context, _instances):
             obj.groups.append(user_group)
 
 
+@event.listens_for(db.session, "after_flush")
+def count_entities(session: Session, _flush_context):
+    """Update the number of rows of each entity type in `EntityCount`
+
+    Parameters
+    ----------
+    session: Session
+    _flush_context
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The counts are updated within the same transaction as the flushed rows. Thus,
+    they are rolled back together with the rows. Rows inserted or deleted with bulk
+    statements or by the database itself are not counted.
+    """
+
+    counts = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, EntityCount.COUNTED):
+            counts[EntityCount.key(type(obj))] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, EntityCount.COUNTED):
+            counts[EntityCount.key(type(obj))] -= 1
+
+    if counts := {key: delta for key, delta in counts.items() if delta}:
+        EntityCount.add(session.connection(), counts)
+
+
+@event.listens_for(db.session, "after_flush")
+def index_entities(session: Session, _flush_context):
+    """Update the full-text index for flushed entities and comments
+
+    Parameters
+    ----------
+    session: Session
+    _flush_context
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Entities are only re-indexed if they are new, deleted, or if any of their
+    searchable columns changed. Adding, changing, or deleting a comment re-indexes
+    the commented entity.
+    """
+
+    ids = set()
+
+    for obj in session.new | session.deleted:
+        if isinstance(obj, BaseEntity):
+            ids.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, BaseEntity):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in obj.searchable_fields()):
+                ids.add(obj.id)
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Comment):
+            ids.add(obj.entity_id)
+            ids.update(inspect(obj).attrs.entity_id.history.deleted)
+
+    BaseEntity.index_search(session.connection(), ids - {None})
+
+
+@event.listens_for(User.groups, "append")
+@event.listens_for(User.groups, "remove")
+@event.listens_for(Group.permissions, "append")
+@event.listens_for(Group.permissions, "remove")
+def invalidate_access_on_change(_target, _value, _initiator) -> None:
+    """Invalidate cached permissions of users when memberships or permissions change
+
+    Parameters
+    ----------
+    _target
+    _value
+    _initiator
+
+    Returns
+    -------
+    None
+    """
+
+    invalidate_access()
+
+
+@event.listens_for(Group, "after_delete")
+@event.listens_for(Permission, "after_delete")
+def invalidate_access_on_delete(_mapper: Mapper, _connection: Connection, _target) -> None:
+    """Invalidate cached permissions of users when a group or permission is deleted
+
+    Parameters
+    ----------
+    _mapper: Mapper
+    _connection: Connection
+    _target: Group | Permission
+
+    Returns
+    -------
+    None
+    """
+
+    invalidate_access()
+
+
 @event.listens_for(Group, "before_delete")
 def protect_standard_groups(_mapper: Mapper, _connection: Connection, target: Group):
     """Prevent groups `admin` and `user` from being deleted
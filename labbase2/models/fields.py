@@ -12,6 +12,7 @@ class CustomDate(TypeDecorator):
     """A date type that accepts both date objects and str in ISO format"""
 
     impl = db.Date
+    cache_ok = True
 
     @property
     def python_type(self) -> Type[Any]:
@@ -70,6 +71,7 @@ class SequenceString(TypeDecorator):
     """A str type that processes DNA/RNA sequences properly"""
 
     impl = db.String
+    cache_ok = True
 
     @property
     def python_type(self) -> Type[Any]:
@@ -1,14 +1,15 @@
-import math
 import mimetypes
+import shutil
+import uuid
 from datetime import datetime
-from functools import partial
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
 
 import pandas as pd
 from flask import current_app
 from flask_login import current_user
-from skimage import io, util
-from skimage.transform import resize  # pylint: disable=no-name-in-module
+from openpyxl import load_workbook
+from PIL import Image, ImageOps
 from sqlalchemy import DateTime, ForeignKey, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -135,46 +136,147 @@ class BaseFile(db.Model):
 
         return filename
 
-    def resize(self, longest: int):
-        """Resize the image in place if the file holds an image
+    @property
+    def derivative_path(self) -> Path:
+        """A Path pointing to the directory with the downscaled copies of the image"""
+
+        return Path(
+            current_app.instance_path,
+            current_app.config["UPLOAD_FOLDER"],
+            "derivatives",
+            f"{self.id:07d}",
+        )
+
+    def derivative(self, size: str) -> Path:
+        """Get a downscaled copy of the image and create it if necessary
 
         Parameters
         ----------
-        longest: int
-            The number of pixels along the long side of the image.
+        size: str
+            The name of a size in `DERIVATIVE_SIZES`.
 
         Returns
         -------
-        None
+        Path
+            The path of the downscaled copy. The copy is created again if the file
+            was modified after the copy was created.
+
+        Raises
+        ------
+        ValueError
+            If the file is not an image or the size is unknown.
         """
 
-        if not self.type_ == "image":
-            return
+        if self.type_ != "image":
+            raise ValueError("File is not an image!")
 
-        img = io.imread(self.path)
-        height, width, _ = img.shape
+        if (longest := current_app.config["DERIVATIVE_SIZES"].get(size)) is None:
+            raise ValueError(f"Unknown size '{size}'!")
 
-        if width <= longest and height <= longest:
-            return
+        modified = self.path.stat().st_mtime
+
+        for path in self.derivative_path.glob(f"{size}.*"):
+            if path.stat().st_mtime >= modified:
+                return path
+
+        return self._create_derivatives({size: longest})[size]
+
+    def create_derivatives(self) -> dict[str, Path]:
+        """Create downscaled copies of the image in all sizes of `DERIVATIVE_SIZES`
+
+        Returns
+        -------
+        dict[str, Path]
+            The path of the copy of each size. Files that are no images have no
+            copies.
 
-        if width > height:
-            height = math.ceil(height / width * longest)
-            width = longest
+        Notes
+        -----
+        The image is decoded only once. The original file is not modified.
+        """
+
+        if self.type_ != "image":
+            return {}
+
+        return self._create_derivatives(current_app.config["DERIVATIVE_SIZES"])
+
+    def _create_derivatives(self, sizes: dict[str, int]) -> dict[str, Path]:
+        self.derivative_path.mkdir(parents=True, exist_ok=True)
+        paths = {}
+
+        with Image.open(self.path) as original:
+            # Let the decoder downscale while decoding if the format supports it,
+            # e.g., JPEGs are decoded at 1/2, 1/4, or 1/8 of their size.
+            largest = max(sizes.values())
+            original.draft(None, (largest, largest))
+
+            image = ImageOps.exif_transpose(original)
+
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                transparent = image.mode in ("PA", "RGBa", "La") or "transparency" in image.info
+                image = image.convert("RGBA" if transparent else "RGB")
+
+            # Each size is reduced from the next larger one.
+            for size, longest in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+                image.thumbnail((longest, longest), reducing_gap=2.0)
+                paths[size] = self._save_derivative(image, size)
+
+        return paths
+
+    def _save_derivative(self, image: Image.Image, size: str) -> Path:
+        if image.mode in ("RGBA", "LA"):
+            path, options = self.derivative_path / f"{size}.png", {"format": "PNG"}
         else:
-            width = math.ceil(width / height * longest)
-            height = longest
+            path, options = self.derivative_path / f"{size}.jpg", {"format": "JPEG", "quality": 85}
+
+        # Write to a temporary file first so that concurrent requests never read an
+        # incomplete copy.
+        temporary = path.with_name(f"{uuid.uuid4().hex}.tmp")
+
+        try:
+            image.save(temporary, **options)
+            temporary.replace(path)
+        finally:
+            temporary.unlink(missing_ok=True)
+
+        for other in self.derivative_path.glob(f"{size}.*"):
+            if other != path:
+                other.unlink(missing_ok=True)
 
-        resized = resize(img, (height, width), anti_aliasing=True)
+        return path
 
-        io.imsave(self.path, util.img_as_ubyte(resized))
+    @property
+    def cache_path(self) -> Path:
+        """A Path pointing to the directory with the parsed table of the file on disc"""
+
+        return Path(
+            current_app.instance_path,
+            current_app.config["UPLOAD_FOLDER"],
+            "cache",
+            f"{self.id:07d}",
+        )
 
-    def read_table(self) -> pd.DataFrame:
+    def read_table(
+        self, cached: bool = True, chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """Read a file and return a Pandas DataFrame is applicable
 
+        Parameters
+        ----------
+        cached: bool
+            Use the parsed table from a previous call if the file was not modified
+            since. The parsed table is stored as pickled DataFrames, which are much
+            faster to read than CSV or Excel files. Defaults to `True`.
+        chunksize: Optional[int]
+            If given, return an iterator over DataFrames of at most this many rows
+            instead of a single DataFrame. The file is then never loaded as a whole.
+            The index of the DataFrames continues across chunks.
+
         Returns
         -------
-        pd.DataFrame
-            A Pandas DataFrame holding the data from the file.
+        Union[pd.DataFrame, Iterator[pd.DataFrame]]
+            A Pandas DataFrame holding the data from the file or an iterator over
+            chunks of the data if `chunksize` is given.
 
         Raises
         ------
@@ -182,15 +284,48 @@ class BaseFile(db.Model):
             If the file is not supported file format.
         """
 
-        match self.path.suffix:
-            case ".csv":
-                read_fnc = pd.read_csv
-            case ".xls" | ".xlsx":
-                read_fnc = partial(pd.read_excel, engine="openpyxl")
-            case _:
-                raise ValueError("File is not a supported format!")
+        if self.path.suffix not in (".csv", ".xls", ".xlsx"):
+            raise ValueError("File is not a supported format!")
+
+        if chunksize is not None:
+            return self._read_chunks(cached, chunksize)
+
+        chunks = list(self._read_chunks(cached, current_app.config["IMPORT_CHUNK_SIZE"]))
+
+        return pd.concat(chunks) if chunks else pd.DataFrame()
+
+    def _read_chunks(self, cached: bool, chunksize: int) -> Iterator[pd.DataFrame]:
+        complete = self.cache_path / "complete"
+
+        if cached and complete.exists() and complete.stat().st_mtime >= self.path.stat().st_mtime:
+            chunks = (pd.read_pickle(path) for path in sorted(self.cache_path.glob("*.pkl")))
+            yield from _rechunk(chunks, chunksize)
+            return
+
+        if self.path.suffix == ".csv":
+            chunks = pd.read_csv(self.path, chunksize=chunksize)
+        else:
+            chunks = _read_excel_chunks(self.path, chunksize)
+
+        if not cached:
+            yield from chunks
+            return
+
+        # Write the cache to a temporary directory first so that concurrent or
+        # aborted reads never leave an incomplete cache behind.
+        temporary = self.cache_path.with_name(f"{self.cache_path.name}-{uuid.uuid4().hex}")
+        temporary.mkdir(parents=True)
+
+        try:
+            for i, chunk in enumerate(chunks):
+                chunk.to_pickle(temporary / f"{i:06d}.pkl")
+                yield chunk
 
-        return read_fnc(self.path)
+            (temporary / "complete").touch()
+            shutil.rmtree(self.cache_path, ignore_errors=True)
+            temporary.rename(self.cache_path)
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
 
 
 class EntityFile(BaseFile):
@@ -210,3 +345,66 @@ class EntityFile(BaseFile):
     entity_id: Mapped[int] = mapped_column(ForeignKey("base_entity.id"), nullable=False)
 
     __mapper_args__ = {"polymorphic_identity": "entity_file"}
+
+
+def _rechunk(chunks: Iterable[pd.DataFrame], chunksize: int) -> Iterator[pd.DataFrame]:
+    buffer = pd.DataFrame()
+
+    for chunk in chunks:
+        buffer = pd.concat([buffer, chunk]) if len(buffer) else chunk
+
+        while len(buffer) >= chunksize:
+            yield buffer.iloc[:chunksize]
+            buffer = buffer.iloc[chunksize:]
+
+    if len(buffer):
+        yield buffer
+
+
+def _read_excel_chunks(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    # In read-only mode, openpyxl returns every cell that is formatted, even if it is
+    # empty. Empty rows and, like pandas, trailing empty columns without a header are
+    # skipped.
+    workbook = load_workbook(path, read_only=True, data_only=True)
+
+    try:
+        sheet = workbook.active
+        rows = (row for row in sheet.iter_rows(values_only=True) if not _is_empty(row))
+
+        if (header := next(rows, None)) is None:
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+
+        width = len(header)
+        while width and header[width - 1] is None:
+            width -= 1
+
+        # Only if the header has trailing empty cells the sheet is read twice to find
+        # the last column with any value.
+        if width < len(header):
+            for row in sheet.iter_rows(values_only=True):
+                width = max([width] + [i + 1 for i, value in enumerate(row) if value is not None])
+
+        columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+        columns = columns[:width]
+        start, batch = 0, []
+
+        for row in rows:
+            if _is_empty(row := row[:width]):
+                continue
+
+            batch.append(row)
+
+            if len(batch) == chunksize:
+                index = range(start, start + len(batch))
+                yield pd.DataFrame(batch, columns=columns, index=index).infer_objects()
+                start, batch = start + len(batch), []
+
+        if batch:
+            index = range(start, start + len(batch))
+            yield pd.DataFrame(batch, columns=columns, index=index).infer_objects()
+    finally:
+        workbook.close()
+
+
+def _is_empty(row: tuple) -> bool:
+    return all(value is None for value in row)
@@ -1,7 +1,23 @@
+import re
 from datetime import date
+from typing import ClassVar, Iterable, Optional
 
-from sqlalchemy import ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Column,
+    Connection,
+    ForeignKey,
+    Index,
+    String,
+    and_,
+    delete,
+    distinct,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 
 from labbase2.database import db
 from labbase2.models.base_entity import BaseEntity
@@ -11,6 +27,15 @@ from labbase2.models.mixins.importer import Importer
 __all__ = ["Modification", "FlyStock"]
 
 
+fly_stock_allele = db.Table(
+    "fly_stock_allele",
+    Column("allele", String(256), primary_key=True),
+    Column("chromosome", String(1), primary_key=True),
+    Column("fly_stock_id", ForeignKey("fly_stock.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_fly_stock_allele_fly_stock_id", "fly_stock_id"),
+)
+
+
 class Modification(db.Model, Importer):
     """
     Information about modification of fly stocks. This should be things
@@ -82,34 +107,34 @@ class FlyStock(BaseEntity):
         ForeignKey("base_entity.id"), primary_key=True, info={"importable": False}
     )
     short_genotype: Mapped[str] = mapped_column(
-        String(2048), nullable=True, info={"importable": True}
+        String(2048), nullable=True, info={"importable": True, "searchable": True}
     )
     chromosome_xa: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_xb: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_y: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_2a: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_2b: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_3a: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_3b: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_4a: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     chromosome_4b: Mapped[str] = mapped_column(
-        String(2048), nullable=False, default="+", info={"importable": True}
+        String(2048), nullable=False, default="+", info={"importable": True, "searchable": True}
     )
     location: Mapped[str] = mapped_column(String(64), nullable=True, info={"importable": True})
     created_date: Mapped[date] = mapped_column(CustomDate, nullable=True, info={"importable": True})
@@ -130,10 +155,209 @@ class FlyStock(BaseEntity):
     # Proper setup for joined table inheritance.
     __mapper_args__ = {"polymorphic_identity": "fly_stock"}
 
+    # The genotype columns of each chromosome.
+    chromosomes: ClassVar[dict[str, tuple[str, ...]]] = {
+        "x": ("chromosome_xa", "chromosome_xb"),
+        "y": ("chromosome_y",),
+        "2": ("chromosome_2a", "chromosome_2b"),
+        "3": ("chromosome_3a", "chromosome_3b"),
+        "4": ("chromosome_4a", "chromosome_4b"),
+    }
+
+    @classmethod
+    def genotype_fields(cls) -> list[str]:
+        """Get the names of all genotype columns
+
+        Returns
+        -------
+        list[str]
+            The names of the columns of all chromosomes.
+        """
+
+        return [field for fields in cls.chromosomes.values() for field in fields]
+
+    @staticmethod
+    def alleles(genotype: Optional[str]) -> set[str]:
+        """Split the genotype of a single chromosome into alleles
+
+        Parameters
+        ----------
+        genotype: Optional[str]
+            The genotype of a chromosome. Alleles are separated by commas,
+            semicolons, or whitespaces.
+
+        Returns
+        -------
+        set[str]
+            The lowercase alleles. Wildtype ('+') is omitted. For transgenic
+            constructs like 'P{w[+mC]=UAS-GFP}attP2' the inserted construct, here
+            'uas-gfp', is included as well.
+        """
+
+        alleles = set()
+
+        for allele in re.split(r"[,;\s]+", (genotype or "").lower()):
+            if not allele or allele == "+":
+                continue
+
+            alleles.add(allele[:256])
+            alleles.update(c[:256] for c in re.findall(r"\{(?:[^{}=]*=)?([^{}]+)\}", allele))
+
+        return alleles
+
+    @classmethod
+    def carrying(cls, alleles: Iterable[str], chromosome: Optional[str] = None) -> list:
+        """Create filters for fly stocks carrying all of some alleles
+
+        Parameters
+        ----------
+        alleles: Iterable[str]
+            The alleles. The alleles are not case-sensitive.
+        chromosome: Optional[str]
+            The chromosome ('x', 'y', '2', '3', or '4') that has to carry the
+            alleles. Defaults to `None`, i.e., any chromosome.
+
+        Returns
+        -------
+        list
+            A list of filters that can be passed to `Select.where`. The filters are
+            answered from the allele index.
+        """
+
+        alleles = {allele.strip().lower() for allele in alleles if allele.strip()}
+
+        if not alleles:
+            return []
+
+        query = select(fly_stock_allele.c.fly_stock_id).where(
+            fly_stock_allele.c.allele.in_(alleles)
+        )
+
+        if chromosome is not None:
+            query = query.where(fly_stock_allele.c.chromosome == chromosome.lower())
+
+        query = query.group_by(fly_stock_allele.c.fly_stock_id).having(
+            func.count(distinct(fly_stock_allele.c.allele)) == len(alleles)
+        )
+
+        return [cls.id.in_(query)]
+
+    @classmethod
+    def index_alleles(
+        cls,
+        connection: Connection,
+        id_: int,
+        genotype: Optional[dict[str, Optional[str]]],
+        replace: bool = True,
+    ) -> None:
+        """Update the allele index for a single fly stock.
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with. This allows using the
+            method from within mapper events.
+        id_: int
+            The ID of the fly stock.
+        genotype: Optional[dict[str, Optional[str]]]
+            The values of the genotype columns of the fly stock. If `None`, the fly
+            stock is only removed from the index.
+        replace: bool
+            Remove existing alleles of the fly stock first. Defaults to `True`.
+
+        Returns
+        -------
+        None
+        """
+
+        if replace:
+            connection.execute(
+                delete(fly_stock_allele).where(fly_stock_allele.c.fly_stock_id == id_)
+            )
+
+        if genotype:
+            cls._insert_alleles(connection, [(id_, genotype)])
+
+    @classmethod
+    def build_allele_index(cls) -> None:
+        """Rebuild the allele index for all fly stocks.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The changes are not committed automatically to the database.
+        """
+
+        fields = cls.genotype_fields()
+        columns = [getattr(cls, field) for field in fields]
+
+        connection = db.session.connection()
+        connection.execute(delete(fly_stock_allele))
+        cls._insert_alleles(
+            connection,
+            (
+                (id_, dict(zip(fields, values)))
+                for id_, *values in connection.execute(select(cls.id, *columns))
+            ),
+        )
+
+    @classmethod
+    def allele_index_outdated(cls) -> bool:
+        """Check if the allele index has to be rebuilt.
+
+        Returns
+        -------
+        bool
+            `True` if any fly stock with at least one allele is missing from the
+            index, `False` otherwise.
+
+        Notes
+        -----
+        Genotypes like ';' or '+,+' have no alleles and thus no rows in the index.
+        Fly stocks that are not indexed are therefore split with `alleles` as well.
+        """
+
+        columns = [getattr(cls, field) for field in cls.genotype_fields()]
+
+        mutant = or_(*[and_(column.is_not(None), column.not_in(["", "+"])) for column in columns])
+        unindexed = (
+            select(*columns)
+            .where(mutant)
+            .where(~exists().where(fly_stock_allele.c.fly_stock_id == cls.id))
+        )
+
+        return any(
+            cls.alleles(genotype) for row in db.session.execute(unindexed) for genotype in row
+        )
+
+    @classmethod
+    def _insert_alleles(
+        cls, connection: Connection, rows: Iterable[tuple[int, dict[str, Optional[str]]]]
+    ) -> None:
+        values = [
+            {"allele": allele, "chromosome": chromosome, "fly_stock_id": id_}
+            for id_, genotype in rows
+            for chromosome, fields in cls.chromosomes.items()
+            for allele in set().union(*[cls.alleles(genotype.get(field)) for field in fields])
+        ]
+
+        if values:
+            connection.execute(insert(fly_stock_allele), values)
+
     @classmethod
     def _filters(cls, **fields) -> list:
         filters = []
 
+        if alleles := fields.pop("alleles", None):
+            filters += cls.carrying(re.split(r"[,;\s]+", alleles))
+
+        for chromosome in cls.chromosomes:
+            if alleles := fields.pop(f"chromosome_{chromosome}", None):
+                filters += cls.carrying(re.split(r"[,;\s]+", alleles), chromosome)
+
         match fields.pop("discarded", "all"):
             case "discarded":
                 filters.append(cls.discarded_date.isnot(None))
@@ -143,3 +367,7 @@ class FlyStock(BaseEntity):
                 pass
 
         return super()._filters(**fields) + filters
+
+    @classmethod
+    def _options(cls) -> tuple:
+        return (selectinload(cls.owner),)
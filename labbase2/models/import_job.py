@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Type
+from typing import Callable, ClassVar, Iterator, Optional, Type
 
-from sqlalchemy import DateTime, ForeignKey, func, select
+import pandas as pd
+from flask import current_app
+from sqlalchemy import JSON, DateTime, ForeignKey, String, func, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from labbase2 import models
@@ -22,6 +25,30 @@ class ImportJob(db.Model):
     file_id: int
     is_finished: bool
     entity_type: str
+    status: str
+        The state of the import. One of 'created', 'queued', 'validating', 'running',
+        'done', and 'failed'.
+    processed: int
+        The number of imported rows once the import is done.
+    failed: int
+        The number of rows that could not be imported once the import is done.
+    report: list[tuple[str, str]]
+        The label and the reason for each row that could not be imported. If the
+        validation failed, the row number and the message of each problem.
+    message: str
+        The error message if the import failed.
+    mode: str
+        Either 'insert' to add all rows as new entities or 'upsert' to update
+        existing entities and add the remaining rows. Existing entities are
+        identified by their ID if the 'id' field is mapped and by their label
+        otherwise.
+    worker: str
+        The host and process ID of the process that executes the import.
+    heartbeat: datetime
+        The last time the executing process reported that it is alive.
+    committed_rows: int
+        The number of rows of the file in committed chunks. Executing a failed
+        import again continues after these rows.
     mappings: list[ColumnMapping]
     file: BaseFile
     """
@@ -43,6 +70,18 @@ class ImportJob(db.Model):
     file_id: Mapped[int] = mapped_column(ForeignKey("base_file.id"), nullable=False)
     is_finished: Mapped[bool] = mapped_column(default=False, nullable=False)
     entity_type: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="created")
+    processed: Mapped[int] = mapped_column(nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(nullable=False, default=0)
+    report: Mapped[list] = mapped_column(JSON, nullable=True)
+    message: Mapped[str] = mapped_column(String(512), nullable=True)
+    mode: Mapped[str] = mapped_column(String(16), nullable=False, default="insert")
+    worker: Mapped[str] = mapped_column(String(128), nullable=True)
+    heartbeat: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    committed_rows: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    # The states of imports that are executed by some process.
+    ACTIVE: ClassVar[tuple[str, ...]] = ("queued", "validating", "running")
 
     # One-to-many relationships.
     mappings: Mapped[list["ColumnMapping"]] = relationship(
@@ -69,10 +108,191 @@ class ImportJob(db.Model):
             )
         ).all()
 
+        if not mappings:
+            return [], []
+
         fields, columns = zip(*mappings)
 
         return list(fields), list(columns)
 
+    def validate(self, mode: Optional[str] = None) -> list[tuple[Optional[int], str]]:
+        """Check the file and the mapping before importing anything.
+
+        Parameters
+        ----------
+        mode: Optional[str]
+            The mode of the import to check for. Defaults to the mode of the job.
+
+        Returns
+        -------
+        list[tuple[Optional[int], str]]
+            A list of errors. Each error is given as a tuple of the row number
+            (starting at 1) and a message. Errors concerning the whole file have a row
+            number of `None`. The list is empty if the file can be imported.
+        """
+
+        entity_class = self.class_
+        fields, columns = self.get_mapping()
+        update = (mode or self.mode) == "upsert"
+
+        missing = [
+            (None, f"'{field}' is required but not mapped to any column.")
+            for field in entity_class.required_fields()
+            if field not in fields
+        ]
+        errors, seen = [], {}
+
+        for i, table in enumerate(self._read_chunks(mapped=False, skip=self.committed_rows)):
+            if i == 0:
+                errors += [
+                    (None, f"Column '{column}' does not exist in the file.")
+                    for column in columns
+                    if column not in table.columns
+                ]
+                errors += missing
+
+                if "id" in fields and not update:
+                    errors.append((None, "'id' can only be mapped when updating entities."))
+
+                if errors:
+                    return errors
+
+            table = table[columns]  # Reorder columns in the imported file.
+            table.columns = fields  # Rename the columns in the file to match the db fields.
+
+            errors += entity_class.validate_table(table, seen=seen, update=update)
+
+        if not errors:  # The file has no rows at all.
+            errors += missing
+
+        return errors
+
+    def run(self, chunk_size: Optional[int] = None) -> tuple[int, list[tuple[str, str]]]:
+        """Import all rows of the file into the database.
+
+        Parameters
+        ----------
+        chunk_size: Optional[int]
+            The number of rows inserted at once. Defaults to `IMPORT_CHUNK_SIZE` from
+            the config.
+
+        Returns
+        -------
+        tuple[int, list[tuple[str, str]]]
+            The number of imported rows and a list of rows that could not be imported.
+            Each failed row is given as a tuple of its label and the reason.
+
+        Notes
+        -----
+        Each chunk is committed together with the number of imported and failed rows
+        so far in `processed` and `failed`, so the progress can be read by any
+        process. The failed rows so far are committed in `report` and the number of
+        rows in committed chunks in `committed_rows`. If the import is interrupted,
+        running it again skips these rows and continues the counts and the report,
+        so no row is imported twice. Each chunk is flushed inside a savepoint first. If a chunk fails,
+        its rows are inserted one by one, each inside its own savepoint, to find the
+        failing rows. The file is read chunk by chunk, so it is never loaded as a
+        whole.
+
+        In 'upsert' mode, existing entities of a chunk are looked up with a single
+        query and updated with a single bulk UPDATE.
+        """
+
+        entity_class = self.class_
+
+        if self.committed_rows:
+            imported, failed = self.processed, [tuple(row) for row in self.report or []]
+        else:
+            imported, failed = 0, []
+
+        for table in self._read_chunks(chunk_size, skip=self.committed_rows):
+            chunk = entity_class.normalize_table(table).to_dict("records")
+
+            if self.mode == "upsert":
+                key = "id" if "id" in table.columns else "label"
+                inserts, updates = entity_class.partition_records(chunk, key=key)
+            else:
+                inserts, updates = chunk, []
+
+            try:
+                with db.session.begin_nested():
+                    db.session.add_all(self._create_entity(row) for row in inserts)
+
+                    if updates:
+                        db.session.execute(update(entity_class), updates)
+            except SQLAlchemyError:
+                pass
+            else:
+                imported += len(chunk)
+                self._commit_progress(imported, failed, table.index[-1] + 1)
+                continue
+
+            # The savepoint was rolled back, so isolate the failing rows.
+            for row in inserts:
+                entity = self._create_entity(row)
+                imported += self._write_row(entity.label, failed, db.session.add, entity)
+
+            for params in updates:
+                label = params.get("label", params["id"])
+                imported += self._write_row(
+                    label, failed, db.session.execute, update(entity_class), [params]
+                )
+
+            self._commit_progress(imported, failed, table.index[-1] + 1)
+
+        db.session.commit()
+
+        return imported, failed
+
+    def _commit_progress(self, imported: int, failed: list[tuple[str, str]], rows: int) -> None:
+        self.processed = imported
+        self.failed = len(failed)
+        self.report = list(failed)
+        self.committed_rows = int(rows)
+        self.heartbeat = datetime.now()
+        db.session.commit()
+
+    def _read_chunks(
+        self, chunk_size: Optional[int] = None, mapped: bool = True, skip: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        if chunk_size is None:
+            chunk_size = current_app.config["IMPORT_CHUNK_SIZE"]
+
+        fields, columns = self.get_mapping()
+
+        for table in self.file.read_table(chunksize=chunk_size):
+            # The index continues across chunks, so rows are skipped by their index.
+            if skip and (table := table[table.index >= skip]).empty:
+                continue
+
+            if mapped:
+                table = table[columns]  # Reorder columns in the imported file.
+                table.columns = fields  # Rename the columns in the file to match the db fields.
+
+            yield table
+
+    @staticmethod
+    def _write_row(label, failed: list, fnc: Callable, *args) -> int:
+        try:
+            with db.session.begin_nested():
+                fnc(*args)
+        except IntegrityError as error:
+            current_app.logger.info("Integrity error during import: %s", error)
+            failed.append((label, "integrity error"))
+        except SQLAlchemyError as error:
+            current_app.logger.info("Unknown error during import: %s", error)
+            failed.append((label, "unknown error"))
+        else:
+            return 1
+
+        return 0
+
+    def _create_entity(self, record: dict) -> models.BaseEntity:
+        record = {k: v for k, v in record.items() if v is not None and k != "id"}
+        record = {"owner_id": self.user_id} | record
+
+        return self.class_(origin="Imported from file.", **record)
+
     @property
     def class_(self) -> Type[models.BaseEntity]:
         """Get the model class for which entities shall be imported
@@ -1,10 +1,23 @@
+import csv
 import io
-from datetime import date
-from typing import Union
+import json
+import textwrap
+from datetime import date, datetime
+from typing import Any, Iterator, Union
 
 import pandas as pd
-from flask import send_file
-from sqlalchemy import Select, inspect
+from flask import Response, send_file, stream_with_context
+from sqlalchemy import (
+    JSON,
+    ColumnElement,
+    Select,
+    func,
+    inspect,
+    literal_column,
+    select,
+    type_coerce,
+)
+from sqlalchemy.orm import ColumnProperty
 
 from labbase2.database import db
 
@@ -14,6 +27,8 @@ __all__ = ["Export"]
 class Export:
     """A mixin for exporting instances to CSV, JSON, ...."""
 
+    export_chunk_size: int = 1000
+
     def to_dict(self) -> dict:
         """Create a dictionary from the object.
 
@@ -21,11 +36,76 @@ class Export:
         -------
         dict
             A dictionary. The keys are exactly labeled like the attributes of the
-            instance.
+            instance except for column properties tagged as not exportable. Related
+            instances listed by `_export_relationships` are added as lists of
+            dictionaries.
+        """
+
+        as_dict = {c.key: getattr(self, c.key) for c in self._export_columns()}
+
+        for name in self._export_relationships():
+            as_dict[name] = [i.to_dict() for i in getattr(self, name)]
+
+        return as_dict
+
+    @classmethod
+    def export_select(cls, instances: Select) -> Select:
+        """Project a query onto the columns to export.
+
+        Parameters
+        ----------
+        instances: Select
+            A query for instances of this class, for instance, as returned by
+            `filter_`.
+
+        Returns
+        -------
+        Select
+            A query with the same filters, joins, and order that selects the columns
+            of this class instead of instances. Related instances listed by
+            `_export_relationships` are aggregated into one JSON array per row by
+            correlated subqueries. Thus, exporting all rows takes a single query.
         """
 
-        inst = inspect(self).mapper.column_attrs
-        return {c.key: getattr(self, c.key) for c in inst}
+        columns = [getattr(cls, c.key) for c in cls._export_columns()]
+
+        for name in cls._export_relationships():
+            columns.append(cls._aggregate(name).label(name))
+
+        return instances.with_only_columns(*columns)
+
+    @classmethod
+    def _export_columns(cls) -> list[ColumnProperty]:
+        # Column properties like counts computed by correlated subqueries are tagged
+        # as not exportable.
+        return [c for c in inspect(cls).column_attrs if c.info.get("exportable", True)]
+
+    @classmethod
+    def _export_relationships(cls) -> tuple[str, ...]:
+        return ()
+
+    @classmethod
+    def _aggregate(cls, name: str) -> ColumnElement:
+        relationship = inspect(cls).relationships[name]
+        target = relationship.mapper
+
+        pairs = []
+        for column in target.column_attrs:
+            pairs += [literal_column(f"'{column.key}'"), getattr(target.class_, column.key)]
+
+        match db.engine.dialect.name:
+            case "postgresql":
+                array = func.coalesce(
+                    func.json_agg(func.json_build_object(*pairs)), literal_column("'[]'::json")
+                )
+            case "mysql" | "mariadb":
+                array = func.coalesce(
+                    func.json_arrayagg(func.json_object(*pairs)), func.json_array()
+                )
+            case _:
+                array = func.json_group_array(func.json_object(*pairs))
+
+        return select(type_coerce(array, JSON)).where(relationship.primaryjoin).scalar_subquery()
 
     @classmethod
     def to_df(cls, instances: Union[list[db.Model], Select]) -> pd.DataFrame:
@@ -52,55 +132,93 @@ class Export:
         return cls.__name__ + "_" + date.today().isoformat()
 
     @classmethod
-    def export_to_csv(cls, instances: list[db.Model]):
+    def export_to_csv(cls, instances: Union[list[db.Model], Select]) -> Response:
         """Export a list of database model instances to CSV
 
         Parameters
         ----------
-        instances: list[db.Model]
+        instances: Union[list[db.Model], Select]
 
 
         Returns
         -------
-        None
+        Response
+            A streamed response for downloading the CSV file. The rows are written
+            while the instances are fetched from the database. A query is exported
+            through `export_select` without loading any instances.
         """
 
-        with io.StringIO() as proxy:
-            cls.to_df(instances).to_csv(proxy)
-            mem = io.BytesIO(proxy.getvalue().encode("utf-8"))
+        def generate() -> Iterator[str]:
+            proxy = io.StringIO()
+            writer = csv.writer(proxy)
 
-        return send_file(
-            mem,
-            as_attachment=True,
-            download_name=cls._filename() + ".csv",
-            mimetype="text/csv",
-        )
+            for i, row in enumerate(cls._iter_dicts(instances)):
+                if i == 0:
+                    writer.writerow([""] + list(row))
+                writer.writerow([i] + list(row.values()))
+
+                yield proxy.getvalue()
+
+                proxy.seek(0)
+                proxy.truncate()
+
+        return cls._stream(generate(), ".csv", "text/csv")
 
     @classmethod
-    def export_to_json(cls, instances):
+    def export_to_json(cls, instances: Union[list[db.Model], Select]) -> Response:
         """Export a list of database model instances to JSON
 
         Parameters
         ----------
-        instances: list[db.Model]
+        instances: Union[list[db.Model], Select]
 
 
         Returns
         -------
-        None
+        Response
+            A streamed response for downloading the JSON file. The records are
+            written while the instances are fetched from the database. A query is
+            exported through `export_select` without loading any instances.
         """
 
-        with io.StringIO() as proxy:
-            cls.to_df(instances).to_json(proxy, orient="records", date_format="iso", indent=2)
-            mem = io.BytesIO(proxy.getvalue().encode("utf-8"))
+        def generate() -> Iterator[str]:
+            yield "["
 
-        return send_file(
-            mem,
-            as_attachment=True,
-            download_name=cls._filename() + ".json",
-            mimetype="text/json",
+            for i, row in enumerate(cls._iter_dicts(instances)):
+                record = json.dumps(row, indent=2, default=cls._json_default)
+                yield ("," if i else "") + "\n" + textwrap.indent(record, "  ")
+
+            yield "\n]"
+
+        return cls._stream(generate(), ".json", "text/json")
+
+    @classmethod
+    def _iter_dicts(cls, instances: Union[list[db.Model], Select]) -> Iterator[dict]:
+        if isinstance(instances, list):
+            for instance in instances:
+                yield instance.to_dict()
+            return
+
+        query = cls.export_select(instances).execution_options(yield_per=cls.export_chunk_size)
+
+        for row in db.session.execute(query):
+            yield row._asdict()
+
+    @classmethod
+    def _stream(cls, chunks: Iterator[str], extension: str, mimetype: str) -> Response:
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename={cls._filename()}{extension}"},
         )
 
+    @staticmethod
+    def _json_default(value: Any) -> str:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+
+        return str(value)
+
     @classmethod
     def to_pdf(cls, instances):
         """Export a list of database model instances to PDF
@@ -1,10 +1,75 @@
-from typing import Any, ClassVar
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, ClassVar, Optional
 
-from sqlalchemy import asc, desc, select
+from sqlalchemy import and_, asc, desc, or_, select
 from sqlalchemy.orm import Mapped, Mapper
 from sqlalchemy.sql.selectable import Select
 
-__all__ = ["Filter"]
+from labbase2.database import db
+
+__all__ = ["Filter", "Page"]
+
+
+class Page:
+    """A single page of results retrieved by keyset pagination
+
+    Attributes
+    ----------
+    items : list
+        The entities on this page.
+    page : int
+        The number of this page. This is only used for display since pages are
+        retrieved by cursors.
+    per_page : int
+        The maximum number of entities on a page.
+    has_prev : bool
+        Whether there are entities before this page.
+    has_next : bool
+        Whether there are entities after this page.
+    prev_cursor : Optional[str]
+        The cursor to pass as `before` to retrieve the previous page.
+    next_cursor : Optional[str]
+        The cursor to pass as `after` to retrieve the next page.
+    """
+
+    def __init__(
+        self,
+        items: list,
+        page: int,
+        per_page: int,
+        has_prev: bool,
+        has_next: bool,
+        prev_cursor: Optional[str] = None,
+        next_cursor: Optional[str] = None,
+    ):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def first(self) -> int:
+        """The position of the first entity on this page among all results"""
+
+        return (self.page - 1) * self.per_page + 1 if self.items else 0
+
+    @property
+    def last(self) -> int:
+        """The position of the last entity on this page among all results"""
+
+        return (self.page - 1) * self.per_page + len(self.items)
 
 
 class Filter:
@@ -63,6 +128,140 @@ class Filter:
             .order_by(*cls._order_by(order_by, ascending))
         )
 
+    @classmethod
+    def paginate(
+        cls,
+        query: Select,
+        order_by: str,
+        ascending: bool = True,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 100,
+    ) -> Page:
+        """Retrieve a single page of a query by keyset pagination.
+
+        Parameters
+        ----------
+        query : Select
+            A query as returned by `filter_`.
+        order_by : str
+            The column name, by which the result shall be ordered. This should be
+            the same as passed to `filter_`.
+        ascending : bool
+            Order results either ascending or descending. Defaults to `True` (
+            ascending).
+        after : Optional[str]
+            The `next_cursor` of the previous page. The page starts after the last
+            entity of the previous page.
+        before : Optional[str]
+            The `prev_cursor` of the next page. The page ends before the first
+            entity of the next page. Ignored if `after` is given.
+        page : int
+            The number of the page. Only used to display the position of the page.
+            Defaults to 1.
+        per_page : int
+            The maximum number of entities on a page. Defaults to 100.
+
+        Returns
+        -------
+        Page
+            The entities of the page and the cursors to the adjacent pages.
+
+        Notes
+        -----
+        Instead of skipping rows with an offset, the query seeks to the position
+        after (or before) the order value and ID of a cursor. Thus, retrieving a page
+        costs the same for all pages. Entities without an order value are placed
+        first if sorted ascending and last otherwise. Invalid cursors are ignored,
+        i.e., the first page is retrieved.
+        """
+
+        field = cls._order_by(order_by, ascending)[0].element
+        forward = before is None or after is not None
+
+        cursor = cls._decode_cursor(after if forward else before, field)
+        if cursor is None:
+            forward, after, before = True, None, None
+
+        # Retrieve the previous page in reversed order and flip it afterwards.
+        reverse = ascending != forward
+        order = desc if reverse else asc
+
+        query = query.order_by(None).order_by(
+            order(field.is_not(None)), order(field), order(cls.id)
+        )
+
+        if cursor is not None:
+            query = query.where(cls._seek(field, *cursor, greater=not reverse))
+
+        rows = db.session.execute(query.add_columns(field, cls.id).limit(per_page + 1)).all()
+        more = len(rows) > per_page
+        rows = rows[:per_page] if forward else rows[:per_page][::-1]
+
+        prev_cursor = next_cursor = None
+        if rows:
+            prev_cursor = cls._encode_cursor(rows[0][-2], rows[0][-1])
+            next_cursor = cls._encode_cursor(rows[-1][-2], rows[-1][-1])
+
+        return Page(
+            items=[row[0] for row in rows],
+            page=max(page, 1),
+            per_page=per_page,
+            has_prev=after is not None if forward else more,
+            has_next=more if forward else True,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+        )
+
+    @classmethod
+    def _seek(cls, field, value: Any, id_: int, greater: bool):
+        if value is None:
+            if greater:
+                return or_(field.is_not(None), and_(field.is_(None), cls.id > id_))
+            return and_(field.is_(None), cls.id < id_)
+
+        if greater:
+            return and_(field.is_not(None), or_(field > value, and_(field == value, cls.id > id_)))
+        return or_(field.is_(None), field < value, and_(field == value, cls.id < id_))
+
+    @staticmethod
+    def _encode_cursor(value: Any, id_: int) -> str:
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+
+        cursor = json.dumps([value, id_], default=str).encode()
+
+        return base64.urlsafe_b64encode(cursor).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str], field) -> Optional[tuple[Any, int]]:
+        if not cursor:
+            return None
+
+        try:
+            value, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            return None
+
+        if not isinstance(id_, int):
+            return None
+
+        try:
+            python_type = field.type.python_type
+        except NotImplementedError:
+            return value, id_
+
+        if value is None or isinstance(value, python_type):
+            return value, id_
+
+        try:
+            if python_type in (date, datetime):
+                return python_type.fromisoformat(value), id_
+            return python_type(value), id_
+        except (TypeError, ValueError):
+            return None
+
     @classmethod
     def _filters(cls, **fields) -> list:
         filters = []
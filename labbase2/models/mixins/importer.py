@@ -1,10 +1,12 @@
-from typing import ClassVar
+from datetime import date, datetime
+from typing import ClassVar, Optional
 
 import pandas as pd
 from sqlalchemy import inspect, select
 from sqlalchemy.orm import Mapped
 
 from labbase2.database import db
+from labbase2.models.fields import SequenceString
 
 __all__ = ["Importer"]
 
@@ -54,6 +56,224 @@ class Importer:
                 fields.append(column.name)
         return fields
 
+    @classmethod
+    def required_fields(cls) -> list[str]:
+        """Get a list of importable columns that have to be given for every record
+
+        Returns
+        -------
+        list[str]
+            The names of importable columns that are not nullable and have no default.
+        """
+
+        return [
+            column.name
+            for column in inspect(cls).columns
+            if column.info.get("importable", False)
+            and not column.nullable
+            and column.default is None
+            and column.server_default is None
+        ]
+
+    @classmethod
+    def normalize_table(cls, table: pd.DataFrame) -> pd.DataFrame:
+        """Convert a table of records to values that can be inserted into the database
+
+        Parameters
+        ----------
+        table: pd.DataFrame
+            A table with one record per row. The columns have to be named like the
+            columns of this class.
+
+        Returns
+        -------
+        pd.DataFrame
+            A table of the same shape with object columns. Whitespace around strings
+            is removed, sequences are uppercase without whitespace, dates are parsed
+            as `date`, and integers as `int`. Empty strings and values that can not
+            be parsed are `None`. All conversions are done column-wise.
+        """
+
+        columns = {}
+
+        for field in table.columns:
+            column = inspect(cls).columns[field]
+            values = table[field].astype(object)
+
+            # The str accessor can only be used if there is any string in the column.
+            if pd.api.types.infer_dtype(values) in ("string", "empty", "mixed", "mixed-integer"):
+                stripped = values.str.strip()
+                values = stripped.where(stripped.notna(), values).mask(stripped.eq(""))
+
+                if isinstance(column.type, SequenceString):
+                    values = values.str.replace(r"\s+", "", regex=True).str.upper()
+
+            match getattr(column.type, "python_type", None):
+                case python_type if python_type is date:
+                    values = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce").dt.date
+                case python_type if python_type is int:
+                    values = pd.to_numeric(values, errors="coerce")
+                    values = values.where(values % 1 == 0).astype("Int64")
+                case python_type if python_type is str:
+                    values = values.where(values.isna(), values.astype(str))
+
+            values = values.astype(object)
+            columns[field] = values.where(values.notna(), None)
+
+        return pd.DataFrame(columns, index=table.index, dtype=object)
+
+    @classmethod
+    def partition_records(
+        cls, records: list[dict], key: str = "label"
+    ) -> tuple[list[dict], list[dict]]:
+        """Split records into new entities and updates of existing entities
+
+        Parameters
+        ----------
+        records: list[dict]
+            Records as returned by `normalize_table`.
+        key: str
+            The column that identifies existing entities. Either 'label' or 'id'.
+            Defaults to 'label'.
+
+        Returns
+        -------
+        tuple[list[dict], list[dict]]
+            The records of new entities and the parameters for updating existing
+            entities. The parameters contain the ID of the entity, omit values that
+            are `None`, and omit columns in `not_updatable`. They can be passed to a
+            bulk UPDATE. All keys are resolved with a single query.
+
+        Notes
+        -----
+        Bulk UPDATEs do not apply `onupdate` defaults. Thus, the parameters set
+        `timestamp_edited` explicitly unless the record has a value for it.
+        """
+
+        column = getattr(cls, key)
+        keys = {record[key] for record in records if record.get(key) is not None}
+
+        if keys:
+            existing = dict(
+                db.session.execute(select(column, cls.id).where(column.in_(keys))).all()
+            )
+        else:
+            existing = {}
+
+        if "timestamp_edited" in inspect(cls).column_attrs:
+            edited = {"timestamp_edited": datetime.now()}
+        else:
+            edited = {}
+
+        inserts, updates = [], []
+
+        for record in records:
+            if (id_ := existing.get(record.get(key))) is None:
+                inserts.append(record)
+                continue
+
+            params = {k: v for k, v in record.items() if v is not None}
+            params = {k: v for k, v in params.items() if k not in cls.not_updatable}
+            updates.append(edited | params | {"id": id_})
+
+        return inserts, updates
+
+    @classmethod
+    def validate_table(
+        cls, table: pd.DataFrame, seen: Optional[dict[str, set]] = None, update: bool = False
+    ) -> list[tuple[Optional[int], str]]:
+        """Check a table of records before importing them
+
+        Parameters
+        ----------
+        table: pd.DataFrame
+            A table with one record per row. The columns have to be named like the
+            columns of this class. The row number of a record is its index plus 1.
+        seen: Optional[dict[str, set]]
+            The values of unique columns in previous chunks of the same file. The dict
+            is updated with the values in `table`. This allows validating a file
+            chunk by chunk.
+        update: bool
+            If `True`, existing entities are going to be updated, so values of unique
+            columns may already exist in the database. Defaults to `False`.
+
+        Returns
+        -------
+        list[tuple[Optional[int], str]]
+            A list of errors sorted by row. Each error is given as a tuple of the row
+            number (starting at 1) and a message. The checks are done column-wise and
+            existing values of unique columns are looked up with a single query per
+            column.
+        """
+
+        if seen is None:
+            seen = {}
+
+        errors = []
+        required = cls.required_fields()
+
+        for field in table.columns:
+            column = inspect(cls).columns[field]
+            values = table[field]
+
+            missing = values.isna() | values.astype(str).str.strip().eq("")
+            present = values[~missing].astype(str).str.strip()
+
+            if field in required:
+                errors += [(i, f"'{field}' is required.") for i in values.index[missing]]
+
+            if isinstance(column.type, SequenceString):
+                present = present.str.replace(r"\s+", "", regex=True)
+                invalid = ~present.str.fullmatch("[A-Za-z]+")
+                errors += [
+                    (i, f"'{field}' may only contain letters.") for i in present.index[invalid]
+                ]
+
+            match getattr(column.type, "python_type", None):
+                case python_type if python_type is date:
+                    parsed = pd.to_datetime(values[~missing], format="%Y-%m-%d", errors="coerce")
+                    errors += [
+                        (i, f"'{field}' is not a date (YYYY-MM-DD).")
+                        for i in parsed.index[parsed.isna()]
+                    ]
+                case python_type if python_type is int:
+                    parsed = pd.to_numeric(values[~missing], errors="coerce")
+                    invalid = parsed.isna() | (parsed % 1 != 0)
+                    errors += [(i, f"'{field}' is not an integer.") for i in parsed.index[invalid]]
+                case python_type if python_type is str:
+                    if (length := getattr(column.type, "length", None)) is not None:
+                        too_long = present.str.len() > length
+                        errors += [
+                            (i, f"'{field}' is longer than {length} characters.")
+                            for i in present.index[too_long]
+                        ]
+
+            if column.unique or column.primary_key:
+                previous = seen.setdefault(field, set())
+                duplicated = present.duplicated() | present.isin(previous)
+                previous.update(present)
+
+                errors += [
+                    (i, f"'{field}' {present[i]} appears more than once in the file.")
+                    for i in present.index[duplicated]
+                ]
+
+                if update:
+                    continue
+
+                existing = set(
+                    db.session.scalars(select(column).where(column.in_(present.unique().tolist())))
+                )
+                errors += [
+                    (i, f"'{field}' {present[i]} already exists.")
+                    for i in present.index[present.isin(existing)]
+                ]
+
+        errors = [(i + 1, message) for i, message in errors]
+        errors.sort(key=lambda error: error[0])
+
+        return errors
+
     @classmethod
     def from_record(cls, rec: dict, update: bool = False):
         """Create a class instance from a dict
@@ -109,8 +329,10 @@ class Importer:
         Returns
         -------
         dict
-            A dict with all entries remove where the value returns `True` for
-            `pd.isnull`.
+            The record normalized by `normalize_table` with all entries removed that
+            are `None`.
         """
 
-        return {k: v for k, v in rec.items() if not pd.isnull(v)}
+        (rec,) = cls.normalize_table(pd.DataFrame([rec])).to_dict("records")
+
+        return {k: v for k, v in rec.items() if v is not None}
@@ -1,19 +1,51 @@
+import math
 import re
 from datetime import date
 from itertools import chain, zip_longest
+from typing import Iterable, Optional
 
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqUtils import gc_fraction
-from sqlalchemy import Date, ForeignKey, String, asc, desc, func
-from sqlalchemy.orm import Mapped, mapped_column
+from flask import current_app
+from sqlalchemy import (
+    Column,
+    Connection,
+    Date,
+    ForeignKey,
+    Index,
+    Select,
+    String,
+    and_,
+    asc,
+    delete,
+    desc,
+    exists,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.orm import Mapped, mapped_column, selectinload
 
+from labbase2.database import db
 from labbase2.models import BaseEntity, mixins
 from labbase2.models.fields import SequenceString
 
 __all__ = ["Oligonucleotide"]
 
 
+oligonucleotide_seed = db.Table(
+    "oligonucleotide_seed",
+    Column("seed", String(32), primary_key=True),
+    Column(
+        "oligonucleotide_id",
+        ForeignKey("oligonucleotide.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Index("ix_oligonucleotide_seed_oligonucleotide_id", "oligonucleotide_id"),
+)
+
+
 class Oligonucleotide(BaseEntity, mixins.Sequence):
     """A class to represent a primer.
 
@@ -43,7 +75,9 @@ class Oligonucleotide(BaseEntity, mixins.Sequence):
         SequenceString(256), nullable=False, info={"importable": True}
     )
     storage_place: Mapped[str] = mapped_column(String(64), nullable=True, info={"importable": True})
-    description: Mapped[str] = mapped_column(String(512), nullable=True, info={"importable": True})
+    description: Mapped[str] = mapped_column(
+        String(512), nullable=True, info={"importable": True, "searchable": True}
+    )
 
     __mapper_args__ = {"polymorphic_identity": "oligonucleotide"}
 
@@ -99,6 +133,197 @@ class Oligonucleotide(BaseEntity, mixins.Sequence):
             description=f"id={self.id};len={len(self)}",
         )
 
+    @staticmethod
+    def seeds(sequence: str, length: int, circular: bool = False) -> set[str]:
+        """Get all seeds (k-mers) of a sequence.
+
+        Parameters
+        ----------
+        sequence: str
+            A DNA sequence. The sequence is not case-sensitive.
+        length: int
+            The length of the seeds.
+        circular: bool
+            If `True`, seeds spanning the end and the start of the sequence are
+            included. Defaults to `False`.
+
+        Returns
+        -------
+        set[str]
+            A set of uppercase seeds. Whitespaces are ignored and seeds that contain
+            characters other than 'ACGT' are omitted.
+        """
+
+        sequence = "".join(sequence.split()).upper()
+
+        if circular and sequence:
+            repeats = math.ceil((length - 1) / len(sequence))
+            sequence += (sequence * repeats)[: length - 1]
+
+        seeds = set()
+
+        for segment in re.split("[^ACGT]+", sequence):
+            seeds.update(segment[i : i + length] for i in range(len(segment) - length + 1))
+
+        return seeds
+
+    @classmethod
+    def find_candidates(
+        cls, sequence: str, min_match: int, max_len: int, strands: str = "forward"
+    ) -> Select:
+        """Create a query for oligonucleotides that possibly match a target sequence.
+
+        Parameters
+        ----------
+        sequence: str
+            The target sequence.
+        min_match: int
+            The minimum length of a continuous match between an oligonucleotide and
+            the target sequence.
+        max_len: int
+            The maximum length of oligonucleotides.
+        strands: str
+            The strands of the target sequence to consider. One of 'forward',
+            'reverse' (the reverse complement), or 'both'. Defaults to 'forward'.
+
+        Returns
+        -------
+        Select
+            An SQLAlchemy Select object for oligonucleotides of suitable length. If
+            `min_match` is at least the seed length of the seed index, only
+            oligonucleotides that share at least one seed with the target sequence
+            are selected. Target sequences are treated as circular.
+        """
+
+        query = select(cls).where(
+            and_(
+                func.char_length(cls.sequence) >= min_match,
+                func.char_length(cls.sequence) <= max_len,
+            )
+        )
+
+        length = current_app.config["FIND_SEED_LENGTH"]
+
+        if min_match < length:
+            return query
+
+        reverse = str(Seq(sequence).reverse_complement())
+
+        match strands:
+            case "forward":
+                seeds = cls.seeds(sequence, length, circular=True)
+            case "reverse":
+                seeds = cls.seeds(reverse, length, circular=True)
+            case _:
+                seeds = cls.seeds(sequence, length, circular=True)
+                seeds |= cls.seeds(reverse, length, circular=True)
+
+        candidates = select(oligonucleotide_seed.c.oligonucleotide_id).where(
+            oligonucleotide_seed.c.seed.in_(seeds)
+        )
+
+        return query.where(cls.id.in_(candidates))
+
+    @classmethod
+    def index_seeds(
+        cls, connection: Connection, id_: int, sequence: Optional[str], replace: bool = True
+    ) -> None:
+        """Update the seed index for a single oligonucleotide.
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with. This allows using the
+            method from within mapper events.
+        id_: int
+            The ID of the oligonucleotide.
+        sequence: Optional[str]
+            The sequence of the oligonucleotide. If `None`, the oligonucleotide is
+            only removed from the index.
+        replace: bool
+            Remove existing seeds of the oligonucleotide first. Defaults to `True`.
+
+        Returns
+        -------
+        None
+        """
+
+        if replace:
+            connection.execute(
+                delete(oligonucleotide_seed).where(oligonucleotide_seed.c.oligonucleotide_id == id_)
+            )
+
+        if sequence:
+            cls._insert_seeds(connection, [(id_, sequence)])
+
+    @classmethod
+    def build_seed_index(cls) -> None:
+        """Rebuild the seed index for all oligonucleotides.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The changes are not committed automatically to the database.
+        """
+
+        connection = db.session.connection()
+        connection.execute(delete(oligonucleotide_seed))
+        cls._insert_seeds(connection, db.session.execute(select(cls.id, cls.sequence)))
+
+    @classmethod
+    def seed_index_outdated(cls) -> bool:
+        """Check if the seed index has to be rebuilt.
+
+        Returns
+        -------
+        bool
+            `True` if the seed length in the index differs from `FIND_SEED_LENGTH` or
+            if any oligonucleotide that has seeds is missing from the index, `False`
+            otherwise.
+
+        Notes
+        -----
+        Oligonucleotides without any seed, for instance degenerate primers without
+        a stretch of `FIND_SEED_LENGTH` unambiguous bases, have no rows in the index.
+        Thus, the sequences of oligonucleotides missing from the index are checked
+        with `seeds`.
+        """
+
+        length = current_app.config["FIND_SEED_LENGTH"]
+
+        other_length = exists().where(func.char_length(oligonucleotide_seed.c.seed) != length)
+
+        if db.session.scalar(select(other_length)):
+            return True
+
+        unindexed = (
+            select(cls.sequence)
+            .where(func.char_length(cls.sequence) >= length)
+            .where(~exists().where(oligonucleotide_seed.c.oligonucleotide_id == cls.id))
+        )
+
+        return any(cls.seeds(sequence, length) for sequence in db.session.scalars(unindexed))
+
+    @classmethod
+    def _insert_seeds(cls, connection: Connection, rows: Iterable[tuple[int, str]]) -> None:
+        length = current_app.config["FIND_SEED_LENGTH"]
+
+        values = [
+            {"seed": seed, "oligonucleotide_id": id_}
+            for id_, sequence in rows
+            for seed in cls.seeds(sequence, length)
+        ]
+
+        if values:
+            connection.execute(insert(oligonucleotide_seed), values)
+
+    @classmethod
+    def _options(cls) -> tuple:
+        return (selectinload(cls.owner),)
+
     @classmethod
     def _order_by(cls, order_by: str, ascending: bool) -> tuple:
         match order_by:
@@ -1,24 +1,38 @@
 import io
 from datetime import date
 from pathlib import Path
-from typing import Optional, Union
-from zipfile import ZIP_DEFLATED, ZipFile
+from typing import Iterable, Iterator, Optional, Union
 
 from Bio import SeqIO
+from Bio.Restriction import CommOnly
 from Bio.SeqRecord import SeqRecord
 from flask import Response
 from flask import current_app as app
-from flask import send_file
+from flask import stream_with_context
 from flask_login import current_user
-from sqlalchemy import Date, ForeignKey, Select, String, asc, desc
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Date,
+    ForeignKey,
+    Index,
+    Select,
+    String,
+    Text,
+    asc,
+    desc,
+    exists,
+    select,
+)
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship, selectinload
 
 from labbase2.database import db
 from labbase2.models import BaseEntity
 from labbase2.models.fields import CustomDate
 from labbase2.models.mixins import Filter, Sequence
+from labbase2.utils.zip_stream import stream_zip
 
-__all__ = ["Plasmid", "Preparation", "GlycerolStock"]
+__all__ = ["Plasmid", "Preparation", "GlycerolStock", "SequenceCache", "RestrictionSite"]
 
 
 class Plasmid(BaseEntity, Sequence):
@@ -58,10 +72,16 @@ class Plasmid(BaseEntity, Sequence):
     """
 
     id: Mapped[int] = mapped_column(ForeignKey("base_entity.id"), primary_key=True)
-    insert: Mapped[str] = mapped_column(String(128), nullable=False, info={"importable": True})
-    vector: Mapped[str] = mapped_column(String(256), nullable=True, info={"importable": True})
+    insert: Mapped[str] = mapped_column(
+        String(128), nullable=False, info={"importable": True, "searchable": True}
+    )
+    vector: Mapped[str] = mapped_column(
+        String(256), nullable=True, info={"importable": True, "searchable": True}
+    )
     cloning_date: Mapped[date] = mapped_column(CustomDate, nullable=True, info={"importable": True})
-    description: Mapped[str] = mapped_column(String(2048), nullable=True, info={"importable": True})
+    description: Mapped[str] = mapped_column(
+        String(2048), nullable=True, info={"importable": True, "searchable": True}
+    )
     reference: Mapped[str] = mapped_column(String(512), nullable=True, info={"importable": True})
     file_plasmid_id: Mapped[int] = mapped_column(ForeignKey("base_file.id"), nullable=True)
     file_map_id: Mapped[int] = mapped_column(ForeignKey("base_file.id"), nullable=True)
@@ -88,8 +108,8 @@ class Plasmid(BaseEntity, Sequence):
     __mapper_args__ = {"polymorphic_identity": "plasmid"}
 
     def __len__(self):
-        if record := self.seqrecord:
-            return len(record)
+        if cache := self.sequence_cache():
+            return cache.length
 
         return 0
 
@@ -129,12 +149,217 @@ class Plasmid(BaseEntity, Sequence):
         Notes
         -----
         The sequence is read out from the plasmid filepath and consequently only
-        available if such a filepath was uploaded.
+        available if such a filepath was uploaded. The parsed record is cached in the
+        database, see `sequence_cache`.
+        """
+
+        if (cache := self.sequence_cache()) is None or not cache.length:
+            return None
+
+        if (record := cache.record) is None:
+            return self._read_seqrecord()
+
+        return record
+
+    def sequence_cache(self) -> Optional["SequenceCache"]:
+        """The cached sequence of the plasmid file.
+
+        Returns
+        -------
+        Optional[SequenceCache]
+            The cache entry for the plasmid file or `None` if no plasmid file was
+            uploaded or the file cannot be accessed.
+
+        Notes
+        -----
+        The plasmid file is only parsed if there is no cache entry for it yet or if
+        the file was modified since the entry was created. A new or refreshed cache
+        entry is only flushed inside a savepoint and never committed, so reading a
+        plasmid does not commit any changes. Callers that write to the database
+        commit the entry together with their own changes.
         """
 
         if self.file_plasmid_id is None:
             return None
 
+        try:
+            mtime = self.file.path.stat().st_mtime_ns
+        except OSError as error:
+            app.logger.info(
+                "OSError during opening of plasmid file for plasmid (%s): %s", self.id, error
+            )
+            return None
+
+        cache = self.file.sequence_cache
+
+        if cache is not None and cache.mtime == mtime:
+            return cache
+
+        record = self._read_seqrecord()
+
+        with db.session.begin_nested():
+            if cache is None:
+                cache = SequenceCache(file=self.file)
+                db.session.add(cache)
+
+            cache.mtime = mtime
+            cache.length = len(record) if record else 0
+            cache.sequence = str(record.seq) if record else None
+            cache.genbank = SequenceCache.to_genbank(record) if record else None
+            cache.restriction_sites = []
+
+            if record:
+                for enzyme, positions in CommOnly.search(record.seq, linear=False).items():
+                    if positions:
+                        site = RestrictionSite(
+                            enzyme=str(enzyme), cuts=len(positions), positions=sorted(positions)
+                        )
+                        cache.restriction_sites.append(site)
+
+        return cache
+
+    @classmethod
+    def build_sequence_cache(cls) -> int:
+        """Parse the plasmid files of all plasmids that are missing from the cache.
+
+        Returns
+        -------
+        int
+            The number of plasmids whose plasmid file was parsed.
+
+        Notes
+        -----
+        Filtering plasmids by restriction enzymes only considers plasmids with a
+        cached sequence. Plasmids are fetched in chunks, so all plasmids are never
+        loaded at once.
+        """
+
+        query = (
+            select(cls)
+            .where(cls.file_plasmid_id.is_not(None))
+            .where(~exists().where(SequenceCache.file_id == cls.file_plasmid_id))
+            .order_by(cls.id)
+        )
+
+        parsed, last = 0, 0
+
+        while plasmids := db.session.scalars(query.where(cls.id > last).limit(100)).all():
+            for plasmid in plasmids:
+                if plasmid.sequence_cache() is not None:
+                    parsed += 1
+
+            last = plasmids[-1].id
+            db.session.commit()
+
+        return parsed
+
+    @classmethod
+    def sequence_cache_outdated(cls) -> bool:
+        """Check if any plasmid file is missing from the sequence cache.
+
+        Returns
+        -------
+        bool
+            `True` if any plasmid has a plasmid file without a cache entry, `False`
+            otherwise. Modified plasmid files are not detected.
+        """
+
+        missing = (
+            exists()
+            .where(cls.file_plasmid_id.is_not(None))
+            .where(~exists().where(SequenceCache.file_id == cls.file_plasmid_id))
+        )
+
+        return db.session.scalar(select(missing))
+
+    def restriction_sites(self, sites: int = 1) -> dict["RestrictionType", int]:
+        """Return a list of cutting restriction enzymes
+
+        Parameters
+        ----------
+        sites: int, optional
+            The maximum number of sites a given restriction enzymes cuts. Set to 0 to
+            get all cutting enzymes.
+
+        Returns
+        -------
+        dict[RestrictionType, int]
+            A list of all restriction enzymes that cut the sequence at most the
+            specified times. Enzymes that do not cut the sequence are included with
+            0 sites.
+
+        Notes
+        -----
+        The restriction sites are read from the sequence cache instead of searching
+        the sequence. The cache only stores enzymes that cut the sequence, so all
+        other enzymes are filled in with 0 sites.
+        """
+
+        if (cache := self.sequence_cache()) is None or not cache.length:
+            return {}
+
+        cuts = {site.enzyme: site.cuts for site in cache.restriction_sites}
+
+        return {
+            enzyme: n
+            for enzyme in CommOnly
+            if (n := cuts.get(str(enzyme), 0)) <= sites or sites == 0
+        }
+
+    @classmethod
+    def cut_by(cls, enzymes: Iterable[str], cuts: int = 1) -> list:
+        """Create filters for plasmids cut a given number of times by some enzymes.
+
+        Parameters
+        ----------
+        enzymes: Iterable[str]
+            The names of restriction enzymes. The names are not case-sensitive.
+        cuts: int
+            The number of times each enzyme has to cut the plasmid. Defaults to 1.
+
+        Returns
+        -------
+        list
+            A list of filters that can be passed to `Select.where`. Only plasmids
+            whose plasmid file was parsed before are considered.
+
+        Raises
+        ------
+        ValueError
+            If an enzyme is not a known commercially available enzyme.
+        """
+
+        names = {str(enzyme).lower(): str(enzyme) for enzyme in CommOnly}
+        filters = []
+
+        for enzyme in enzymes:
+            if (name := names.get(enzyme.strip().lower())) is None:
+                raise ValueError(f"Unknown restriction enzyme '{enzyme}'!")
+
+            filters.append(
+                exists().where(
+                    RestrictionSite.file_id == cls.file_plasmid_id,
+                    RestrictionSite.enzyme == name,
+                    RestrictionSite.cuts == cuts,
+                )
+            )
+
+        return filters
+
+    @classmethod
+    def _filters(cls, **fields) -> list:
+        filters = []
+
+        if enzymes := fields.pop("cut_once", None):
+            filters += cls.cut_by(enzymes.replace(",", " ").split())
+
+        return super()._filters(**fields) + filters
+
+    @classmethod
+    def _options(cls) -> tuple:
+        return (selectinload(cls.owner),)
+
+    def _read_seqrecord(self) -> Optional[SeqRecord]:
         match self.file.path.suffix.lower():
             case ".gb" | ".gbk":
                 format_ = "genbank"
@@ -162,7 +387,7 @@ class Plasmid(BaseEntity, Sequence):
 
     @classmethod
     def to_zip(cls, instances: Union[list[db.Model], Select]) -> Response:
-        """Consume a list of plasmids into an in-memory ZIP file
+        """Stream the files of a list of plasmids as a ZIP file
 
         Parameters
         ----------
@@ -172,36 +397,148 @@ class Plasmid(BaseEntity, Sequence):
         Returns
         -------
         Response
-            A flask Response object for downloading the ZIP file.
+            A flask Response object for downloading the ZIP file. The archive is
+            written while it is downloaded and never held in memory as a whole.
         """
 
-        if not isinstance(instances, list):
-            instances = db.session.scalars(instances)
-
-        mem = io.BytesIO()
+        def files() -> Iterator[tuple[Path, str]]:
+            plasmids = instances if isinstance(instances, list) else db.session.scalars(instances)
 
-        with ZipFile(mem, "w", ZIP_DEFLATED, False) as archive:
-            for plasmid in instances:
+            for plasmid in plasmids:
                 if plasmid.file_plasmid_id:
-                    archive.write(
-                        plasmid.file.path, Path(plasmid.label, plasmid.file.filename_exposed)
-                    )
+                    yield plasmid.file.path, str(Path(plasmid.label, plasmid.file.filename_exposed))
                 if plasmid.file_map_id:
-                    archive.write(
-                        plasmid.map.path, Path(plasmid.label, plasmid.map.filename_exposed)
-                    )
+                    yield plasmid.map.path, str(Path(plasmid.label, plasmid.map.filename_exposed))
                 for file in plasmid.files:
-                    archive.write(file.path, Path(plasmid.label, file.filename_exposed))
+                    yield file.path, str(Path(plasmid.label, file.filename_exposed))
 
-        mem.seek(0)
-
-        return send_file(
-            mem,
-            as_attachment=True,
-            download_name="plasmids.zip",
+        return Response(
+            stream_with_context(stream_zip(files())),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment; filename=plasmids.zip"},
         )
 
 
+class SequenceCache(db.Model):
+    """The parsed content of a plasmid file.
+
+    Attributes
+    ----------
+    file_id : int
+        The ID of the cached file.
+    mtime : int
+        The modification time of the file in nanoseconds when it was parsed. The cache
+        entry is outdated if the file was modified afterward.
+    length : int
+        The length of the sequence. This is 0 if the file could not be parsed.
+    sequence : str
+        The decoded sequence.
+    genbank : str
+        The parsed record including all features and annotations in GenBank format.
+        This is `None` if the record cannot be written as GenBank.
+    restriction_sites : list[RestrictionSite]
+        The restriction enzymes cutting the sequence.
+
+    Notes
+    -----
+    Parsing GenBank or SnapGene files is slow. Caching the parsed content allows to
+    list plasmids without reading any plasmid file. The entry is deleted together with
+    the file, so uploading a new plasmid file invalidates the cache.
+    """
+
+    __tablename__: str = "sequence_cache"
+
+    file_id: Mapped[int] = mapped_column(
+        ForeignKey("base_file.id", ondelete="CASCADE"), primary_key=True
+    )
+    mtime: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    length: Mapped[int] = mapped_column(nullable=False, default=0)
+    sequence: Mapped[str] = mapped_column(Text, nullable=True, deferred=True)
+    genbank: Mapped[str] = mapped_column(Text, nullable=True, deferred=True)
+
+    file: Mapped["BaseFile"] = relationship(
+        backref=backref("sequence_cache", uselist=False, cascade="all, delete-orphan"),
+        lazy=True,
+    )
+    restriction_sites: Mapped[list["RestrictionSite"]] = relationship(
+        lazy=True, cascade="all, delete-orphan"
+    )
+
+    @property
+    def record(self) -> Optional[SeqRecord]:
+        """The parsed record of the plasmid file
+
+        Returns
+        -------
+        Optional[SeqRecord]
+            The record parsed again from the cached GenBank text or `None` if no
+            GenBank text is cached.
+
+        Notes
+        -----
+        The record is stored as text instead of a pickled object, so the cache stays
+        readable after upgrading Biopython.
+        """
+
+        if self.genbank is None:
+            return None
+
+        return SeqIO.read(io.StringIO(self.genbank), format="genbank")
+
+    @staticmethod
+    def to_genbank(record: SeqRecord) -> Optional[str]:
+        """Write a record in GenBank format
+
+        Parameters
+        ----------
+        record: SeqRecord
+            A record parsed from a plasmid file in any format.
+
+        Returns
+        -------
+        Optional[str]
+            The record in GenBank format or `None` if it cannot be written as GenBank.
+        """
+
+        try:
+            return record.format("genbank")
+        except ValueError as error:
+            app.logger.info("Could not write record (%s) as GenBank: %s", record.id, error)
+            return None
+
+
+class RestrictionSite(db.Model):
+    """The sites at which a restriction enzyme cuts a cached plasmid sequence.
+
+    Attributes
+    ----------
+    file_id : int
+        The ID of the cached plasmid file.
+    enzyme : str
+        The name of the restriction enzyme.
+    cuts : int
+        The number of times the enzyme cuts the plasmid.
+    positions : list[int]
+        The positions at which the enzyme cuts the plasmid.
+
+    Notes
+    -----
+    Only enzymes that cut the plasmid at least once are stored. Sites are searched
+    for all commercially available enzymes when the sequence cache is refreshed.
+    """
+
+    __tablename__: str = "restriction_site"
+
+    file_id: Mapped[int] = mapped_column(
+        ForeignKey("sequence_cache.file_id", ondelete="CASCADE"), primary_key=True
+    )
+    enzyme: Mapped[str] = mapped_column(String(32), primary_key=True)
+    cuts: Mapped[int] = mapped_column(nullable=False)
+    positions: Mapped[list[int]] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (Index("ix_restriction_site_enzyme_cuts", "enzyme", "cuts"),)
+
+
 class Preparation(db.Model):
     """A specific preparation of a plasmid.
 
@@ -0,0 +1,275 @@
+import re
+from typing import Iterable
+
+from flask import current_app
+from sqlalchemy import (
+    Column,
+    Connection,
+    ForeignKey,
+    Index,
+    Integer,
+    Select,
+    String,
+    column,
+    delete,
+    distinct,
+    false,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    union_all,
+)
+from sqlalchemy.exc import OperationalError
+
+from labbase2.database import db
+
+__all__ = ["SearchIndex", "search_token"]
+
+
+# The portable index maps every token of an entity to the entity.
+search_token = db.Table(
+    "search_token",
+    Column("token", String(64), primary_key=True),
+    Column("entity_id", ForeignKey("base_entity.id", ondelete="CASCADE"), primary_key=True),
+    Column("weight", Integer, nullable=False),
+    Index("ix_search_token_entity_id", "entity_id"),
+)
+
+# The FTS5 table is a virtual table, which is not part of the metadata. The rowid is
+# the ID of the entity.
+entity_search = table("entity_search", column("rowid"), column("label"), column("content"))
+
+
+class SearchIndex:
+    """A full-text index over the text of all entities
+
+    Notes
+    -----
+    On SQLite the index is an FTS5 table ranked by BM25. On other databases, or if
+    SQLite was compiled without FTS5, every token is stored in the table
+    `search_token` with the number of its occurrences as weight. Both backends match
+    search terms by prefix and require all terms to match. Matches in the label are
+    weighted higher than matches in other text. The backend is set by
+    `SEARCH_BACKEND`, which is resolved by `create` at app startup if it is 'auto'.
+    """
+
+    # The weight of tokens in the label relative to tokens in other text.
+    label_weight: int = 5
+
+    @staticmethod
+    def backend() -> str:
+        """Get the backend of the index
+
+        Returns
+        -------
+        str
+            Either 'fts5' or 'tokens'.
+        """
+
+        return "fts5" if current_app.config["SEARCH_BACKEND"] == "fts5" else "tokens"
+
+    @classmethod
+    def create(cls) -> str:
+        """Create the FTS5 table if FTS5 is used and resolve the backend
+
+        Returns
+        -------
+        str
+            The backend of the index, which is also written to `SEARCH_BACKEND`.
+        """
+
+        backend = current_app.config["SEARCH_BACKEND"]
+
+        if backend in ("auto", "fts5") and db.engine.dialect.name == "sqlite":
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(
+                        text(
+                            "CREATE VIRTUAL TABLE IF NOT EXISTS entity_search "
+                            "USING fts5(label, content, tokenize='unicode61')"
+                        )
+                    )
+            except OperationalError:
+                current_app.logger.warning("FTS5 is not available; use token index for search.")
+                backend = "tokens"
+            else:
+                backend = "fts5"
+        else:
+            backend = "tokens"
+
+        current_app.config["SEARCH_BACKEND"] = backend
+
+        return backend
+
+    @staticmethod
+    def tokenize(text_: str) -> list[str]:
+        """Split a text into lowercase tokens
+
+        Parameters
+        ----------
+        text_: str
+            The text to split.
+
+        Returns
+        -------
+        list[str]
+            The alphanumeric tokens of the text in order of appearance. Tokens are
+            truncated to 64 characters.
+        """
+
+        return [token[:64] for token in re.findall(r"\w+", text_.lower())]
+
+    @classmethod
+    def insert(cls, connection: Connection, documents: Iterable[tuple[int, str, str]]) -> None:
+        """Add entities to the index
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with. This allows using the
+            method from within session events.
+        documents: Iterable[tuple[int, str, str]]
+            The ID, the label, and the remaining text of each entity.
+
+        Returns
+        -------
+        None
+        """
+
+        documents = list(documents)
+
+        if not documents:
+            return
+
+        if cls.backend() == "fts5":
+            connection.execute(
+                text(
+                    "INSERT INTO entity_search (rowid, label, content) VALUES (:id, :label, :content)"
+                ),
+                [
+                    {"id": id_, "label": label, "content": content}
+                    for id_, label, content in documents
+                ],
+            )
+            return
+
+        values = []
+        for id_, label, content in documents:
+            weights = {}
+
+            for token in cls.tokenize(label):
+                weights[token] = weights.get(token, 0) + cls.label_weight
+            for token in cls.tokenize(content):
+                weights[token] = weights.get(token, 0) + 1
+
+            values += [{"token": t, "entity_id": id_, "weight": w} for t, w in weights.items()]
+
+        if values:
+            connection.execute(insert(search_token), values)
+
+    @classmethod
+    def remove(cls, connection: Connection, ids: Iterable[int]) -> None:
+        """Remove entities from the index
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with.
+        ids: Iterable[int]
+            The IDs of the entities.
+
+        Returns
+        -------
+        None
+        """
+
+        if not (ids := list(ids)):
+            return
+
+        if cls.backend() == "fts5":
+            connection.execute(delete(entity_search).where(entity_search.c.rowid.in_(ids)))
+        else:
+            connection.execute(delete(search_token).where(search_token.c.entity_id.in_(ids)))
+
+    @classmethod
+    def clear(cls, connection: Connection) -> None:
+        """Remove all entities from the index
+
+        Parameters
+        ----------
+        connection: Connection
+            The connection to execute the statements with.
+
+        Returns
+        -------
+        None
+        """
+
+        if cls.backend() == "fts5":
+            connection.execute(delete(entity_search))
+        else:
+            connection.execute(delete(search_token))
+
+    @classmethod
+    def indexed(cls) -> Select:
+        """Create a query for the IDs of all indexed entities
+
+        Returns
+        -------
+        Select
+            An SQLAlchemy Select object with a single column `entity_id`.
+        """
+
+        if cls.backend() == "fts5":
+            return select(entity_search.c.rowid.label("entity_id"))
+
+        return select(search_token.c.entity_id).distinct()
+
+    @classmethod
+    def match(cls, query: str) -> Select:
+        """Create a query for entities matching all terms of a search query
+
+        Parameters
+        ----------
+        query: str
+            The search query. Each token of the query is matched as prefix of the
+            tokens in the index.
+
+        Returns
+        -------
+        Select
+            An SQLAlchemy Select object with the columns `entity_id` and `score`.
+            Higher scores indicate better matches. The rows are not ordered.
+        """
+
+        terms = cls.tokenize(query)
+
+        if not terms:
+            return select(literal(0).label("entity_id"), literal(0.0).label("score")).where(false())
+
+        if cls.backend() == "fts5":
+            bm25 = func.bm25(literal_column("entity_search"), float(cls.label_weight), 1.0)
+            expression = " ".join(f'"{term}"*' for term in terms)
+
+            return select(entity_search.c.rowid.label("entity_id"), (-bm25).label("score")).where(
+                literal_column("entity_search").op("MATCH")(expression)
+            )
+
+        matches = union_all(
+            *[
+                select(
+                    search_token.c.entity_id, search_token.c.weight, literal(i).label("term")
+                ).where(search_token.c.token >= term, search_token.c.token < term + "\uffff")
+                for i, term in enumerate(terms)
+            ]
+        ).subquery()
+
+        return (
+            select(matches.c.entity_id, func.sum(matches.c.weight).label("score"))
+            .group_by(matches.c.entity_id)
+            .having(func.count(distinct(matches.c.term)) == len(terms))
+        )
@@ -11,8 +11,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from labbase2.database import db
 from labbase2.models import mixins
 
-
-__all__ = ["login_manager", "User", "Group", "Permission", "ResetPassword"]
+__all__ = ["login_manager", "User", "Group", "Permission", "ResetPassword", "invalidate_access"]
 
 
 login_manager = LoginManager()
@@ -20,6 +19,11 @@ login_manager.login_view = "auth.login"
 login_manager.login_message_category = "warning"
 
 
+# Incremented whenever group memberships or group permissions change. Cached
+# permissions of users are only valid for the version they were computed for.
+_access_version = 0
+
+
 user_groups = db.Table(
     "user_groups",
     Column("user_id", ForeignKey("user.id"), primary_key=True),
@@ -184,7 +188,9 @@ class User(db.Model, UserMixin, mixins.Export):
 
     @username.expression
     def username(cls):  # pylint: disable=no-self-argument
-        return func.concat(cls.first_name, " ", cls.last_name)
+        # Compiles to || or concat() depending on the database. SQLite only has
+        # concat() since version 3.44.
+        return cls.first_name + " " + cls.last_name
 
     @property
     def is_admin(self) -> bool:
@@ -197,9 +203,33 @@ class User(db.Model, UserMixin, mixins.Export):
             if the user is member of the 'admin' group.
         """
 
-        admin_group = db.session.get(Group, "admin")
+        return "admin" in self._access()[0]
+
+    @property
+    def permissions(self) -> frozenset[str]:
+        """The names of all permissions conferred by the groups of the user
+
+        Returns
+        -------
+        frozenset[str]
+            The names of the permissions. The set is computed once per instance, i.e.,
+            once per request, and recomputed after group memberships or group
+            permissions changed.
+        """
+
+        return self._access()[1]
 
-        return admin_group in self.groups
+    def _access(self) -> tuple[frozenset[str], frozenset[str]]:
+        cache = getattr(self, "_access_cache", None)
+
+        if cache is None or cache[0] != _access_version:
+            groups = frozenset(group.name for group in self.groups)
+            permissions = frozenset(
+                permission.name for group in self.groups for permission in group.permissions
+            )
+            cache = self._access_cache = (_access_version, groups, permissions)
+
+        return cache[1], cache[2]
 
     def set_password(self, password: str) -> None:
         """Creates a hash that is stored in the database to validate the user's
@@ -261,14 +291,10 @@ class User(db.Model, UserMixin, mixins.Export):
             `True` if any of the groups this user is member of confers the respective permission.
         """
 
-        if isinstance(permission, str):
-            permission = db.session.get(Permission, permission)
-
-        for group in self.groups:
-            if permission in group.permissions:
-                return True
+        if isinstance(permission, Permission):
+            permission = permission.name
 
-        return False
+        return permission in self.permissions
 
     @classmethod
     def generate_password(cls) -> str:
@@ -349,6 +375,18 @@ class ResetPassword(db.Model):
     timeout: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
 
+def invalidate_access() -> None:
+    """Invalidate the cached permissions of all users
+
+    Returns
+    -------
+    None
+    """
+
+    global _access_version  # pylint: disable=global-statement
+    _access_version += 1
+
+
 @login_manager.user_loader
 def _load_user(id_: str) -> User | None:
     """Load a user from database by ID.
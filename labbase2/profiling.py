@@ -0,0 +1,123 @@
+from time import perf_counter
+
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+
+from labbase2.database import db
+
+__all__ = ["init_app"]
+
+
+def init_app(app: Flask):
+    """Initialize profiling of requests with the current app
+
+    Parameters
+    ----------
+    app: Flask
+        A flask app to initialize.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Profiling is only set up if `PROFILING` is `True`. Then, the number of SQL
+    statements, the time spent in the database, the time spent rendering templates,
+    and the total time of each request are logged and sent to the client in a
+    `Server-Timing` header. Requests with more than `PROFILING_MAX_QUERIES` statements
+    or taking longer than `PROFILING_MAX_DURATION` milliseconds are logged as warnings.
+    """
+
+    if not app.config["PROFILING"]:
+        return
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+
+    @app.before_request
+    def start_profile():
+        g.profile = {"start": perf_counter(), "queries": 0, "db": 0.0, "templates": 0.0, "depth": 0}
+
+    @app.after_request
+    def finish_profile(response: Response) -> Response:
+        if (profile := g.pop("profile", None)) is None:
+            return response
+
+        total = (perf_counter() - profile["start"]) * 1000
+        database = profile["db"] * 1000
+        templates = profile["templates"] * 1000
+        queries = profile["queries"]
+
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={database:.1f};desc="{queries} queries"',
+                f"tpl;dur={templates:.1f}",
+                f"total;dur={total:.1f}",
+            ]
+        )
+
+        params = {
+            "method": request.method,
+            "path": request.path,
+            "queries": queries,
+            "db": database,
+            "templates": templates,
+            "total": total,
+        }
+        message = (
+            "%(method)-6s %(path)s: %(queries)d queries, %(db).1f ms database, "
+            "%(templates).1f ms templates, %(total).1f ms total"
+        )
+
+        if (
+            queries > app.config["PROFILING_MAX_QUERIES"]
+            or total > app.config["PROFILING_MAX_DURATION"]
+        ):
+            app.logger.warning("Slow request: " + message, params)
+        else:
+            app.logger.info(message, params)
+
+        return response
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info["profile_start"] = perf_counter()
+
+
+def _after_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    start = conn.info.pop("profile_start", perf_counter())
+
+    # Statements outside of requests, e.g., of background imports, are not counted.
+    if has_request_context() and (profile := g.get("profile")) is not None:
+        profile["queries"] += 1
+        profile["db"] += perf_counter() - start
+
+
+def _before_render_template(_app, **_kwargs):
+    if has_request_context() and (profile := g.get("profile")) is not None:
+        # Templates rendered while another template is rendered are not counted twice.
+        if profile["depth"] == 0:
+            profile["template_start"] = perf_counter()
+
+        profile["depth"] += 1
+
+
+def _template_rendered(_app, **_kwargs):
+    if has_request_context() and (profile := g.get("profile")) is not None:
+        profile["depth"] -= 1
+
+        if profile["depth"] == 0:
+            profile["templates"] += perf_counter() - profile["template_start"]
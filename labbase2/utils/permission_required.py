@@ -1,13 +1,9 @@
 from functools import wraps
 from typing import Callable
 
-from flask import current_app as app
 from flask import flash, redirect, url_for
 from flask_login import current_user
 
-from labbase2.database import db
-from labbase2.models import Permission
-
 __all__ = ["permission_required"]
 
 
@@ -34,16 +30,9 @@ def permission_required(*allowed) -> Callable:
         @wraps(func)
         def decorated_view(*args, **kwargs):
 
-            if current_user.is_admin:
+            if current_user.is_admin or not current_user.permissions.isdisjoint(allowed):
                 return func(*args, **kwargs)
 
-            for name in allowed:
-                permission = db.session.get(Permission, name)
-                if not permission:
-                    app.logger.debug("No such permission: %s", name)
-                elif current_user.has_permission(permission):
-                    return func(*args, **kwargs)
-
             flash("No permission to enter this site!", "warning")
             return redirect(url_for("base.index"))
 
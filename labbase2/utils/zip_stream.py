@@ -0,0 +1,83 @@
+import io
+from pathlib import Path
+from typing import Iterable, Iterator
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from flask import current_app
+
+__all__ = ["stream_zip"]
+
+
+# Formats that are compressed already and thus stored without compression.
+COMPRESSED_SUFFIXES: set[str] = {".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".gz"}
+
+
+class _Buffer(io.RawIOBase):
+    """An unseekable file object that collects written bytes until they are taken."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def take(self) -> bytes:
+        """Return and remove all bytes written so far."""
+
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+
+        return data
+
+
+def stream_zip(files: Iterable[tuple[Path, str]], chunk_size: int = 2**20) -> Iterator[bytes]:
+    """Create a ZIP archive chunk by chunk.
+
+    Parameters
+    ----------
+    files: Iterable[tuple[Path, str]]
+        Pairs of the path of a file and its name in the archive.
+    chunk_size: int
+        The number of bytes read from a file at once. Defaults to 1 MiB.
+
+    Yields
+    ------
+    bytes
+        The next part of the archive. Memory usage is bounded by `chunk_size`
+        regardless of the size of the archive.
+
+    Notes
+    -----
+    Files in formats that are already compressed (PNG, JPG, PDF, ...) are stored
+    without compression. Files that cannot be read are skipped.
+    """
+
+    buffer = _Buffer()
+
+    with ZipFile(buffer, "w", ZIP_DEFLATED) as archive:
+        for path, name in files:
+            try:
+                info = ZipInfo.from_file(path, name)
+                source = open(path, "rb")  # pylint: disable=consider-using-with
+            except OSError as error:
+                current_app.logger.warning("Could not add %s to ZIP archive: %s", path, error)
+                continue
+
+            if path.suffix.lower() in COMPRESSED_SUFFIXES:
+                info.compress_type = ZIP_STORED
+            else:
+                info.compress_type = ZIP_DEFLATED
+
+            with source, archive.open(info, "w") as target:
+                while data := source.read(chunk_size):
+                    target.write(data)
+                    yield buffer.take()
+
+            yield buffer.take()
+
+    yield buffer.take()
@@ -4,10 +4,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import Antibody
+from labbase2.models import Antibody, EntityCount
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.batches.forms import EditBatch
@@ -43,17 +42,23 @@ def index():
         flash(str(error), "danger")
         app.logger.error("Couldn't filter antibodies: %s", error)
         entities = Antibody.filter_(order_by="label")
-    else:
-        entity_count = select(func.count()).select_from(entities)  # pylint: disable=not-callable
-        app.logger.debug("Found %d antibodies.", db.session.scalar(entity_count))
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "antibodies/main.html",
         filter_form=form,
         import_file_form=UploadFile(),
         add_form=EditAntibody(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(Antibody)),
+        entities=Antibody.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(Antibody),
         title="Antibodies",
     )
 
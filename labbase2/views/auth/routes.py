@@ -167,7 +167,6 @@ def edit_user():
         if form.file.data:
             file = upload_file(form, BaseFile)
             current_user.picture = file
-            file.resize(512)
 
         try:
             db.session.commit()
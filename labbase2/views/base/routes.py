@@ -1,6 +1,12 @@
-from flask import Blueprint, render_template
+from flask import Blueprint
+from flask import current_app as app
+from flask import render_template, request
 from flask_login import login_required
 
+from labbase2 import autocomplete
+from labbase2.database import db
+from labbase2.models import BaseEntity
+
 __all__ = ["bp"]
 
 
@@ -12,3 +18,35 @@ bp = Blueprint("base", __name__, template_folder="templates")
 @login_required
 def index() -> str:
     return render_template("base/index.html", title="Home")
+
+
+@bp.route("/search", methods=["GET"])
+@login_required
+def search():
+    query = request.args.get("q", "", type=str)
+    limit = min(request.args.get("limit", app.config["SEARCH_LIMIT"], type=int), 500)
+
+    rows = db.session.execute(BaseEntity.search(query).limit(max(limit, 1)))
+
+    return {
+        "query": query,
+        "results": [
+            {"id": id_, "label": label, "entity_type": entity_type, "score": score}
+            for id_, label, entity_type, score in rows
+        ],
+    }
+
+
+@bp.route("/autocomplete", methods=["GET"])
+@login_required
+def complete():
+    query = request.args.get("q", "", type=str)
+    limit = min(request.args.get("limit", app.config["AUTOCOMPLETE_LIMIT"], type=int), 100)
+
+    return {
+        "query": query,
+        "results": [
+            {"id": id_, "label": label, "entity_type": entity_type}
+            for id_, label, entity_type in autocomplete.complete(query, limit)
+        ],
+    }
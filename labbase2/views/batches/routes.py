@@ -4,10 +4,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import Batch
+from labbase2.models import Batch, EntityCount
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 
@@ -36,15 +35,22 @@ def index():
         flash(str(error), "danger")
         app.logger.error("Couldn't filter batches: %s", error)
         entities = Batch.filter_(order_by="label")
-    else:
-        app.logger.debug("Found %d batches.", select(func.count()).select_from(entities))
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "batches/main.html",
         filter_form=form,
         add_form=EditBatch(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(Batch)),
+        entities=Batch.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(Batch),
         title="Batches",
     )
 
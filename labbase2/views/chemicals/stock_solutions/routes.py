@@ -2,10 +2,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import StockSolution
+from labbase2.models import EntityCount, StockSolution
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.chemicals.forms import EditChemical
@@ -35,13 +34,22 @@ def index():
     except Exception as err:
         flash(str(err), "danger")
         entities = StockSolution.filter_(order_by="label")
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "stock_solutions/main.html",
         filter_form=form,
         add_form=EditStockSolution(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(StockSolution)),
+        entities=StockSolution.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(StockSolution),
         title="Stock Solutions",
     )
 
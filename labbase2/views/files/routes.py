@@ -49,6 +49,11 @@ def upload_file(form, class_, **kwargs) -> Union[BaseFile, EntityFile]:
         db.session.commit()
         raise error
 
+    try:
+        db_file.create_derivatives()
+    except Exception as error:
+        app.logger.warning("Could not create derivatives of file %d: %s", db_file.id, error)
+
     return db_file
 
 
@@ -118,6 +123,29 @@ def download(id_: Optional[int] = None):
     )
 
 
+@bp.route("/<int:id_>/<string:size>", methods=["GET"])
+@login_required
+def derivative(id_: int, size: str):
+    if (file := db.session.get(BaseFile, id_)) is None:
+        return f"No file with ID {id_}!", 404
+
+    try:
+        path = file.derivative(size)
+    except ValueError as error:
+        return str(error), 404
+    except OSError as error:
+        app.logger.warning("Could not create derivative of file %d: %s", id_, error)
+        return f"Could not read image {id_}!", 500
+
+    return send_file(
+        path,
+        download_name=f"{Path(file.filename_exposed).stem}-{size}{path.suffix}",
+        conditional=True,
+        etag=True,
+        last_modified=path.stat().st_mtime,
+    )
+
+
 @bp.route("/<int:id_>", methods=["DELETE"])
 @login_required
 @permission_required("upload-file")
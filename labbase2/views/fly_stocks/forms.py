@@ -37,20 +37,47 @@ class FilterFlyStocks(FilterForm):
         render_kw=rendering.custom_field | {"placeholder": "m6[3xcs]"},
         description="The genotype of the fly stock.",
     )
+    alleles = StringField(
+        label="Alleles",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field | {"placeholder": "UAS-GFP, Gal4"},
+        description="A comma separated list of alleles. Finds all stocks carrying each allele.",
+    )
     chromosome_x = StringField(
-        label="Chromosome X", validators=[Optional()], render_kw=rendering.custom_field
+        label="Chromosome X",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field,
+        description="Alleles that have to be on chromosome X.",
     )
     chromosome_y = StringField(
-        label="Chromosome Y", validators=[Optional()], render_kw=rendering.custom_field
+        label="Chromosome Y",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field,
+        description="Alleles that have to be on chromosome Y.",
     )
     chromosome_2 = StringField(
-        label="Chromosome 2", validators=[Optional()], render_kw=rendering.custom_field
+        label="Chromosome 2",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field,
+        description="Alleles that have to be on chromosome 2.",
     )
     chromosome_3 = StringField(
-        label="Chromosome 3", validators=[Optional()], render_kw=rendering.custom_field
+        label="Chromosome 3",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field,
+        description="Alleles that have to be on chromosome 3.",
     )
     chromosome_4 = StringField(
-        label="Chromosome 4", validators=[Optional()], render_kw=rendering.custom_field
+        label="Chromosome 4",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field,
+        description="Alleles that have to be on chromosome 4.",
     )
     source = StringField(
         label="Source",
@@ -96,6 +123,7 @@ class FilterFlyStocks(FilterForm):
             self.label,
             self.owner_id,
             self.short_genotype,
+            self.alleles,
             self.chromosome_x,
             self.chromosome_y,
             self.chromosome_2,
@@ -2,10 +2,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import FlyStock
+from labbase2.models import EntityCount, FlyStock
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.comments.forms import EditComment
@@ -38,14 +37,23 @@ def index():
     except Exception as err:
         flash(str(err), "danger")
         entities = FlyStock.filter_(order_by="label")
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "fly_stocks/main.html",
         filter_form=form,
         import_file_form=UploadFile(),
         add_form=EditFlyStock(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(FlyStock)),
+        entities=FlyStock.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(FlyStock),
         title="Fly Stocks",
     )
 
@@ -3,8 +3,8 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
-from sqlalchemy.exc import IntegrityError
 
+from labbase2 import executor
 from labbase2.database import db
 from labbase2.models import BaseFile, ColumnMapping, ImportJob
 from labbase2.utils.message import Message
@@ -49,7 +49,9 @@ def upload(type_: str):
     file: BaseFile = upload_file(form, BaseFile)
 
     try:
-        file.read_table()
+        # Parse the whole file chunk by chunk, which also fills the cache.
+        for _ in file.read_table(chunksize=app.config["IMPORT_CHUNK_SIZE"]):
+            pass
     except pd.errors.ParserError:
         flash("File could not be parsed properly!", "danger")
         db.session.delete(file)
@@ -69,7 +71,8 @@ def upload(type_: str):
     # Now create the ImportJob.
     import_job = ImportJob(user_id=current_user.id, file_id=file.id, entity_type=type_)
 
-    for field in entity_class.importable_fields():
+    # The ID is only used to find existing entities when updating them.
+    for field in ["id"] + entity_class.importable_fields():
         import_job.mappings.append(ColumnMapping(mapped_field=field))
 
     db.session.add(import_job)
@@ -91,7 +94,9 @@ def edit(id_: int):
         return redirect(url_for(".index"))
 
     try:
-        table = import_job.file.read_table()
+        chunks = import_job.file.read_table(chunksize=app.config["IMPORT_PREVIEW_ROWS"])
+        table = next(chunks, pd.DataFrame())
+        chunks.close()
     except ValueError as error:
         flash(str(error), "danger")
         return redirect(url_for(".index"))
@@ -106,76 +111,71 @@ def edit(id_: int):
             mapping.input_column = None if field.data == "None" else field.data
             db.session.commit()
 
+    if request.args.get("validate", 0, type=int):
+        errors = import_job.validate(mode=request.args.get("mode"))
+    else:
+        errors = []
+
     return render_template(
         "imports/edit_import.html",
         title="Import Oligonucleotides",
         job=import_job,
         table=table,
         form=form,
+        errors=errors,
     )
 
 
 @bp.route("/import/<int:id_>", methods=["GET", "POST"])
 @login_required
 def execute(id_: int):
-    job = db.session.get(ImportJob, id_)
+    if (job := db.session.get(ImportJob, id_)) is None:
+        flash(f"No import with ID {id_}!", "danger")
+        return redirect(url_for(".index"))
 
     if job.user_id != current_user.id:
         flash(Message.ERROR("You are not authorized to execute this import."))
         return redirect(url_for(".index"))
 
-    try:
-        entity_class = job.class_
-    except ValueError as error:
-        flash(str(error), "danger")
+    if job.status in ImportJob.ACTIVE + ("done",):
+        flash(f"Import {id_} is already {job.status}!", "danger")
         return redirect(url_for(".index"))
 
-    fields, columns = job.get_mapping()
+    if (mode := request.args.get("mode", "insert")) not in ("insert", "upsert"):
+        flash(f"Unknown import mode '{mode}'!", "danger")
+        return redirect(url_for(".edit", id_=id_))
 
-    try:
-        table = job.file.read_table()
-    except ValueError as error:
-        flash(str(error), "danger")
-        return redirect(request.referrer)
+    job.mode = mode
+    job.status = "queued"
+    job.message = None
+    if not job.committed_rows:
+        job.report = None
+    db.session.commit()
 
-    table = table[columns]  # Reorder columns in the imported file.
-    table.columns = fields  # Rename the columns in the file to match the db fields.
+    executor.submit_import(job.id)
 
-    imported = 0
+    flash(f"Started import {id_}. The progress is shown below.", "success")
 
-    for row in table.itertuples(index=False):
-        entity = entity_class.from_row(row=row)
+    return redirect(url_for(".index"))
 
-        try:
-            db.session.add(entity)
-            db.session.commit()
-        except IntegrityError as error:
-            flash(
-                f"Couldn't import row with label {entity.label} due to integrity error.", "danger"
-            )
-            app.logger.info("Integrity error during import: %s", error)
-            db.session.rollback()
-            continue
-        except Exception as error:
-            flash(f"Couldn't import row with label {entity.label} due to unknown error.", "danger")
-            app.logger.info("Unknown error during import: %s", error)
-            db.session.rollback()
-            continue
-        else:
-            imported += 1
-
-    db.session.delete(job)
-    db.session.commit()
 
-    flash(f"Successfully imported {imported} rows from file!", "success")
-    app.logger.info(
-        "Imported %d entities (%s) from file (%s).",
-        imported,
-        entity_class.__name__,
-        job.file.filename_exposed,
-    )
+@bp.route("/status/<int:id_>", methods=["GET"])
+@login_required
+def status(id_: int):
+    job = db.session.get(ImportJob, id_)
 
-    return redirect(url_for(".index"))
+    if job is None or job.user_id != current_user.id:
+        return {"error": f"No import with ID {id_}!"}, 404
+
+    if job.status in ImportJob.ACTIVE and executor.fail_stale_imports():
+        db.session.refresh(job)
+
+    return {
+        "status": job.status,
+        "processed": job.processed,
+        "failed": job.failed,
+        "message": job.message,
+    }
 
 
 @bp.route("/delete/<int:id_>", methods=["DELETE"])
@@ -187,6 +187,9 @@ def delete(id_: int):
     if job.user_id != current_user.id:
         return Message.ERROR("Only owner can delete import!")
 
+    if job.status in ImportJob.ACTIVE:
+        return Message.ERROR(f"Import {id_} is {job.status} and cannot be deleted!")
+
     try:
         db.session.delete(job)
         db.session.commit()
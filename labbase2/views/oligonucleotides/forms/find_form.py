@@ -1,6 +1,6 @@
 from flask import render_template
 from flask_wtf import FlaskForm
-from wtforms.fields import BooleanField, IntegerField, SubmitField, TextAreaField
+from wtforms.fields import IntegerField, SelectField, SubmitField, TextAreaField
 from wtforms.validators import DataRequired, Length, NumberRange
 
 from labbase2.forms import rendering
@@ -43,20 +43,25 @@ class FindOligonucleotide(FlaskForm):
         oligonucleotides (for instance for PCR). Lower numbers speed up the search.
         """,
     )
-    reverse_complement = BooleanField(
-        "Reverse complement",
-        default=False,
-        render_kw=rendering.boolean_field,
+    strands = SelectField(
+        "Strands",
+        choices=[
+            ("both", "Both strands"),
+            ("forward", "Forward"),
+            ("reverse", "Reverse complement"),
+        ],
+        default="both",
+        render_kw=rendering.select_field,
         description="""
-        Specificy if the original sequence or the reverse complement shall be queried.
-        If checked, the target sequence will be turned into the reverse complement 
-        before searching.
+        Specify if the original sequence, the reverse complement, or both shall be
+        queried. Both strands are searched in a single pass and each hit reports the
+        strand it binds to.
         """,
     )
     submit = SubmitField("Search", render_kw=rendering.submit_field)
 
     def fields(self) -> list:
-        return [self.sequence, self.min_match, self.max_len, self.reverse_complement]
+        return [self.sequence, self.min_match, self.max_len, self.strands]
 
     def render(self, action: str = "", method: str = "POST") -> str:
         return render_template(
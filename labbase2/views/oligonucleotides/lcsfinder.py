@@ -1,4 +1,11 @@
+import atexit
 import json
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
@@ -6,6 +13,88 @@ from numpy.typing import NDArray
 __all__ = ["LCSFinder", "LCSResult"]
 
 
+# The process pool is shared by all searches of this process.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers: int = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Get the process pool for searching, creating it if necessary.
+
+    Parameters
+    ----------
+    workers: int
+        The number of processes in the pool. If the existing pool has a different
+        size, it is replaced.
+
+    Returns
+    -------
+    ProcessPoolExecutor
+
+    Notes
+    -----
+    The processes are started by a fork server if available and spawned otherwise.
+    Forking the threaded app process directly could copy locks held by other
+    threads and deadlock the processes. The pool is shut down at exit.
+    """
+
+    global _executor, _executor_workers  # pylint: disable=global-statement
+
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            else:
+                atexit.register(_shutdown_executor)
+
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+            else:
+                context = multiprocessing.get_context("spawn")
+
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _executor_workers = workers
+
+        return _executor
+
+
+def _shutdown_executor() -> None:
+    global _executor  # pylint: disable=global-statement
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def _search_slice(
+    name: str,
+    length: int,
+    strands: int,
+    queries: list[str],
+    offset: int,
+    min_match: int,
+    chunk_bytes: int,
+) -> list[tuple[int, NDArray]]:
+    """Search a slice of queries against a target in shared memory.
+
+    This function is executed in the processes of the pool.
+    """
+
+    # The block is owned and unlinked by the parent process.
+    shm = SharedMemory(name=name)
+
+    try:
+        target = np.ndarray((length,), dtype=np.uint8, buffer=shm.buf)
+        hits = LCSFinder._hits(target, strands, queries, min_match, chunk_bytes)
+    finally:
+        target = None
+        shm.close()
+
+    return [(offset + i, profile) for i, profile in hits]
+
+
 class LCSFinder:
     """A class to find matching primers for a target sequence.
 
@@ -13,90 +102,408 @@ class LCSFinder:
     length. The instance can then be queried with any other sequence that
     consists only of "ATCG" and is not longer than 255 elements.
 
+    Parameters
+    ----------
+    seq: str
+        The target sequence.
+    strands: str
+        The strands of the target to search. One of 'forward', 'reverse' (the
+        reverse complement), or 'both'. If both strands are searched, they are
+        scored in the same pass and each result reports the strand with the
+        longer match. Defaults to 'forward'.
+
     Attributes
     ----------
     seq: NDArray
         The target sequence for which primers shall be found. The sequence is
         stored as a numpy array of dtype 'U1'.
-    idx2len: NDArray
-        A 2-dimensional array of unsigned 8-bit integers indicating the
-        longest substring at each position. Rows correspond to positions in
-        the queried sequence and columns correspond to positions in the
-        sequence the Seeker class was initialized with. The number of rows is
-        always 255, which therefor is the max length for the queried
-        sequence. This allows it to use dtype uint8 to reduce the footprint.
-    profile: NDArray
-        A 1-dimensional array of dtype uint8 the same length as 'seq'. The
-        profile indicates the longest substring at each position in 'seq'.
+
+    Notes
+    -----
+    The length of the longest common substring ending at each pair of positions
+    in the query and the target is computed one query position at a time. Only
+    the previous and the current row of this table are kept in memory, so the
+    memory needed scales with the length of the target. Lengths are stored as
+    unsigned 8-bit integers, which limits queries to 255 bases.
+
+    Querying the instance with a single sequence loops over the bases of the
+    query in Python. To search many sequences at once use `search`, which
+    scores all queries in a single vectorized pass.
     """
 
-    _bases: NDArray = np.array(["A", "T", "C", "G"], dtype=np.dtype("U1"))
+    # Lookup table to encode ASCII characters as small integers. Unknown characters
+    # are encoded as `_UNKNOWN` and never match. Queries are padded with `_PAD`.
+    _PAD: int = 4
+    _UNKNOWN: int = 255
+    _codes: NDArray = np.full(256, _UNKNOWN, dtype=np.uint8)
+    _codes[np.frombuffer(b"ACGT", dtype=np.uint8)] = np.arange(4, dtype=np.uint8)
+
+    # Maximum number of bytes of the arrays of a chunk of queries in `search`. This
+    # bounds the memory of a batch search.
+    chunk_bytes: int = 2**24
 
-    def __init__(self, seq: str):
-        self.seq = np.array(list(seq.upper()), dtype=np.dtype("U1"))
-        self.idx2len = np.zeros((255, len(self)), dtype=np.uint8)
-        self.profile = np.zeros_like(self.seq, dtype=np.ubyte)
-        self._base2idx = self._build_base2idx(self.seq)
+    # Number of bytes per cell (query x target position) of the arrays held by
+    # `_profiles`: two rows of the table, the profiles, and the matches.
+    _cell_bytes: int = 3 * np.dtype(np.uint8).itemsize + np.dtype(bool).itemsize
+
+    # Minimum number of cells of a search to split it across processes.
+    parallel_cells: int = 2**24
+
+    _complement: dict = str.maketrans("ACGT", "TGCA")
+
+    def __init__(self, seq: str, strands: str = "forward"):
+        seq = seq.upper()
+        self.seq = np.array(list(seq), dtype=np.dtype("U1"))
+
+        match strands:
+            case "forward":
+                strand_seqs = [("+", seq)]
+            case "reverse":
+                strand_seqs = [("-", seq.translate(self._complement)[::-1])]
+            case "both":
+                strand_seqs = [("+", seq), ("-", seq.translate(self._complement)[::-1])]
+            case _:
+                raise ValueError(f"Unknown strands '{strands}'!")
+
+        # The strands are concatenated and scored in a single pass.
+        self._strands = [
+            (strand, np.array(list(s), dtype=np.dtype("U1"))) for strand, s in strand_seqs
+        ]
+        self._encoded = self._encode("".join(s for _, s in strand_seqs))
 
     def __len__(self) -> int:
         return len(self.seq)
 
     def __call__(self, query: str) -> "LCSResult":
-        """
+        """Find the longest common substring of a query and the target sequence.
 
         Parameters
         ----------
-        query: Iterable
-            The query sequence. Should be an iterable that yields single
-            characters, e.g. a str or array of characters.
+        query: str
+            The query sequence. The query is not case-sensitive.
 
         Returns
         -------
-        None
-            This method doesn't return anything. It only sets attributes of
-            the Seeker class, which allows it to extract relevant information
-            afterwards.
+        LCSResult
+            The result for the query.
+
+        Raises
+        ------
+        ValueError
+            If the query is longer than 255 bases or contains characters other
+            than 'ATCG'.
         """
 
         if len(query) > 255:
             raise ValueError("Max supported query length is 255!")
+        if not self.supports(query):
+            raise ValueError("Query may only contain 'ATCG'!")
+
+        matrix, _ = self._encode_queries([query])
 
-        # Clear table from any previous searches.
-        self.idx2len[...] = 0
+        return self._result(self._profiles(self._encoded, matrix, len(self._strands))[0])
 
-        for i, base in enumerate(query.upper()):
-            j = self._base2idx[base]
-            self.idx2len[i, j] = self.idx2len[i - 1, j - 1] + 1
+    @classmethod
+    def supports(cls, query: str) -> bool:
+        """Check if a query can be searched with this class.
+
+        Parameters
+        ----------
+        query: str
+            The query sequence.
+
+        Returns
+        -------
+        bool
+            `True` if the query is at most 255 bases long and consists only of
+            'ATCG' (case-insensitive), `False` otherwise.
+        """
 
-        return LCSResult(self.seq, self.idx2len)
+        return len(query) <= 255 and set(query.upper()) <= set("ATCG")
+
+    def search(
+        self,
+        queries: Sequence[str],
+        min_match: int = 1,
+        limit: Optional[int] = None,
+        workers: int = 1,
+    ) -> list[tuple[int, "LCSResult"]]:
+        """Find the longest common substring for many queries at once.
+
+        All queries are packed into a padded matrix of uint8 codes. The table of
+        common substring lengths is then computed for all queries simultaneously,
+        one query position at a time. Queries are processed in chunks such that the
+        arrays of a chunk take at most `chunk_bytes` bytes.
+
+        Parameters
+        ----------
+        queries: Sequence[str]
+            The query sequences. Queries that are not supported (see `supports`)
+            are skipped.
+        min_match: int
+            The minimum length of the longest common substring for a query to be
+            considered a hit. Defaults to 1.
+        limit: Optional[int]
+            The maximum number of hits to return. Defaults to `None`, which means all
+            hits.
+        workers: int
+            The number of processes to split the queries across. Processes are only
+            used if the search comprises more than `parallel_cells` cells. Defaults
+            to 1, i.e., the search runs in the current process.
+
+        Returns
+        -------
+        list[tuple[int, LCSResult]]
+            A list of tuples with the index of the query in `queries` and the
+            corresponding result. The list is sorted from the longest to the shortest
+            common substring. Hits with the same length keep the order of `queries`.
+            The results are identical to calling the instance once per query.
+        """
+
+        if workers > 1 and len(queries) * len(self._encoded) > self.parallel_cells:
+            hits = self._search_parallel(queries, min_match, workers)
+        else:
+            hits = self._hits(
+                self._encoded, len(self._strands), queries, min_match, self.chunk_bytes
+            )
+
+        # Restore the order of queries before sorting by length (stable).
+        hits.sort(key=lambda x: x[0])
+        results = [(i, self._result(profile)) for i, profile in hits]
+        results.sort(key=lambda x: x[1].length, reverse=True)
+
+        return results[:limit]
+
+    def _result(self, profile: NDArray) -> "LCSResult":
+        """Create the result from the profile over all searched strands.
+
+        Parameters
+        ----------
+        profile: NDArray
+            The concatenated profiles of all strands.
+
+        Returns
+        -------
+        LCSResult
+            The result for the strand with the longest common substring. If the
+            strands tie, the first strand is reported.
+        """
+
+        results = [
+            LCSResult(seq, profile[i * len(self) : (i + 1) * len(self)], strand=strand)
+            for i, (strand, seq) in enumerate(self._strands)
+        ]
+
+        return max(results, key=lambda result: result.length)
+
+    def _search_parallel(
+        self, queries: Sequence[str], min_match: int, workers: int
+    ) -> list[tuple[int, NDArray]]:
+        """Split queries across a pool of processes.
+
+        The encoded target is placed in shared memory once. Each task only carries
+        a slice of the queries and the name of the shared memory block.
+
+        Parameters
+        ----------
+        queries: Sequence[str]
+            The query sequences.
+        min_match: int
+            The minimum length of the longest common substring of a hit.
+        workers: int
+            The number of processes.
+
+        Returns
+        -------
+        list[tuple[int, NDArray]]
+            A list of tuples with the index of the query in `queries` and its
+            profile. Only hits are included.
+        """
+
+        length = len(self._encoded)
+        shm = SharedMemory(create=True, size=max(1, length))
+
+        try:
+            np.ndarray((length,), dtype=np.uint8, buffer=shm.buf)[:] = self._encoded
+
+            # Use several tasks per process to balance the load.
+            size = math.ceil(len(queries) / (workers * 4))
+            futures = [
+                _get_executor(workers).submit(
+                    _search_slice,
+                    shm.name,
+                    length,
+                    len(self._strands),
+                    list(queries[start : start + size]),
+                    start,
+                    min_match,
+                    self.chunk_bytes,
+                )
+                for start in range(0, len(queries), size)
+            ]
+
+            return [hit for future in futures for hit in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
 
     @classmethod
-    def _build_base2idx(cls, seq) -> dict:
-        """Build a dict of positions for each base in 'seq'.
+    def _hits(
+        cls,
+        target: NDArray,
+        strands: int,
+        queries: Sequence[str],
+        min_match: int,
+        chunk_bytes: int,
+    ) -> list[tuple[int, NDArray]]:
+        """Compute the profiles of all queries that match an encoded target.
 
-        The dict is a helper for finding the longest common substring. For
-        each of the four bases 'ACTG' the dict contains an NDArray with the
-        positions of the base in 'seq'.
+        Parameters
+        ----------
+        target: NDArray
+            The encoded target sequence. If several strands are searched, the
+            strands are concatenated.
+        strands: int
+            The number of strands in `target`.
+        queries: Sequence[str]
+            The query sequences. Unsupported queries are skipped.
+        min_match: int
+            The minimum length of the longest common substring of a hit.
+        chunk_bytes: int
+            The maximum number of bytes of the arrays of a chunk of queries.
 
         Returns
         -------
-        None
+        list[tuple[int, NDArray]]
+            A list of tuples with the index of the query in `queries` and its
+            profile. Only hits are included.
         """
 
-        base2idx = {}
+        matrix, lengths = cls._encode_queries(queries)
+
+        # Skip queries that cannot be scored. Sorting by length keeps the padding
+        # within each chunk small.
+        valid = (lengths <= 255) & ~(matrix == cls._UNKNOWN).any(axis=1)
+        (order,) = valid.nonzero()
+        order = order[np.argsort(lengths[order], kind="stable")]
+
+        size = cls._chunk_size(len(target), chunk_bytes)
+        hits = []
 
-        for base in cls._bases:
-            (idx,) = (seq == base).nonzero()  # 'nonzero' returns tuples.
-            base2idx |= {base: idx}
+        for start in range(0, len(order), size):
+            idx = order[start : start + size]
+            profiles = cls._profiles(target, matrix[idx, : lengths[idx].max(initial=0)], strands)
+            scores = profiles.max(axis=1, initial=0)
 
-        return base2idx
+            for i in (scores >= min_match).nonzero()[0]:
+                hits.append((int(idx[i]), profiles[i].copy()))
+
+        return hits
+
+    @classmethod
+    def _chunk_size(cls, target_length: int, chunk_bytes: int) -> int:
+        """Get the number of queries whose profiles fit into `chunk_bytes` bytes."""
+
+        return max(1, chunk_bytes // (cls._cell_bytes * max(1, target_length)))
+
+    @staticmethod
+    def _profiles(target: NDArray, matrix: NDArray, strands: int = 1) -> NDArray:
+        """Compute the profiles for a matrix of encoded queries.
+
+        Parameters
+        ----------
+        target: NDArray
+            The encoded target sequence. If several strands are searched, the
+            strands are concatenated.
+        matrix: NDArray
+            A 2-dimensional array of uint8 codes with one query per row.
+        strands: int
+            The number of strands in `target`. Defaults to 1.
+
+        Returns
+        -------
+        NDArray
+            A 2-dimensional array of dtype uint8 with one profile per row.
+        """
+
+        n_queries, n_bases = matrix.shape
+        length = len(target) // strands
+
+        # Only two rows of the table are kept per query.
+        prev = np.zeros((n_queries, len(target)), dtype=np.uint8)
+        curr = np.empty_like(prev)
+        match = np.empty(prev.shape, dtype=bool)
+        profiles = np.zeros_like(prev)
+
+        for i in range(n_bases):
+            # Extend the diagonals. The first position of each strand continues
+            # matches from its last position, i.e., the target is circular.
+            np.add(prev[:, :-1], 1, out=curr[:, 1:])
+            for start in range(0, len(target), length):
+                np.add(prev[:, start + length - 1], 1, out=curr[:, start])
+            np.equal(matrix[:, i, None], target, out=match)
+            curr *= match
+            np.maximum(profiles, curr, out=profiles)
+            prev, curr = curr, prev
+
+        return profiles
+
+    @classmethod
+    def _encode(cls, seq: str) -> NDArray:
+        """Encode a sequence as an array of uint8 codes."""
+
+        return cls._codes[np.frombuffer(seq.encode("ascii", "replace"), dtype=np.uint8)]
+
+    @classmethod
+    def _encode_queries(cls, queries: Sequence[str]) -> tuple[NDArray, NDArray]:
+        """Pack queries into a padded matrix of uint8 codes.
+
+        Parameters
+        ----------
+        queries: Sequence[str]
+            The query sequences.
+
+        Returns
+        -------
+        tuple[NDArray, NDArray]
+            A 2-dimensional array with one encoded query per row padded with `_PAD`
+            and a 1-dimensional array with the length of each query.
+        """
+
+        lengths = np.fromiter(map(len, queries), dtype=np.intp, count=len(queries))
+        matrix = np.full((len(queries), lengths.max(initial=0)), cls._PAD, dtype=np.uint8)
+        matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = cls._encode(
+            "".join(queries).upper()
+        )
+
+        return matrix, lengths
 
 
 class LCSResult:
+    """The result of querying a `LCSFinder`.
+
+    Attributes
+    ----------
+    seq: NDArray
+        The target sequence as a numpy array of dtype 'U1'.
+    profile: NDArray
+        A 1-dimensional array of dtype uint8 the same length as 'seq'. The
+        profile indicates the longest substring ending at each position in 'seq'.
+    length: int
+        The length of the longest common substring.
+    start: int
+        The start position of the longest common substring in 'seq'.
+    lcs: str
+        The longest common substring.
+    strand: str
+        The strand of the target, either '+' (forward) or '-' (reverse
+        complement). 'seq', 'profile', and 'start' refer to this strand.
+    """
 
-    def __init__(self, seq: NDArray, idx2len: NDArray):
+    def __init__(self, seq: NDArray, profile: NDArray, strand: str = "+"):
         self.seq = seq
-        self.profile = idx2len.max(axis=0)
+        self.profile = profile
+        self.strand = strand
 
         lcs_pos = self.profile.argmax()
 
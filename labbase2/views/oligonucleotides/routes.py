@@ -1,13 +1,11 @@
-from Bio.Seq import Seq
 from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import and_, func, select
 from sqlalchemy.exc import IntegrityError
 
 from labbase2.database import db
-from labbase2.models import Oligonucleotide
+from labbase2.models import EntityCount, Oligonucleotide
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.comments.forms import EditComment
@@ -43,14 +41,23 @@ def index():
     except Exception as error:
         flash(str(error), "danger")
         entities = Oligonucleotide.filter_(order_by="label")
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "oligonucleotides/main.html",
         filter_form=form,
         import_file_form=UploadFile(),
         add_form=EditOligonucleotide(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(Oligonucleotide)),
+        entities=Oligonucleotide.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(Oligonucleotide),
         title="Oligonucleotides",
     )
 
@@ -149,33 +156,28 @@ def find():
         seq = form.sequence.data
         min_match = form.min_match.data
         max_len = form.max_len.data
+        strands = form.strands.data
         length = len(seq)
 
-        if form.reverse_complement.data:
-            seq = str(Seq(seq).reverse_complement())
-
-        lcsfinder = LCSFinder(seq)
+        lcsfinder = LCSFinder(seq, strands=strands)
         oligonucleotides = db.session.scalars(
-            select(Oligonucleotide).where(
-                and_(
-                    func.char_length(Oligonucleotide.sequence) >= min_match,
-                    func.char_length(Oligonucleotide.sequence) <= max_len,
-                )
+            Oligonucleotide.find_candidates(
+                seq, min_match=min_match, max_len=max_len, strands=strands
             )
-        )
-
-        for oligonucleotide in oligonucleotides:
-            try:
-                lcsresult = lcsfinder(oligonucleotide.sequence)
-            except Exception as error:
-                flash(str(error), "danger")
-                continue
-
-            if lcsresult.length >= min_match:
-                results.append((oligonucleotide, lcsresult))
-
-        # Sort results from longest to shorted common substring.
-        results.sort(key=lambda x: x[1].length, reverse=True)
+        ).all()
+        queries = [oligonucleotide.sequence for oligonucleotide in oligonucleotides]
+
+        for oligonucleotide, query in zip(oligonucleotides, queries):
+            if not LCSFinder.supports(query):
+                flash(f"Could not search oligonucleotide '{oligonucleotide.label}'!", "danger")
+
+        # Results are sorted from longest to shortest common substring.
+        results = [
+            (oligonucleotides[i], lcsresult)
+            for i, lcsresult in lcsfinder.search(
+                queries, min_match=min_match, workers=app.config["FIND_WORKERS"]
+            )
+        ]
     else:
         length = 0
 
@@ -2,10 +2,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import GlycerolStock, Plasmid
+from labbase2.models import EntityCount, GlycerolStock, Plasmid
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.files.forms import UploadFile
@@ -35,13 +34,22 @@ def index():
     except Exception as error:
         flash(str(error), "danger")
         entities = GlycerolStock.filter_(order_by="label")
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "bacteria/main.html",
         filter_form=form,
         add_form=EditBacterium(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(GlycerolStock)),
+        entities=GlycerolStock.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(GlycerolStock),
         title="Glycerol stocks",
     )
 
@@ -24,6 +24,8 @@ class FilterPlasmids(FilterForm):
         Some plasmids have a description informing about what the plasmid
         is/was used for. This can be searched. However, search queries should be
         restricted to single tags because the search is exact.
+    cut_once : StringField
+        Restriction enzymes that cut the plasmid exactly once.
     order_by : SelectField
         The attribute by which the results shall be ordered. This overrides
         the order_field field of the parent SearchBaseForm class.
@@ -73,6 +75,16 @@ class FilterPlasmids(FilterForm):
         contains the words "anne", "uv", <strong>AND</strong> "flyfos".
         """,
     )
+    cut_once = StringField(
+        label="Cut once by",
+        validators=[Optional()],
+        filters=[strip_input],
+        render_kw=rendering.custom_field | {"placeholder": "EcoRI BamHI"},
+        description="""
+        A whitespace separated list of restriction enzymes. Finds all plasmids that 
+        are cut exactly once by each of the enzymes.
+        """,
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -92,6 +104,7 @@ class FilterPlasmids(FilterForm):
             self.vector,
             self.owner_id,
             self.description,
+            self.cut_once,
             self.order_by,
             self.ascending,
         ]
@@ -2,10 +2,9 @@ from flask import Blueprint
 from flask import current_app as app
 from flask import flash, redirect, render_template, request
 from flask_login import current_user, login_required
-from sqlalchemy import func, select
 
 from labbase2.database import db
-from labbase2.models import BaseFile, Plasmid
+from labbase2.models import BaseFile, EntityCount, Plasmid
 from labbase2.utils.message import Message
 from labbase2.utils.permission_required import permission_required
 from labbase2.views.comments.forms import EditComment
@@ -43,14 +42,23 @@ def index():
     except Exception as error:
         flash(str(error), "danger")
         entities = Plasmid.filter_(order_by="label")
+        data = {"order_by": "label", "ascending": True}
 
     return render_template(
         "plasmids/main.html",
         filter_form=form,
         import_file_form=UploadFile(),
         add_form=EditPlasmid(formdata=None),
-        entities=db.paginate(entities, page=page, per_page=app.config["PER_PAGE"]),
-        total=db.session.scalar(select(func.count()).select_from(Plasmid)),
+        entities=Plasmid.paginate(
+            entities,
+            data["order_by"],
+            data["ascending"],
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            page=page,
+            per_page=app.config["PER_PAGE"],
+        ),
+        total=EntityCount.get(Plasmid),
         title="Plasmids",
     )
 
@@ -177,6 +185,11 @@ def upload_plasmid_file(id_: int, type_: str):
 
     db.session.commit()
 
+    # Parse the new plasmid file once so that listing plasmids does not have to.
+    if type_ == "file":
+        plasmid.sequence_cache()
+        db.session.commit()
+
     return redirect(request.referrer)
 
 
@@ -1,4 +1,5 @@
 import pytest
+from flask import url_for
 
 from labbase2 import create_app
 from labbase2.database import db
@@ -6,7 +7,13 @@ from labbase2.models import Group, User
 
 
 @pytest.fixture
-def app():
+def config(request) -> dict:
+    # Tests override config values with `parametrize("config", [...], indirect=True)`.
+    return getattr(request, "param", {})
+
+
+@pytest.fixture
+def app(config):
     app = create_app(
         config_dict={
             "TESTING": True,
@@ -14,7 +21,9 @@ def app():
             "SERVER_NAME": "localhost",
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "USER": ["Max", "Mustermann", "test@test.de"],
+            "IMPORT_WORKERS": 0,
         }
+        | config
     )
 
     yield app
@@ -23,3 +32,14 @@ def app():
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture
+def login(app, client):
+    with app.app_context():
+        client.post(
+            url_for("auth.login"),
+            data={"email": "test@test.de", "password": "admin", "submit": True},
+        )
+
+    return client
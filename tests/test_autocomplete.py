@@ -0,0 +1,132 @@
+from time import perf_counter
+
+from flask import url_for
+from sqlalchemy import update
+
+from labbase2 import autocomplete
+from labbase2.autocomplete import LabelIndex
+from labbase2.database import db
+from labbase2.models import Plasmid
+
+
+def _labels(results) -> list[str]:
+    return [label for _, label, _ in results]
+
+
+def test_complete_prefix_and_substring():
+    index = LabelIndex()
+    index.build(
+        [
+            (1, "pRS-10", "plasmid"),
+            (2, "pRS-2", "plasmid"),
+            (3, "oRS-1", "oligonucleotide"),
+            (4, "Anti-GFP", "antibody"),
+            (5, "prs-3", "plasmid"),
+        ]
+    )
+
+    assert _labels(index.complete("prs")) == ["pRS-10", "pRS-2", "prs-3"]
+    assert _labels(index.complete("PRS-1")) == ["pRS-10"]
+    assert _labels(index.complete("rs-1")) == ["oRS-1", "pRS-10"]
+    assert _labels(index.complete("gfp")) == ["Anti-GFP"]
+    assert _labels(index.complete("prs", limit=2)) == ["pRS-10", "pRS-2"]
+    assert index.complete("xyz") == []
+    assert index.complete("  ") == []
+
+
+def test_add_and_remove():
+    index = LabelIndex()
+    index.build([(1, "pRS-1", "plasmid")])
+
+    index.add(2, "pRS-2", "plasmid")
+    index.add(1, "pAB-1", "plasmid")
+
+    assert _labels(index.complete("prs")) == ["pRS-2"]
+    assert _labels(index.complete("pab")) == ["pAB-1"]
+
+    index.remove(1)
+    index.remove(42)
+
+    assert index.complete("pab") == []
+    assert len(index) == 1
+
+
+def test_complete_is_fast():
+    index = LabelIndex()
+    index.build((i, f"pRS-{i}", "plasmid") for i in range(100_000))
+
+    start = perf_counter()
+    for query in ("prs-9", "rs-123", "999", "S-5000", "rs-"):
+        assert index.complete(query)
+    duration = (perf_counter() - start) / 5
+
+    assert duration < 0.01
+
+
+def test_index_follows_commits(app):
+    with app.app_context():
+        plasmid = Plasmid(label="pRS-1", insert="GFP", owner_id=1)
+        db.session.add(plasmid)
+        db.session.flush()
+
+        assert autocomplete.complete("prs") == []
+
+        db.session.commit()
+
+        assert _labels(autocomplete.complete("prs")) == ["pRS-1"]
+
+        plasmid.label = "pAB-1"
+        db.session.flush()
+        db.session.rollback()
+
+        assert _labels(autocomplete.complete("prs")) == ["pRS-1"]
+
+        db.session.delete(plasmid)
+        db.session.commit()
+
+        assert autocomplete.complete("prs") == []
+
+
+def test_index_ignores_rolled_back_savepoints(app):
+    with app.app_context():
+        db.session.add(Plasmid(label="pRS-1", insert="GFP", owner_id=1))
+
+        savepoint = db.session.begin_nested()
+        db.session.add(Plasmid(label="pRS-2", insert="GFP", owner_id=1))
+        db.session.flush()
+        savepoint.rollback()
+
+        with db.session.begin_nested():
+            db.session.add(Plasmid(label="pRS-3", insert="GFP", owner_id=1))
+
+        db.session.commit()
+
+        assert _labels(autocomplete.complete("prs")) == ["pRS-1", "pRS-3"]
+
+
+def test_index_follows_bulk_updates(app):
+    with app.app_context():
+        plasmid = Plasmid(label="pRS-1", insert="GFP", owner_id=1)
+        db.session.add(plasmid)
+        db.session.commit()
+
+        db.session.execute(update(Plasmid), [{"id": plasmid.id, "label": "pAB-1"}])
+        db.session.commit()
+
+        assert _labels(autocomplete.complete("pab")) == ["pAB-1"]
+        assert autocomplete.complete("prs") == []
+
+
+def test_autocomplete_endpoint(app, client):
+    with app.app_context(), client:
+        client.post(
+            url_for("auth.login"),
+            data={"email": "test@test.de", "password": "admin", "submit": True},
+        )
+        db.session.add(Plasmid(label="pRS-1", insert="GFP", owner_id=1))
+        db.session.commit()
+
+        response = client.get(url_for("base.complete", q="prs"))
+
+        assert response.status_code == 200
+        assert response.json["results"] == [{"id": 1, "label": "pRS-1", "entity_type": "plasmid"}]
@@ -0,0 +1,195 @@
+import random
+
+import numpy as np
+import pytest
+
+from labbase2.views.oligonucleotides import lcsfinder
+from labbase2.views.oligonucleotides.lcsfinder import LCSFinder, LCSResult
+
+
+def _random_seq(rng: random.Random, length: int, alphabet: str = "ACGT") -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def _reference_call(finder: LCSFinder, query: str) -> LCSResult:
+    # The original implementation with a full table of 255 x len(target).
+    if len(query) > 255:
+        raise ValueError("Max supported query length is 255!")
+
+    base2idx = {base: (finder.seq == base).nonzero()[0] for base in "ATCG"}
+    idx2len = np.zeros((255, len(finder)), dtype=np.uint8)
+
+    for i, base in enumerate(query.upper()):
+        j = base2idx[base]
+        idx2len[i, j] = idx2len[i - 1, j - 1] + 1
+
+    return LCSResult(finder.seq, idx2len.max(axis=0))
+
+
+def _reference(finder: LCSFinder, queries: list[str], min_match: int) -> list:
+    results = []
+
+    for i, query in enumerate(queries):
+        try:
+            result = _reference_call(finder, query)
+        except Exception:  # pylint: disable=broad-exception-caught
+            continue
+
+        if result.length >= min_match:
+            results.append((i, result))
+
+    results.sort(key=lambda x: x[1].length, reverse=True)
+
+    return results
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_search_matches_single_queries(seed):
+    rng = random.Random(seed)
+    target = _random_seq(rng, 300)
+    finder = LCSFinder(target)
+
+    queries = [_random_seq(rng, rng.randint(0, 40)) for _ in range(200)]
+
+    # Add true substrings, including one wrapping around the end of the target.
+    queries += [target[i : i + rng.randint(8, 30)] for i in rng.sample(range(270), 20)]
+    queries += [target[-6:] + target[:10], target.lower()[50:80]]
+
+    # Unsupported queries are skipped.
+    queries += ["ACGTNACGT", "A" * 256]
+
+    # Use small chunks to cover chunking.
+    finder.chunk_bytes = 4 * 300 * 17
+
+    for min_match in (1, 6, 12):
+        expected = _reference(finder, queries, min_match)
+        actual = finder.search(queries, min_match=min_match)
+
+        assert [i for i, _ in actual] == [i for i, _ in expected]
+
+        for (_, result), (_, reference) in zip(actual, expected):
+            assert result.length == reference.length
+            assert result.start == reference.start
+            assert result.lcs == reference.lcs
+            assert result.to_jsarray() == reference.to_jsarray()
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_call_matches_reference(seed):
+    rng = random.Random(seed)
+    target = _random_seq(rng, 200)
+    finder = LCSFinder(target)
+
+    queries = [_random_seq(rng, rng.randint(1, 60)) for _ in range(50)]
+    queries += [target[150:190], target[-10:] + target[:10]]
+
+    for query in queries:
+        result = finder(query)
+        reference = _reference_call(finder, query)
+
+        assert result.length == reference.length
+        assert result.start == reference.start
+        assert result.lcs == reference.lcs
+        assert result.to_jsarray() == reference.to_jsarray()
+
+
+def test_call_rejects_unsupported_queries():
+    finder = LCSFinder("ACGTACGT")
+
+    with pytest.raises(ValueError):
+        finder("A" * 256)
+    with pytest.raises(ValueError):
+        finder("ACGTN")
+
+
+def test_search_limit():
+    target = "ACGTTGCAAGGCTTACCGATGCA"
+    finder = LCSFinder(target)
+    queries = [target[:5], target[2:15], "TTTT", target[4:12]]
+
+    results = finder.search(queries, min_match=3, limit=2)
+
+    assert [i for i, _ in results] == [1, 3]
+    assert results[0][1].lcs == target[2:15]
+
+
+def test_supports():
+    assert LCSFinder.supports("acgtACGT")
+    assert not LCSFinder.supports("ACGTN")
+    assert not LCSFinder.supports("A" * 256)
+
+
+def test_parallel_search_matches_serial():
+    rng = random.Random(3)
+    target = _random_seq(rng, 500)
+    finder = LCSFinder(target)
+
+    queries = [_random_seq(rng, rng.randint(10, 40)) for _ in range(300)]
+    queries += [target[i : i + 25] for i in range(0, 475, 25)]
+    queries += ["ACGTNACGT"]
+
+    serial = finder.search(queries, min_match=8)
+
+    finder.parallel_cells = 0
+    parallel = finder.search(queries, min_match=8, workers=2)
+
+    assert [i for i, _ in parallel] == [i for i, _ in serial]
+
+    for (_, result), (_, reference) in zip(parallel, serial):
+        assert result.lcs == reference.lcs
+        assert result.to_jsarray() == reference.to_jsarray()
+
+    # Processes are never forked from the threaded app process.
+    context = lcsfinder._get_executor(2)._mp_context  # pylint: disable=protected-access
+    assert context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_both_strands_in_one_pass():
+    rng = random.Random(4)
+    target = _random_seq(rng, 300)
+    reverse = target.translate(str.maketrans("ACGT", "TGCA"))[::-1]
+
+    queries = [_random_seq(rng, rng.randint(10, 30)) for _ in range(100)]
+    queries += [target[10:35], reverse[40:70], reverse[-5:] + reverse[:15]]
+
+    forward = dict(LCSFinder(target).search(queries, min_match=8))
+    backward = dict(LCSFinder(reverse).search(queries, min_match=8))
+    both = LCSFinder(target, strands="both").search(queries, min_match=8)
+
+    assert {i for i, _ in both} == set(forward) | set(backward)
+
+    for i, result in both:
+        best_forward = forward[i].length if i in forward else 0
+        best_backward = backward[i].length if i in backward else 0
+
+        if best_backward > best_forward:
+            assert result.strand == "-"
+            assert result.lcs == backward[i].lcs
+            assert result.to_jsarray() == backward[i].to_jsarray()
+        else:
+            assert result.strand == "+"
+            assert result.lcs == forward[i].lcs
+            assert result.to_jsarray() == forward[i].to_jsarray()
+
+    assert LCSFinder(target, strands="reverse")(reverse[40:70]).strand == "-"
+
+
+def test_search_chunks_by_bytes(monkeypatch):
+    rng = random.Random(5)
+    target = _random_seq(rng, 1000)
+    finder = LCSFinder(target)
+    finder.chunk_bytes = 40_000
+
+    sizes = []
+    profiles = LCSFinder._profiles  # pylint: disable=protected-access
+
+    def recording_profiles(target, matrix, strands=1):
+        sizes.append(len(matrix))
+        return profiles(target, matrix, strands)
+
+    monkeypatch.setattr(LCSFinder, "_profiles", staticmethod(recording_profiles))
+
+    finder.search([_random_seq(rng, 20) for _ in range(25)], min_match=8)
+
+    # Two rows of the table, the profiles, and the matches take 1 byte per cell each.
+    assert sizes == [10, 10, 5]
@@ -0,0 +1,74 @@
+from datetime import date
+
+from labbase2.database import db
+from labbase2.models import Antibody, Batch, EntityCount, Oligonucleotide, Plasmid
+
+
+def _add_oligonucleotide(label: str) -> Oligonucleotide:
+    oligonucleotide = Oligonucleotide(
+        label=label, sequence="ACGT", date_ordered=date.today(), owner_id=1
+    )
+    db.session.add(oligonucleotide)
+
+    return oligonucleotide
+
+
+def test_counts_follow_inserts_and_deletes(app):
+    with app.app_context():
+        assert EntityCount.get(Oligonucleotide) == 0
+
+        first = _add_oligonucleotide("oRS-1")
+        _add_oligonucleotide("oRS-2")
+        db.session.add(Plasmid(label="pRS-1", insert="GFP", owner_id=1))
+        db.session.commit()
+
+        assert EntityCount.get(Oligonucleotide) == 2
+        assert EntityCount.get(Plasmid) == 1
+
+        db.session.delete(first)
+        db.session.commit()
+
+        assert EntityCount.get(Oligonucleotide) == 1
+
+
+def test_counts_are_rolled_back(app):
+    with app.app_context():
+        _add_oligonucleotide("oRS-1")
+        db.session.flush()
+
+        assert EntityCount.get(Oligonucleotide) == 1
+
+        db.session.rollback()
+
+        assert EntityCount.get(Oligonucleotide) == 0
+
+
+def test_counts_batches(app):
+    with app.app_context():
+        antibody = Antibody(label="Anti-GFP", host="Rabbit", antigen="GFP", owner_id=1)
+        antibody.batches.append(
+            Batch(supplier="Sigma", article_number="1", storage_place="Fridge", lot="1")
+        )
+        db.session.add(antibody)
+        db.session.commit()
+
+        assert EntityCount.get(Antibody) == 1
+        assert EntityCount.get(Batch) == 1
+
+        db.session.delete(antibody.batches[0])
+        db.session.commit()
+
+        assert EntityCount.get(Antibody) == 1
+        assert EntityCount.get(Batch) == 0
+
+
+def test_rebuild(app):
+    with app.app_context():
+        _add_oligonucleotide("oRS-1")
+        db.session.commit()
+
+        db.session.execute(db.update(EntityCount).values(count=42))
+        EntityCount.rebuild()
+
+        assert EntityCount.get(Oligonucleotide) == 1
+        assert EntityCount.get(Plasmid) == 0
@@ -0,0 +1,108 @@
+import io
+import json
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import event, select
+
+from labbase2 import models
+from labbase2.database import db
+
+
+def _add_oligonucleotides(n: int) -> None:
+    for i in range(n):
+        oligonucleotide = models.Oligonucleotide(
+            label=f"oRS-{i}",
+            sequence="ACGT" * (i + 1),
+            owner_id=1,
+            date_ordered=date(2024, 1, i + 1),
+            storage_place="Box 1" if i % 2 else None,
+        )
+        db.session.add(oligonucleotide)
+
+    db.session.commit()
+
+
+def test_export_to_csv(app, monkeypatch):
+    with app.test_request_context():
+        _add_oligonucleotides(5)
+        query = select(models.Oligonucleotide).order_by(models.Oligonucleotide.id)
+
+        monkeypatch.setattr(models.Oligonucleotide, "export_chunk_size", 2)
+        response = models.Oligonucleotide.export_to_csv(query)
+
+        assert response.is_streamed
+        assert "attachment" in response.headers["Content-Disposition"]
+
+        exported = pd.read_csv(io.StringIO(response.get_data(as_text=True)), index_col=0)
+        expected = models.Oligonucleotide.to_df(query).to_csv()
+        expected = pd.read_csv(io.StringIO(expected), index_col=0)
+
+        pd.testing.assert_frame_equal(exported, expected)
+
+
+def test_export_to_json(app):
+    with app.test_request_context():
+        _add_oligonucleotides(3)
+        query = select(models.Oligonucleotide).order_by(models.Oligonucleotide.id)
+
+        response = models.Oligonucleotide.export_to_json(query)
+        records = json.loads(response.get_data(as_text=True))
+
+        assert [r["label"] for r in records] == ["oRS-0", "oRS-1", "oRS-2"]
+        assert records[1]["date_ordered"] == "2024-01-02"
+        assert records[0]["storage_place"] is None
+        assert records[0]["comments"] == []
+
+
+def test_export_empty(app):
+    with app.test_request_context():
+        query = select(models.Oligonucleotide)
+
+        assert models.Oligonucleotide.export_to_csv(query).get_data() == b""
+        assert json.loads(models.Oligonucleotide.export_to_json(query).get_data()) == []
+
+
+def test_export_select_constant_queries(app):
+    with app.test_request_context():
+        _add_oligonucleotides(10)
+
+        for id_ in (1, 2, 2):
+            comment = models.Comment(entity_id=id_, user_id=1, subject="Test", text="Text")
+            db.session.add(comment)
+        db.session.commit()
+        db.session.expire_all()
+
+        statements = []
+
+        def count(*_):
+            statements.append(1)
+
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            query = models.Oligonucleotide.filter_(order_by="label")
+            records = json.loads(models.Oligonucleotide.export_to_json(query).get_data())
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+
+        assert len(records) == 10
+        assert len(statements) == 1
+
+        comments = {r["id"]: r["comments"] for r in records}
+        assert [c["subject"] for c in comments[1]] == ["Test"]
+        assert len(comments[2]) == 2
+        assert comments[3] == []
+
+
+def test_export_excludes_counts(app):
+    with app.test_request_context():
+        db.session.add(models.Chemical(label="NaCl", owner_id=1))
+        db.session.commit()
+
+        query = select(models.Chemical)
+        records = json.loads(models.Chemical.export_to_json(query).get_data(as_text=True))
+
+        assert records[0]["label"] == "NaCl"
+        assert "batch_count" not in records[0]
+        assert "stock_count" not in records[0]
+        assert "stock_count" not in models.Chemical.to_df(query).columns
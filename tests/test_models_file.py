@@ -0,0 +1,84 @@
+import os
+
+from flask import url_for
+from PIL import Image
+
+from labbase2.database import db
+from labbase2.models import BaseFile
+
+
+def _add_image(app, tmp_path, name: str = "image.jpg", mode: str = "RGB") -> BaseFile:
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    file = BaseFile(user_id=1, filename_exposed=name)
+    db.session.add(file)
+    db.session.flush()
+    file.set_filename()
+    db.session.commit()
+
+    Image.new(mode, (2000, 1000), "red").save(file.path)
+
+    return file
+
+
+def test_create_derivatives(app, tmp_path):
+    with app.app_context():
+        file = _add_image(app, tmp_path)
+        original = file.path.read_bytes()
+
+        paths = file.create_derivatives()
+
+        assert set(paths) == set(app.config["DERIVATIVE_SIZES"])
+        assert file.path.read_bytes() == original
+
+        for size, longest in app.config["DERIVATIVE_SIZES"].items():
+            with Image.open(paths[size]) as image:
+                assert image.format == "JPEG"
+                assert image.size == (longest, longest // 2)
+
+
+def test_derivative_keeps_transparency(app, tmp_path):
+    with app.app_context():
+        file = _add_image(app, tmp_path, "image.png", "RGBA")
+
+        with Image.open(file.derivative("thumbnail")) as image:
+            assert image.format == "PNG"
+            assert image.mode == "RGBA"
+
+
+def test_derivative_is_cached(app, tmp_path):
+    with app.app_context():
+        file = _add_image(app, tmp_path)
+
+        path = file.derivative("thumbnail")
+        created = path.stat().st_mtime_ns
+
+        assert file.derivative("thumbnail") == path
+        assert path.stat().st_mtime_ns == created
+
+        # A modified original is downscaled again.
+        os.utime(file.path, (path.stat().st_atime + 10, path.stat().st_mtime + 10))
+
+        assert file.derivative("thumbnail").stat().st_mtime_ns != created
+
+
+def test_derivative_route(app, client, tmp_path):
+    with app.app_context():
+        file = _add_image(app, tmp_path)
+
+        client.post(url_for("auth.login"), data={"email": "test@test.de", "password": "admin"})
+
+        response = client.get(url_for("files.derivative", id_=file.id, size="thumbnail"))
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/jpeg"
+        assert response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+
+        response = client.get(
+            url_for("files.derivative", id_=file.id, size="thumbnail"),
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+        assert response.status_code == 304
+        assert client.get(url_for("files.derivative", id_=file.id, size="huge")).status_code == 404
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from labbase2.database import db
+from labbase2.models import Oligonucleotide
+
+
+def _add_oligonucleotides() -> None:
+    for i in range(10):
+        db.session.add(
+            Oligonucleotide(
+                label=f"oRS-{i}",
+                sequence="ACGT",
+                date_ordered=date(2024, 1, 1 + i % 3),
+                storage_place=None if i % 4 == 0 else f"Box {i % 2}",
+                owner_id=1,
+            )
+        )
+
+    db.session.commit()
+
+
+def _walk(order_by: str, ascending: bool, per_page: int = 3) -> list[list[int]]:
+    query = Oligonucleotide.filter_(order_by=order_by, ascending=ascending)
+
+    pages = [Oligonucleotide.paginate(query, order_by, ascending, per_page=per_page)]
+    while pages[-1].has_next:
+        pages.append(
+            Oligonucleotide.paginate(
+                query, order_by, ascending, after=pages[-1].next_cursor, per_page=per_page
+            )
+        )
+
+    return pages
+
+
+@pytest.mark.parametrize("order_by", ["id", "storage_place", "date_ordered", "length"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_paginate_forward(app, order_by, ascending):
+    with app.app_context():
+        _add_oligonucleotides()
+
+        pages = _walk(order_by, ascending)
+        ids = [entity.id for page in pages for entity in page]
+
+        assert len(ids) == 10
+        assert len(set(ids)) == 10
+        assert not pages[0].has_prev
+        assert all(page.has_prev for page in pages[1:])
+        assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+
+@pytest.mark.parametrize("order_by", ["id", "storage_place", "date_ordered"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_paginate_backward(app, order_by, ascending):
+    with app.app_context():
+        _add_oligonucleotides()
+
+        query = Oligonucleotide.filter_(order_by=order_by, ascending=ascending)
+        pages = _walk(order_by, ascending)
+
+        for previous, page in zip(pages, pages[1:]):
+            before = Oligonucleotide.paginate(
+                query, order_by, ascending, before=page.prev_cursor, per_page=3
+            )
+
+            assert [entity.id for entity in before] == [entity.id for entity in previous]
+            assert before.has_next
+            assert before.has_prev == previous.has_prev
+
+
+def test_paginate_invalid_cursor(app):
+    with app.app_context():
+        _add_oligonucleotides()
+
+        query = Oligonucleotide.filter_(order_by="label")
+        page = Oligonucleotide.paginate(query, "label", after="invalid", per_page=3)
+
+        assert not page.has_prev
+        assert page.first == 1
+        assert [entity.label for entity in page] == ["oRS-0", "oRS-1", "oRS-2"]
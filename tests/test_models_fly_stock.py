@@ -0,0 +1,95 @@
+from sqlalchemy import delete, update
+
+from labbase2.database import db
+from labbase2.models import FlyStock
+from labbase2.models.fly_stock import fly_stock_allele
+
+
+def _add_stocks() -> None:
+    db.session.add_all(
+        [
+            FlyStock(label="RSF-1", chromosome_2a="UAS-GFP", chromosome_3a="P{GawB}elav[C155]"),
+            FlyStock(label="RSF-2", chromosome_3a="UAS-GFP, tub-Gal80[ts]", chromosome_3b="Gal4"),
+            FlyStock(label="RSF-3", chromosome_xa="w[1118]", chromosome_3a="Gal4"),
+        ]
+    )
+    for stock in db.session.new:
+        stock.owner_id = 1
+    db.session.commit()
+
+
+def _labels(**fields) -> list[str]:
+    query = FlyStock.filter_(order_by="label", **fields)
+    return [stock.label for stock in db.session.scalars(query)]
+
+
+def test_alleles():
+    assert FlyStock.alleles("+") == set()
+    assert FlyStock.alleles(None) == set()
+    assert FlyStock.alleles("UAS-GFP, tub-Gal80[ts]") == {"uas-gfp", "tub-gal80[ts]"}
+    assert FlyStock.alleles("P{w[+mC]=UAS-GFP}attP2") == {"p{w[+mc]=uas-gfp}attp2", "uas-gfp"}
+
+
+def test_filter_by_alleles(app):
+    with app.app_context():
+        _add_stocks()
+
+        assert _labels(alleles="UAS-GFP") == ["RSF-1", "RSF-2"]
+        assert _labels(alleles="uas-gfp, gal4") == ["RSF-2"]
+        assert _labels(alleles="gawb elav[c155]") == []
+        assert _labels(alleles="GawB") == ["RSF-1"]
+        assert _labels(chromosome_3="UAS-GFP") == ["RSF-2"]
+        assert _labels(chromosome_x="w[1118]", chromosome_3="gal4") == ["RSF-3"]
+
+
+def test_allele_index_follows_changes(app):
+    with app.app_context():
+        _add_stocks()
+
+        stock = db.session.scalar(db.select(FlyStock).where(FlyStock.label == "RSF-1"))
+        stock.chromosome_2a = "+"
+        stock.chromosome_2b = "Cy"
+        db.session.commit()
+
+        assert _labels(alleles="UAS-GFP") == ["RSF-2"]
+        assert _labels(chromosome_2="Cy") == ["RSF-1"]
+
+        db.session.execute(update(FlyStock), [{"id": stock.id, "chromosome_4a": "ey-FLP"}])
+        db.session.commit()
+
+        assert _labels(alleles="ey-flp, cy") == ["RSF-1"]
+
+        db.session.delete(stock)
+        db.session.commit()
+
+        assert _labels(alleles="cy") == []
+        assert (
+            db.session.scalar(
+                db.select(db.func.count()).where(fly_stock_allele.c.fly_stock_id == stock.id)
+            )
+            == 0
+        )
+
+
+def test_build_allele_index(app):
+    with app.app_context():
+        _add_stocks()
+
+        db.session.execute(delete(fly_stock_allele))
+
+        assert FlyStock.allele_index_outdated()
+
+        FlyStock.build_allele_index()
+
+        assert not FlyStock.allele_index_outdated()
+        assert _labels(alleles="gal4") == ["RSF-2", "RSF-3"]
+
+
+def test_allele_index_ignores_fly_stocks_without_alleles(app):
+    with app.app_context():
+        stock = FlyStock(label="RSF-4", chromosome_2a=";", chromosome_3a="+,+", owner_id=1)
+        db.session.add(stock)
+        db.session.commit()
+
+        assert FlyStock.alleles(";") == FlyStock.alleles("+,+") == set()
+        assert not FlyStock.allele_index_outdated()
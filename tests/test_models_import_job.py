@@ -0,0 +1,320 @@
+from datetime import date
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import PatternFill
+from sqlalchemy import event, func, select, update
+
+from labbase2 import models
+from labbase2.database import db
+
+
+def _add_job(app, tmp_path, lines: list[str], **mapping) -> models.ImportJob:
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    file = models.BaseFile(user_id=1, filename_exposed="import.csv", filename_internal="import.csv")
+    job = models.ImportJob(user_id=1, file=file, entity_type="plasmid")
+
+    mapping = {"label": "label", "insert": "insert"} | mapping
+
+    for field in ["id"] + models.Plasmid.importable_fields():
+        column = mapping.get(field)
+        job.mappings.append(models.ColumnMapping(mapped_field=field, input_column=column))
+
+    db.session.add(job)
+    db.session.commit()
+
+    file.path.write_text("\n".join(["label,insert,cloning_date"] + lines))
+
+    return job
+
+
+def test_run(app, tmp_path):
+    with app.app_context():
+        existing = models.Plasmid(label="pRS-3", insert="GFP", owner_id=1)
+        db.session.add(existing)
+        db.session.commit()
+
+        lines = [f"pRS-{i},GFP,2024-01-01" for i in range(10)]
+        lines.insert(6, "pRS-1,RFP,2024-01-01")
+        job = _add_job(app, tmp_path, lines)
+
+        # The progress is committed with every chunk.
+        progress = []
+
+        def listener(session):
+            if not session.in_nested_transaction():
+                progress.append((job.processed, job.failed))
+
+        event.listen(db.session, "before_commit", listener)
+
+        try:
+            imported, failed = job.run(chunk_size=4)
+        finally:
+            event.remove(db.session, "before_commit", listener)
+
+        assert imported == 9
+        assert failed == [("pRS-3", "integrity error"), ("pRS-1", "integrity error")]
+        assert progress[:3] == [(3, 1), (6, 2), (9, 2)]
+
+        count = db.session.scalar(select(func.count()).select_from(models.Plasmid))
+        assert count == 10
+
+        plasmid = db.session.scalar(select(models.Plasmid).where(models.Plasmid.label == "pRS-1"))
+        assert plasmid.owner_id == 1
+        assert plasmid.insert == "GFP"
+
+
+def test_run_resumes_after_failure(app, tmp_path, monkeypatch):
+    with app.app_context():
+        db.session.add(models.Plasmid(label="pRS-1", insert="GFP", owner_id=1))
+        db.session.commit()
+
+        job = _add_job(app, tmp_path, [f"pRS-{i},GFP,2024-01-01" for i in range(6)])
+        normalize_table = models.Plasmid.normalize_table
+        calls = []
+
+        def fail_second_chunk(table):
+            calls.append(list(table["label"]))
+            if len(calls) == 2:
+                raise RuntimeError("The worker was stopped.")
+            return normalize_table(table)
+
+        monkeypatch.setattr(models.Plasmid, "normalize_table", fail_second_chunk)
+
+        try:
+            job.run(chunk_size=2)
+        except RuntimeError:
+            db.session.rollback()
+        else:
+            raise AssertionError("The second chunk did not fail.")
+
+        assert (job.processed, job.failed, job.committed_rows) == (1, 1, 2)
+
+        # Running the import again skips the committed chunk.
+        imported, failed = job.run(chunk_size=2)
+
+        assert calls[2:] == [["pRS-2", "pRS-3"], ["pRS-4", "pRS-5"]]
+        assert imported == 5
+        assert failed == [("pRS-1", "integrity error")]
+        assert job.report == [["pRS-1", "integrity error"]]
+
+        count = db.session.scalar(select(func.count()).select_from(models.Plasmid))
+        assert count == 6
+
+
+def test_validate(app, tmp_path):
+    with app.app_context():
+        db.session.add(models.Plasmid(label="pRS-3", insert="GFP", owner_id=1))
+        db.session.commit()
+
+        lines = ["pRS-1,GFP,2024-01-01", "pRS-2,,2024-01-01", "pRS-3,GFP,", "pRS-1,GFP,01.01.2024"]
+        job = _add_job(app, tmp_path, lines, cloning_date="cloning_date")
+
+        assert job.validate() == [
+            (2, "'insert' is required."),
+            (3, "'label' pRS-3 already exists."),
+            (4, "'cloning_date' is not a date (YYYY-MM-DD)."),
+            (4, "'label' pRS-1 appears more than once in the file."),
+        ]
+
+        # The file is not touched by the validation.
+        assert db.session.scalar(select(func.count()).select_from(models.Plasmid)) == 1
+
+
+def test_validate_mapping(app, tmp_path):
+    with app.app_context():
+        job = _add_job(app, tmp_path, ["pRS-1,GFP,2024-01-01"], insert=None, vector="vector")
+
+        assert job.validate() == [
+            (None, "Column 'vector' does not exist in the file."),
+            (None, "'insert' is required but not mapped to any column."),
+        ]
+
+
+def test_read_table_cached(app, tmp_path, monkeypatch):
+    with app.app_context():
+        job = _add_job(app, tmp_path, ["pRS-1,GFP,2024-01-01"])
+        table = job.file.read_table()
+
+        assert job.file.cache_path.exists()
+
+        # The cached table is used as long as the file is not modified.
+        monkeypatch.setattr(pd, "read_csv", None)
+        pd.testing.assert_frame_equal(job.file.read_table(), table)
+
+        db.session.delete(job)
+        db.session.commit()
+
+        assert not job.file.cache_path.exists()
+
+
+def test_read_table_chunks(app, tmp_path):
+    with app.app_context():
+        job = _add_job(app, tmp_path, [f"pRS-{i},GFP,2024-01-01" for i in range(10)])
+
+        for cached in (False, True, True):
+            chunks = list(job.file.read_table(cached=cached, chunksize=4))
+
+            assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+            assert list(chunks[-1].index) == [8, 9]
+            assert list(chunks[-1]["label"]) == ["pRS-8", "pRS-9"]
+
+        # A chunk that is not consumed to the end does not leave a cache behind.
+        job.file.path.write_text("label,insert\npRS-1,GFP\npRS-2,GFP")
+        chunks = job.file.read_table(chunksize=1)
+        next(chunks)
+        chunks.close()
+
+        assert len(list(job.file.cache_path.parent.iterdir())) == 1
+        assert len(job.file.read_table()) == 2
+
+
+def test_read_table_excel(app, tmp_path):
+    with app.app_context():
+        job = _add_job(app, tmp_path, [])
+        job.file.filename_internal = "import.xlsx"
+        db.session.commit()
+
+        table = pd.DataFrame({"label": [f"pRS-{i}" for i in range(5)], "insert": ["GFP"] * 5})
+        table.to_excel(job.file.path, index=False)
+
+        chunks = list(job.file.read_table(chunksize=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks), table)
+
+
+def test_read_table_excel_formatted_empty_cells(app, tmp_path):
+    with app.app_context():
+        job = _add_job(app, tmp_path, [])
+        job.file.filename_internal = "import.xlsx"
+        db.session.commit()
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["label", "insert"])
+        sheet.append(["pRS-1", "GFP"])
+        sheet.append([None, None])
+        sheet.append(["pRS-2", "RFP"])
+
+        # Formatted cells are returned by openpyxl even if they are empty.
+        for row in range(1, 8):
+            for column in range(1, 5):
+                if row > 4 or column > 2:
+                    sheet.cell(row=row, column=column).fill = PatternFill("solid", "FFFF00")
+
+        workbook.save(job.file.path)
+
+        table = job.file.read_table(cached=False)
+
+        expected = pd.read_excel(job.file.path).dropna(how="all").reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(table, expected)
+        assert list(table.columns) == ["label", "insert"]
+        assert table["label"].tolist() == ["pRS-1", "pRS-2"]
+        assert job.validate() == []
+
+
+def test_validate_across_chunks(app, tmp_path):
+    with app.app_context():
+        app.config["IMPORT_CHUNK_SIZE"] = 2
+        lines = ["pRS-1,GFP", "pRS-2,GFP", "pRS-3,GFP", "pRS-1,GFP", "pRS-4,"]
+        job = _add_job(app, tmp_path, lines)
+
+        assert job.validate() == [
+            (4, "'label' pRS-1 appears more than once in the file."),
+            (5, "'insert' is required."),
+        ]
+
+
+def test_normalize_table(app):
+    with app.app_context():
+        table = pd.DataFrame(
+            {
+                "label": [" oRS-1 ", 2, None],
+                "sequence": ["ac gT", "", "ACGT"],
+                "date_ordered": ["2024-01-02", None, "02.01.2024"],
+            }
+        )
+
+        assert models.Oligonucleotide.normalize_table(table).to_dict("records") == [
+            {"label": "oRS-1", "sequence": "ACGT", "date_ordered": date(2024, 1, 2)},
+            {"label": "2", "sequence": None, "date_ordered": None},
+            {"label": None, "sequence": "ACGT", "date_ordered": None},
+        ]
+
+        table = pd.DataFrame({"storage_temp": [-20.0, None, 4.5, "x"]})
+
+        assert models.Antibody.normalize_table(table)["storage_temp"].tolist() == [
+            -20,
+            None,
+            None,
+            None,
+        ]
+
+
+def test_run_upsert(app, tmp_path):
+    with app.app_context():
+        db.session.add(models.Plasmid(label="pRS-1", insert="GFP", description="old", owner_id=1))
+        db.session.commit()
+
+        lines = ["pRS-1,RFP,", "pRS-2,YFP,", "pRS-3,CFP,"]
+        job = _add_job(app, tmp_path, lines, description="cloning_date")
+        job.mode = "upsert"
+
+        assert job.validate() == []
+
+        imported, failed = job.run(chunk_size=2)
+
+        assert (imported, failed) == (3, [])
+
+        plasmids = db.session.scalars(select(models.Plasmid).order_by(models.Plasmid.label)).all()
+        assert [(p.label, p.insert) for p in plasmids] == [
+            ("pRS-1", "RFP"),
+            ("pRS-2", "YFP"),
+            ("pRS-3", "CFP"),
+        ]
+
+        # Empty cells do not overwrite existing values.
+        assert plasmids[0].description == "old"
+
+        # Bulk UPDATEs skip `onupdate`, so the edit time is set explicitly.
+        assert plasmids[0].timestamp_edited is not None
+        assert plasmids[1].timestamp_edited is None
+
+
+def test_run_upsert_by_id(app, tmp_path):
+    with app.app_context():
+        plasmid = models.Plasmid(label="pRS-1", insert="GFP", owner_id=1)
+        db.session.add(plasmid)
+        db.session.commit()
+
+        job = _add_job(app, tmp_path, [f"pRS-9,RFP,{plasmid.id}"], id="cloning_date")
+
+        assert job.validate() == [(None, "'id' can only be mapped when updating entities.")]
+        assert job.validate(mode="upsert") == []
+
+        job.mode = "upsert"
+        assert job.run() == (1, [])
+
+        db.session.refresh(plasmid)
+        assert (plasmid.label, plasmid.insert) == ("pRS-9", "RFP")
+
+
+def test_bulk_update_reindexes_seeds(app):
+    with app.app_context():
+        oligonucleotide = models.Oligonucleotide(
+            label="oRS-1", sequence="ACGTACGTTTGCAGGCATTA", owner_id=1, date_ordered=date.today()
+        )
+        db.session.add(oligonucleotide)
+        db.session.commit()
+
+        params = [{"id": oligonucleotide.id, "sequence": "TTTTGGGGCCCCAAAATTTT"}]
+        db.session.execute(update(models.Oligonucleotide), params)
+        db.session.commit()
+
+        query = models.Oligonucleotide.find_candidates(
+            "GGTTTTGGGGCCCCAAAATTTTGG", min_match=15, max_len=40
+        )
+        assert db.session.scalars(query).all() == [oligonucleotide]
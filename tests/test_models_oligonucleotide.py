@@ -0,0 +1,92 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from labbase2 import models
+from labbase2.database import db
+from labbase2.models.oligonucleotide import oligonucleotide_seed
+
+
+def _seeds(id_: int) -> set[str]:
+    return set(
+        db.session.scalars(
+            select(oligonucleotide_seed.c.seed).where(
+                oligonucleotide_seed.c.oligonucleotide_id == id_
+            )
+        )
+    )
+
+
+def _add_oligonucleotide(label: str, sequence: str) -> models.Oligonucleotide:
+    oligonucleotide = models.Oligonucleotide(
+        label=label, sequence=sequence, owner_id=1, date_ordered=date.today()
+    )
+    db.session.add(oligonucleotide)
+    db.session.commit()
+
+    return oligonucleotide
+
+
+def test_seeds():
+    seeds = models.Oligonucleotide.seeds("acgtnAC GTA", 3)
+    assert seeds == {"ACG", "CGT", "GTA"}
+
+    seeds = models.Oligonucleotide.seeds("ACGT", 3, circular=True)
+    assert seeds == {"ACG", "CGT", "GTA", "TAC"}
+
+
+def test_seed_index_follows_changes(app):
+    with app.app_context():
+        length = app.config["FIND_SEED_LENGTH"]
+        oligonucleotide = _add_oligonucleotide("oRS-1", "ACGTACGTTTGCAGGCATTA")
+        id_ = oligonucleotide.id
+
+        assert _seeds(id_) == models.Oligonucleotide.seeds("ACGTACGTTTGCAGGCATTA", length)
+
+        oligonucleotide.sequence = "TTTTGGGGCCCCAAAATTTT"
+        db.session.commit()
+
+        assert _seeds(id_) == models.Oligonucleotide.seeds("TTTTGGGGCCCCAAAATTTT", length)
+
+        db.session.delete(oligonucleotide)
+        db.session.commit()
+
+        assert not _seeds(id_)
+
+
+def test_find_candidates(app):
+    with app.app_context():
+        target = "GGGGGGGGACGTACGTTTGCAGGCATTAGGGGGGGG"
+        hit = _add_oligonucleotide("oRS-1", "ACGTACGTTTGCAGGCATTA")
+        _add_oligonucleotide("oRS-2", "TTTTGGGGCCCCAAAATTTT")
+
+        query = models.Oligonucleotide.find_candidates(target, min_match=15, max_len=40)
+        assert db.session.scalars(query).all() == [hit]
+
+        # Seeds are not used if the minimum match is shorter than the seed length.
+        query = models.Oligonucleotide.find_candidates(target, min_match=4, max_len=40)
+        assert len(db.session.scalars(query).all()) == 2
+
+
+def test_seed_index_rebuild(app):
+    with app.app_context():
+        oligonucleotide = _add_oligonucleotide("oRS-1", "ACGTACGTTTGCAGGCATTA")
+
+        assert not models.Oligonucleotide.seed_index_outdated()
+
+        db.session.execute(oligonucleotide_seed.delete())
+        assert models.Oligonucleotide.seed_index_outdated()
+
+        models.Oligonucleotide.build_seed_index()
+        db.session.commit()
+
+        assert not models.Oligonucleotide.seed_index_outdated()
+        assert _seeds(oligonucleotide.id)
+
+
+def test_seed_index_ignores_oligonucleotides_without_seeds(app):
+    with app.app_context():
+        oligonucleotide = _add_oligonucleotide("oRS-1", "ACGTNACGTRACGTYACGTNACG")
+
+        assert not _seeds(oligonucleotide.id)
+        assert not models.Oligonucleotide.seed_index_outdated()
@@ -0,0 +1,202 @@
+import io
+import os
+from zipfile import ZipFile
+
+import pytest
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqFeature import FeatureLocation, SeqFeature
+from Bio.SeqRecord import SeqRecord
+from sqlalchemy import event, select
+
+from labbase2 import models
+from labbase2.database import db
+from labbase2.models import plasmid as plasmid_module
+from labbase2.models.mixins import Sequence
+
+
+def _write_record(path, sequence: str) -> None:
+    record = SeqRecord(
+        Seq(sequence),
+        id="pRS1",
+        features=[SeqFeature(FeatureLocation(0, 6), type="misc_feature")],
+        annotations={"molecule_type": "DNA"},
+    )
+    SeqIO.write(record, path, "genbank")
+
+
+def _add_plasmid(app, tmp_path, sequence: str) -> models.Plasmid:
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    file = models.BaseFile(user_id=1, filename_exposed="pRS1.gb", filename_internal="0000001.gb")
+    plasmid = models.Plasmid(label="pRS1", insert="GFP", owner_id=1, file=file)
+    db.session.add(plasmid)
+    db.session.commit()
+
+    _write_record(file.path, sequence)
+
+    return plasmid
+
+
+def test_sequence_cache(app, tmp_path, monkeypatch):
+    calls = []
+    read = SeqIO.read
+
+    def counting_read(*args, **kwargs):
+        # Records parsed again from the cached GenBank text are not counted.
+        if not isinstance(args[0], io.StringIO):
+            calls.append(args)
+        return read(*args, **kwargs)
+
+    monkeypatch.setattr(plasmid_module.SeqIO, "read", counting_read)
+
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+
+        assert len(plasmid) == 16
+        assert len(calls) == 1
+
+        # The committed cache is used by later requests and the features are
+        # preserved.
+        db.session.commit()
+        db.session.expire_all()
+        assert len(plasmid) == 16
+        assert len(plasmid.seqrecord.features) == 1
+        assert str(plasmid.seqrecord.seq) == "GAATTCAAAAGGATCC"
+        assert len(calls) == 1
+
+        # Modifying the file invalidates the cache.
+        _write_record(plasmid.file.path, "GAATTC")
+        stat = plasmid.file.path.stat()
+        os.utime(plasmid.file.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert len(plasmid) == 6
+        assert len(calls) == 2
+
+
+def test_sequence_cache_keeps_pending_changes(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+        file_id = plasmid.file_plasmid_id
+
+        plasmid.insert = "RFP"
+
+        assert len(plasmid) == 16
+
+        # Pending changes of the caller are not committed by caching the sequence.
+        db.session.rollback()
+
+        assert plasmid.insert == "GFP"
+        assert db.session.get(models.SequenceCache, file_id) is None
+
+
+def test_sequence_cache_is_not_committed(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+        file_id = plasmid.file_plasmid_id
+
+        commits = []
+
+        def listener(session):
+            if not session.in_nested_transaction():
+                commits.append(session)
+
+        event.listen(db.session, "before_commit", listener)
+
+        try:
+            assert len(plasmid) == 16
+        finally:
+            event.remove(db.session, "before_commit", listener)
+
+        # Reading a plasmid leaves the commit to the caller.
+        assert commits == []
+        assert db.session.get(models.SequenceCache, file_id) is not None
+
+
+def test_sequence_cache_stores_genbank(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+        cache = plasmid.sequence_cache()
+        db.session.commit()
+
+        genbank = db.session.scalar(
+            select(models.SequenceCache.genbank).where(
+                models.SequenceCache.file_id == cache.file_id
+            )
+        )
+        assert genbank.startswith("LOCUS")
+        assert "misc_feature" in genbank
+
+
+def test_sequence_cache_deleted_with_file(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+        file_id = plasmid.file_plasmid_id
+
+        assert len(plasmid) == 16
+        assert db.session.get(models.SequenceCache, file_id) is not None
+
+        plasmid.file = None
+        db.session.commit()
+
+        assert db.session.get(models.SequenceCache, file_id) is None
+        assert len(plasmid) == 0
+
+
+def test_restriction_sites(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+
+        sites = {str(enzyme): cuts for enzyme, cuts in plasmid.restriction_sites().items()}
+        assert sites["EcoRI"] == 1
+        assert sites["BamHI"] == 1
+        assert sites["HindIII"] == 0
+
+        # The cached sites match a search of the sequence including enzymes without
+        # any site.
+        for n in (0, 1, 2):
+            assert plasmid.restriction_sites(n) == Sequence.restriction_sites(plasmid, n)
+
+        site = db.session.get(models.RestrictionSite, (plasmid.file_plasmid_id, "EcoRI"))
+        assert site.positions == [2]
+
+
+def test_cut_by(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+        assert len(plasmid) == 16
+
+        query = models.Plasmid.filter_(order_by="label", cut_once="ecori, BamHI")
+        assert db.session.scalars(query).all() == [plasmid]
+
+        query = models.Plasmid.filter_(order_by="label", cut_once="EcoRI HindIII")
+        assert not db.session.scalars(query).all()
+
+        with pytest.raises(ValueError):
+            models.Plasmid.cut_by(["NotAnEnzyme"])
+
+
+def test_build_sequence_cache(app, tmp_path):
+    with app.app_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+
+        # Plasmid files that were never parsed are missing from enzyme filters.
+        query = models.Plasmid.filter_(order_by="label", cut_once="EcoRI")
+        assert not db.session.scalars(query).all()
+        assert models.Plasmid.sequence_cache_outdated()
+
+        assert models.Plasmid.build_sequence_cache() == 1
+
+        assert not models.Plasmid.sequence_cache_outdated()
+        assert db.session.scalars(query).all() == [plasmid]
+
+
+def test_to_zip(app, tmp_path):
+    with app.test_request_context():
+        plasmid = _add_plasmid(app, tmp_path, "GAATTCAAAAGGATCC")
+
+        response = models.Plasmid.to_zip(select(models.Plasmid))
+        assert response.is_streamed
+
+        with ZipFile(io.BytesIO(response.get_data())) as archive:
+            assert archive.read("pRS1/pRS1.gb") == plasmid.file.path.read_bytes()
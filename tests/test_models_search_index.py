@@ -0,0 +1,114 @@
+import pytest
+from flask import url_for
+from sqlalchemy import update
+
+from labbase2.database import db
+from labbase2.models import Antibody, BaseEntity, Comment, FlyStock, Plasmid, SearchIndex
+
+
+@pytest.fixture(params=["fts5", "tokens"])
+def config(request) -> dict:
+    return {"SEARCH_BACKEND": request.param}
+
+
+def _search(query: str) -> list[str]:
+    return [row.label for row in db.session.execute(BaseEntity.search(query))]
+
+
+def _add_entities() -> None:
+    db.session.add_all(
+        [
+            Plasmid(label="pGFP-1", insert="GFP", vector="pUAST", owner_id=1),
+            Plasmid(label="pRS-2", insert="mCherry", description="Red marker", owner_id=1),
+            Antibody(label="Anti-GFP", host="Rabbit", antigen="GFP", owner_id=1),
+            FlyStock(label="RSF-1", chromosome_2a="UAS-GFP", chromosome_3a="Gal4", owner_id=1),
+        ]
+    )
+    db.session.commit()
+
+
+def test_search_ranks_label_first(app):
+    with app.app_context():
+        _add_entities()
+
+        assert _search("gfp")[-1] == "RSF-1"
+        assert set(_search("gfp")) == {"pGFP-1", "Anti-GFP", "RSF-1"}
+        assert _search("red mark") == ["pRS-2"]
+        assert _search("gfp gal4") == ["RSF-1"]
+        assert _search("unknown") == []
+        assert _search("") == []
+
+
+def test_search_follows_changes(app):
+    with app.app_context():
+        _add_entities()
+
+        plasmid = db.session.scalar(db.select(Plasmid).where(Plasmid.label == "pRS-2"))
+        plasmid.insert = "tdTomato"
+        db.session.commit()
+
+        assert _search("tdtomato") == ["pRS-2"]
+        assert _search("mcherry") == []
+
+        comment = Comment(entity_id=plasmid.id, user_id=1, subject="Sequencing", text="Frameshift")
+        db.session.add(comment)
+        db.session.commit()
+
+        assert _search("frameshift") == ["pRS-2"]
+
+        db.session.delete(comment)
+        db.session.commit()
+
+        assert _search("frameshift") == []
+
+        db.session.delete(plasmid)
+        db.session.commit()
+
+        assert _search("tdtomato") == []
+
+
+def test_search_follows_bulk_updates(app):
+    with app.app_context():
+        _add_entities()
+
+        id_ = db.session.scalar(db.select(Plasmid.id).where(Plasmid.label == "pRS-2"))
+        db.session.execute(update(Plasmid), [{"id": id_, "vector": "pBluescript"}])
+        db.session.commit()
+
+        assert _search("pblue") == ["pRS-2"]
+
+
+def test_filter_search(app):
+    with app.app_context():
+        _add_entities()
+
+        query = Plasmid.filter_(order_by="label", search="GFP")
+
+        assert [plasmid.label for plasmid in db.session.scalars(query)] == ["pGFP-1"]
+
+
+def test_build_search_index(app):
+    with app.app_context():
+        _add_entities()
+        expected = _search("gfp")
+
+        SearchIndex.clear(db.session.connection())
+
+        assert BaseEntity.search_index_outdated()
+
+        BaseEntity.build_search_index()
+
+        assert not BaseEntity.search_index_outdated()
+        assert _search("gfp") == expected
+
+
+@pytest.mark.usefixtures("login")
+def test_search_endpoint(app, client):
+    with app.app_context(), client:
+        _add_entities()
+
+        response = client.get(url_for("base.search", q="gfp", limit=2))
+
+        assert response.status_code == 200
+        assert len(response.json["results"]) == 2
+        assert response.json["results"][0]["score"] >= response.json["results"][1]["score"]
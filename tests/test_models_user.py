@@ -0,0 +1,58 @@
+from sqlalchemy import event
+
+from labbase2.database import db
+from labbase2.models import Group, Permission, User
+
+
+def _count_queries(fnc) -> int:
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+
+    try:
+        fnc()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    return len(statements)
+
+
+def test_permissions_cached(app):
+    with app.app_context():
+        admin = db.session.get(User, 1)
+
+        assert admin.is_admin
+        assert "add-plasmid" in admin.permissions
+
+        checks = lambda: [admin.is_admin, admin.has_permission("add-plasmid")] * 10
+        assert _count_queries(checks) == 0
+
+
+def test_permissions_invalidated(app):
+    with app.app_context():
+        user = User(first_name="Erika", last_name="Musterfrau", email="erika@test.de")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+
+        assert not user.is_admin
+        assert not user.has_permission("add-plasmid")
+
+        group = db.session.get(Group, "user")
+        group.permissions.append(db.session.get(Permission, "add-plasmid"))
+        db.session.commit()
+
+        assert user.has_permission("add-plasmid")
+
+        user.groups.append(db.session.get(Group, "admin"))
+        db.session.commit()
+
+        assert user.is_admin
+
+        user.groups.remove(db.session.get(Group, "admin"))
+        db.session.commit()
+
+        assert not user.is_admin
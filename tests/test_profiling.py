@@ -0,0 +1,33 @@
+import logging
+
+import pytest
+from flask import url_for
+
+
+@pytest.mark.parametrize("config", [{"PROFILING": True}], indirect=True)
+@pytest.mark.usefixtures("login")
+def test_server_timing_header(app, client):
+    with app.app_context():
+        response = client.get(url_for("base.index"))
+
+        metrics = dict(
+            metric.strip().split(";", 1) for metric in response.headers["Server-Timing"].split(",")
+        )
+
+        assert set(metrics) == {"db", "tpl", "total"}
+        assert "queries" in metrics["db"]
+
+
+def test_server_timing_disabled(app, client):
+    with app.app_context():
+        assert "Server-Timing" not in client.get(url_for("auth.login")).headers
+
+
+@pytest.mark.parametrize("config", [{"PROFILING": True, "PROFILING_MAX_QUERIES": 0}], indirect=True)
+@pytest.mark.usefixtures("login")
+def test_slow_requests_are_flagged(app, client, caplog):
+    with app.app_context():
+        with caplog.at_level(logging.INFO, logger=app.logger.name):
+            client.get(url_for("base.index"))
+
+    assert any(record.message.startswith("Slow request") for record in caplog.records)
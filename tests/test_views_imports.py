@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import url_for
+from sqlalchemy import func, select
+
+from labbase2 import create_app, executor, models
+from labbase2.database import db
+
+
+def _add_job(app, tmp_path, lines: list[str]) -> int:
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    file = models.BaseFile(user_id=1, filename_exposed="import.csv", filename_internal="import.csv")
+    job = models.ImportJob(user_id=1, file=file, entity_type="plasmid")
+
+    for field in models.Plasmid.importable_fields():
+        column = field if field in ("label", "insert") else None
+        job.mappings.append(models.ColumnMapping(mapped_field=field, input_column=column))
+
+    db.session.add(job)
+    db.session.commit()
+
+    file.path.write_text("\n".join(["label,insert"] + lines))
+
+    return job.id
+
+
+def _count() -> int:
+    return db.session.scalar(select(func.count()).select_from(models.Plasmid))
+
+
+@pytest.mark.usefixtures("login")
+def test_execute_invalid_file(app, client, tmp_path):
+    with app.app_context(), client:
+        id_ = _add_job(app, tmp_path, ["pRS-1,GFP", "pRS-1,"])
+
+        response = client.get(url_for("imports.execute", id_=id_), follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b"Row 2: &#39;insert&#39; is required." in response.data
+        assert b"Row 2: &#39;label&#39; pRS-1 appears more than once in the file." in response.data
+        assert _count() == 0
+
+        response = client.get(url_for("imports.status", id_=id_))
+        assert response.json["status"] == "failed"
+        assert response.json["message"] == "Nothing was imported because 2 problems were found."
+
+
+@pytest.mark.usefixtures("login")
+def test_execute(app, client, tmp_path):
+    with app.app_context(), client:
+        id_ = _add_job(app, tmp_path, ["pRS-1,GFP", "pRS-2,RFP"])
+
+        client.get(url_for("imports.execute", id_=id_))
+
+        assert _count() == 2
+
+        response = client.get(url_for("imports.status", id_=id_))
+        assert response.json == {"status": "done", "processed": 2, "failed": 0, "message": None}
+
+        response = client.get(url_for("imports.index"))
+        assert b'data-status="done"' in response.data
+
+        # A finished import cannot be executed again.
+        response = client.get(url_for("imports.execute", id_=id_), follow_redirects=True)
+        assert b"is already done" in response.data
+
+
+def test_execute_in_background(tmp_path):
+    app = create_app(
+        config_dict={
+            "TESTING": True,
+            "SERVER_NAME": "localhost",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'labbase2.db'}",
+            "USER": ["Max", "Mustermann", "test@test.de"],
+            "IMPORT_WORKERS": 1,
+        }
+    )
+
+    with app.test_request_context():
+        id_ = _add_job(app, tmp_path, [f"pRS-{i},GFP" for i in range(100)])
+        job = db.session.get(models.ImportJob, id_)
+        job.status = "queued"
+        db.session.commit()
+
+        executor.submit_import(id_).result(timeout=30)
+
+        db.session.expire_all()
+        assert job.status == "done"
+        assert job.processed == 100
+        assert _count() == 100
+
+
+@pytest.mark.usefixtures("login")
+def test_delete_running(app, client, tmp_path):
+    with app.app_context(), client:
+        id_ = _add_job(app, tmp_path, ["pRS-1,GFP"])
+
+        job = db.session.get(models.ImportJob, id_)
+        job.status = "running"
+        db.session.commit()
+
+        response = client.delete(url_for("imports.delete", id_=id_))
+
+        assert b"cannot be deleted" in response.data
+        assert db.session.get(models.ImportJob, id_) is not None
+
+        job.status = "failed"
+        db.session.commit()
+
+        client.delete(url_for("imports.delete", id_=id_))
+
+        assert db.session.get(models.ImportJob, id_) is None
+
+
+def test_fail_stale_imports(app, tmp_path):
+    with app.app_context():
+        job = db.session.get(models.ImportJob, _add_job(app, tmp_path, ["pRS-1,GFP"]))
+        job.status = "running"
+        job.heartbeat = datetime.now()
+        db.session.commit()
+
+        # Imports of other processes are only failed if they stopped sending heartbeats.
+        assert executor.fail_stale_imports() == 0
+        assert job.status == "running"
+
+        job.heartbeat = datetime.now() - timedelta(hours=1)
+        db.session.commit()
+
+        assert executor.fail_stale_imports() == 1
+        assert job.status == "failed"
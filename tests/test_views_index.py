@@ -0,0 +1,104 @@
+import re
+from datetime import date
+from html import unescape
+
+import pytest
+from flask import url_for
+from sqlalchemy import event
+
+from labbase2 import models
+from labbase2.database import db
+
+
+def _add_entities(start: int, stop: int) -> None:
+    for i in range(start, stop):
+        user = models.User(first_name="User", last_name=str(i), email=f"user{i}@test.de")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.flush()
+
+        chemical = models.Chemical(label=f"Chemical {i}", owner_id=user.id)
+        antibody = models.Antibody(label=f"Antibody {i}", host="Rabbit", antigen="GFP", owner_id=1)
+        db.session.add_all(
+            [
+                models.Plasmid(label=f"pRS-{i}", insert="GFP", owner_id=user.id),
+                models.Oligonucleotide(
+                    label=f"oRS-{i}", sequence="ACGT", date_ordered=date.today(), owner_id=user.id
+                ),
+                models.FlyStock(label=f"RSF-{i}", owner_id=user.id),
+                chemical,
+                antibody,
+            ]
+        )
+
+        for consumable in (chemical, antibody):
+            consumable.batches.append(
+                models.Batch(
+                    supplier="Sigma", article_number="1", storage_place="Fridge", lot=str(i)
+                )
+            )
+
+    db.session.commit()
+
+
+def _count_queries(client, url: str) -> int:
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    return len(statements)
+
+
+@pytest.mark.parametrize(
+    "endpoint",
+    [
+        "plasmids.index",
+        "oligonucleotides.index",
+        "flystocks.index",
+        "chemicals.index",
+        "antibodies.index",
+        "batches.index",
+    ],
+)
+@pytest.mark.usefixtures("login")
+def test_index_queries_do_not_depend_on_rows(app, client, endpoint):
+    with app.app_context(), client:
+        # The index views expect the filter forms to have a CSRF token.
+        app.config["WTF_CSRF_ENABLED"] = True
+
+        _add_entities(0, 3)
+        few = _count_queries(client, url_for(endpoint))
+
+        _add_entities(3, 12)
+        many = _count_queries(client, url_for(endpoint))
+
+        assert many == few
+
+
+@pytest.mark.usefixtures("login")
+def test_index_pages_by_cursor(app, client):
+    with app.app_context(), client:
+        app.config["WTF_CSRF_ENABLED"] = True
+        app.config["PER_PAGE"] = 5
+
+        _add_entities(0, 12)
+
+        url, labels, pages = url_for("plasmids.index"), [], 0
+        while url is not None:
+            html = client.get(url).get_data(as_text=True)
+            labels += re.findall(r"<td>(pRS-\d+)</td>", html)
+            pages += 1
+
+            match = re.search(r'href="([^"]*\?page=\d+&amp;after=[^"]*)"', html)
+            url = unescape(match.group(1)) if match else None
+
+        assert pages == 3
+        assert sorted(labels) == sorted(f"pRS-{i}" for i in range(12))
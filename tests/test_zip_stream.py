@@ -0,0 +1,27 @@
+import io
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from labbase2.utils.zip_stream import stream_zip
+
+
+def test_stream_zip(app, tmp_path):
+    text = tmp_path / "plasmid.gb"
+    text.write_text("ACGT" * 10_000)
+    image = tmp_path / "gel.PNG"
+    image.write_bytes(bytes(range(256)) * 100)
+    missing = tmp_path / "missing.pdf"
+
+    files = [(text, "pRS1/plasmid.gb"), (image, "pRS1/gel.PNG"), (missing, "pRS1/missing.pdf")]
+
+    with app.app_context():
+        chunks = list(stream_zip(files, chunk_size=1024))
+
+    assert len(chunks) > 2
+
+    with ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["pRS1/plasmid.gb", "pRS1/gel.PNG"]
+        assert archive.getinfo("pRS1/plasmid.gb").compress_type == ZIP_DEFLATED
+        assert archive.getinfo("pRS1/gel.PNG").compress_type == ZIP_STORED
+        assert archive.read("pRS1/plasmid.gb") == text.read_bytes()
+        assert archive.read("pRS1/gel.PNG") == image.read_bytes()